@@ -0,0 +1,505 @@
+"""
+Local HTTP/JSON API over the HR service layer.
+
+    python api_server.py --host 127.0.0.1 --port 8080
+
+Each request runs its service call through async_db on a pooled connection,
+with a per-request query timeout, so many integrations can be served at
+once and one slow query doesn't hold up the rest. If the
+HRMS_API_TOKEN environment variable is set, requests must send
+`Authorization: Bearer <token>`. HRMS_TRIGRAM_INDEX=1 and HRMS_LEAVE_ENGINE=1
+load the in-memory name index and leave engine at startup (see main.py).
+
+    GET    /health
+    GET    /metrics                        (Prometheus text format)
+    GET    /employees?after=<emp_id>&limit=<n>
+    POST   /employees                      {"first_name", "last_name", ..., "salary"}
+    GET    /employees/<emp_id>
+    PATCH  /employees/<emp_id>             {"department": "...", "salary": ...}
+    GET    /employees/<emp_id>/reviews?window=3
+    GET    /employees/<emp_id>/leave-balance?year=<yyyy>
+    GET    /employees/<emp_id>/history
+    GET    /employees/<emp_id>/as-of?date=<yyyy-mm-dd[ hh:mm:ss]>
+    GET    /employees/as-of?department=&date=<yyyy-mm-dd[ hh:mm:ss]>
+    POST   /leaves                         {"emp_id", "start_date", "end_date", "reason"}
+    GET    /leaves/pending?department=&emp_id=&from=&to=&after=&limit=
+    GET    /leaves/calendar?date=<yyyy-mm-dd>&department=&pending=1
+    POST   /leaves/status                  {"leave_ids": [...], "status": "Approved" | "Rejected"}
+    POST   /leaves/<leave_id>/status       {"status": "Approved" | "Rejected"}
+    GET    /payroll/<emp_id>               (calculate only)
+    POST   /payroll/<emp_id>               (calculate and save)
+    GET    /payroll/reports/monthly?month=<yyyy-mm>
+    GET    /payroll/reports/trend?department=&months=12&until=<yyyy-mm>
+    POST   /reviews                        {"emp_id", "rating", "comments"}
+    GET    /reviews/distribution?department=&from=<yyyy-mm>&to=<yyyy-mm>&latest=1
+    GET    /reviews/trend?department=&months=12&window=3&until=<yyyy-mm>
+    GET    /reviews/employees?department=&window=3
+    GET    /job-openings?status=&min_salary=&max_salary=&title=<prefix>&after=&limit=
+    POST   /job-openings                   {"title", "salary_offered", "work_hours"}
+    GET    /job-openings/<job_id>
+    PATCH  /job-openings/<job_id>          {"salary_offered", "work_hours", "status"}
+    GET    /job-openings/<job_id>/pipeline
+    GET    /job-openings/<job_id>/applications?stage=&after=&limit=
+    POST   /job-openings/<job_id>/applications  {"candidate_id"}
+    POST   /candidates                     {"first_name", "last_name", "email", "phone"}
+    GET    /candidates/<candidate_id>
+    POST   /applications/stage             {"application_ids": [...], "stage": "Screening" | ...}
+"""
+import argparse
+import asyncio
+import hmac
+import json
+import os
+import re
+import sys
+import traceback
+from datetime import date, datetime
+from decimal import Decimal
+from urllib.parse import parse_qs, urlsplit
+
+import payroll_analytics
+import review_analytics
+import services
+from async_db import AsyncPool, QueryTimeout
+from db_pool import PoolTimeout
+from employee_listing import DEFAULT_PAGE_SIZE, fetch_employee_page
+from instrumentation import render_prometheus, track_action
+
+MAX_BODY = 1024 * 1024
+MAX_PAGE = 1000
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error",
+           503: "Service Unavailable", 504: "Gateway Timeout"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", "replace")
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+
+def _fields(body, *names, required=()):
+    """The named body fields that were sent; ServiceError if a required one is missing."""
+    missing = [name for name in required if name not in body]
+    if missing:
+        raise services.ServiceError(f"Missing field(s): {', '.join(missing)}")
+    return {name: body[name] for name in names if name in body}
+
+
+def _id_list(body, name):
+    ids = body.get(name) or []
+    if not isinstance(ids, list):
+        raise services.ServiceError(f"{name} must be a list of IDs")
+    return ids
+
+
+def _int_param(query, name, default, maximum=None):
+    """An integer query parameter (default when absent or empty), capped at `maximum`."""
+    text = query.get(name, [""])[0].strip()
+    if not text:
+        return default
+    try:
+        value = int(text)
+    except ValueError:
+        raise services.ServiceError(f"{name} must be an integer")
+    if value < 0:
+        raise services.ServiceError(f"{name} must not be negative")
+    return value if maximum is None else min(value, maximum)
+
+
+def _limit(query):
+    return _int_param(query, "limit", DEFAULT_PAGE_SIZE, MAX_PAGE) or DEFAULT_PAGE_SIZE
+
+
+# ---------------------------
+# ROUTES
+# ---------------------------
+# Each handler runs on a worker thread: handler(conn, match, query, body) -> (status, payload)
+
+def list_employees(conn, match, query, body):
+    limit = _limit(query)
+    page = fetch_employee_page(conn, _int_param(query, "after", 0), limit)
+    next_after = page[-1]["emp_id"] if len(page) == limit else None
+    return 200, {"employees": page, "next_after": next_after}
+
+
+def create_employee(conn, match, query, body):
+    fields = _fields(body, "first_name", "last_name", "email", "phone", "department", "job_title", "salary",
+                     required=("first_name", "last_name"))
+    return 201, services.add_employee(conn, **fields)
+
+
+def show_employee(conn, match, query, body):
+    return 200, services.get_employee(conn, match.group(1))
+
+
+def patch_employee(conn, match, query, body):
+    unknown = set(body) - set(services.EDITABLE_EMPLOYEE_FIELDS)
+    if unknown:
+        raise services.ServiceError(f"Cannot update: {', '.join(sorted(unknown))}")
+    return 200, services.update_employee(conn, match.group(1), **body)
+
+
+def employee_reviews(conn, match, query, body):
+    window = _int_param(query, "window", 3)
+    return 200, {"reviews": services.list_reviews(conn, match.group(1)),
+                 "stats": services.employee_review_stats(conn, match.group(1), window)}
+
+
+def employee_history(conn, match, query, body):
+    return 200, {"history": services.employee_changes(conn, match.group(1))}
+
+
+def employee_as_of(conn, match, query, body):
+    when = query.get("date", [date.today().isoformat()])[0]
+    return 200, {"date": when, "employee": services.employee_as_of(conn, match.group(1), when)}
+
+
+def department_as_of(conn, match, query, body):
+    when = query.get("date", [date.today().isoformat()])[0]
+    return 200, {"date": when, "employees": services.department_as_of(conn, query.get("department", [""])[0], when)}
+
+
+def create_leave(conn, match, query, body):
+    fields = _fields(body, "emp_id", "start_date", "end_date", "reason",
+                     required=("emp_id", "start_date", "end_date"))
+    return 201, services.apply_leave(conn, **fields)
+
+
+def pending_leaves(conn, match, query, body):
+    filters = {name: query[param][0] for name, param in
+               (("department", "department"), ("emp_id", "emp_id"), ("date_from", "from"), ("date_to", "to"))
+               if param in query}
+    limit = _limit(query)
+    page = services.list_pending_leaves(conn, after_leave_id=_int_param(query, "after", 0),
+                                        limit=limit, **filters)
+    next_after = page[-1]["leave_id"] if len(page) == limit else None
+    return 200, {"leaves": page, "next_after": next_after}
+
+
+def leave_calendar(conn, match, query, body):
+    on_date = query.get("date", [date.today().isoformat()])[0]
+    out = services.who_is_out(conn, on_date, query.get("department", [None])[0],
+                              include_pending=query.get("pending", ["0"])[0] in ("1", "true"))
+    return 200, {"date": on_date, "out": out}
+
+
+def leave_balance(conn, match, query, body):
+    return 200, services.leave_balance(conn, match.group(1), query.get("year", [None])[0])
+
+
+def bulk_leave_status(conn, match, query, body):
+    return 200, services.set_leave_statuses(conn, _id_list(body, "leave_ids"), body.get("status"))
+
+
+def leave_status(conn, match, query, body):
+    return 200, services.set_leave_status(conn, int(match.group(1)), body.get("status"))
+
+
+def preview_payroll(conn, match, query, body):
+    return 200, services.calculate_payroll(conn, match.group(1))
+
+
+def save_payroll(conn, match, query, body):
+    return 201, services.calculate_payroll(conn, match.group(1), save=True)
+
+
+def payroll_month(conn, match, query, body):
+    month = query.get("month", [date.today().strftime("%Y-%m")])[0]
+    return 200, {"month": month, "departments": payroll_analytics.month_summary(conn, month)}
+
+
+def payroll_trend(conn, match, query, body):
+    months = _int_param(query, "months", 12, 120)
+    return 200, {"trend": payroll_analytics.trend(conn, query.get("department", [None])[0], months,
+                                                  query.get("until", [None])[0])}
+
+
+def review_distribution(conn, match, query, body):
+    department = query.get("department", [None])[0]
+    if query.get("latest", [""])[0] in ("1", "true"):
+        return 200, {"distribution": review_analytics.latest_rating_distribution(conn, department)}
+    return 200, {"distribution": review_analytics.rating_distribution(
+        conn, department, query.get("from", [None])[0], query.get("to", [None])[0])}
+
+
+def review_trend(conn, match, query, body):
+    months = _int_param(query, "months", 12, 120)
+    window = _int_param(query, "window", 3, 24)
+    return 200, {"trend": review_analytics.rating_trend(conn, query.get("department", [None])[0], months,
+                                                        query.get("until", [None])[0], window)}
+
+
+def review_employee_trends(conn, match, query, body):
+    window = _int_param(query, "window", 3, 24)
+    return 200, {"employees": review_analytics.employee_trends(conn, query.get("department", [None])[0], window)}
+
+
+def create_review(conn, match, query, body):
+    fields = _fields(body, "emp_id", "rating", "comments", "review_date", required=("emp_id", "rating"))
+    return 201, services.record_performance_review(conn, **fields)
+
+
+def job_openings(conn, match, query, body):
+    filters = {name: query[param][0] for name, param in
+               (("status", "status"), ("min_salary", "min_salary"), ("max_salary", "max_salary"),
+                ("title_prefix", "title")) if param in query}
+    limit = _limit(query)
+    page = services.list_job_openings(conn, after_job_id=_int_param(query, "after", 0), limit=limit, **filters)
+    next_after = page[-1]["job_id"] if len(page) == limit else None
+    return 200, {"job_openings": page, "next_after": next_after}
+
+
+def create_job_opening(conn, match, query, body):
+    fields = _fields(body, "title", "salary_offered", "work_hours", required=("title", "salary_offered"))
+    return 201, services.add_job_opening(conn, **fields)
+
+
+def show_job_opening(conn, match, query, body):
+    return 200, services.get_job_opening(conn, int(match.group(1)))
+
+
+def patch_job_opening(conn, match, query, body):
+    fields = _fields(body, "salary_offered", "work_hours", "status")
+    return 200, services.update_job_opening(conn, int(match.group(1)), **fields)
+
+
+def job_pipeline(conn, match, query, body):
+    return 200, {"job_id": int(match.group(1)), "stages": services.pipeline_counts(conn, match.group(1))}
+
+
+def job_applications(conn, match, query, body):
+    limit = _limit(query)
+    page = services.list_applications(conn, match.group(1), query.get("stage", [None])[0],
+                                      after_application_id=_int_param(query, "after", 0), limit=limit)
+    next_after = page[-1]["application_id"] if len(page) == limit else None
+    return 200, {"applications": page, "next_after": next_after}
+
+
+def create_application(conn, match, query, body):
+    return 201, services.apply_for_job(conn, body.get("candidate_id"), match.group(1))
+
+
+def create_candidate(conn, match, query, body):
+    fields = _fields(body, "first_name", "last_name", "email", "phone", required=("first_name", "last_name"))
+    return 201, services.add_candidate(conn, **fields)
+
+
+def show_candidate(conn, match, query, body):
+    return 200, services.get_candidate(conn, match.group(1))
+
+
+def bulk_application_stage(conn, match, query, body):
+    return 200, services.move_applications(conn, _id_list(body, "application_ids"), body.get("stage"))
+
+
+ROUTES = [
+    ("GET", r"/employees", list_employees),
+    ("POST", r"/employees", create_employee),
+    ("GET", r"/employees/(\d+)", show_employee),
+    ("PATCH", r"/employees/(\d+)", patch_employee),
+    ("GET", r"/employees/(\d+)/reviews", employee_reviews),
+    ("GET", r"/employees/(\d+)/leave-balance", leave_balance),
+    ("GET", r"/employees/(\d+)/history", employee_history),
+    ("GET", r"/employees/(\d+)/as-of", employee_as_of),
+    ("GET", r"/employees/as-of", department_as_of),
+    ("POST", r"/leaves", create_leave),
+    ("GET", r"/leaves/pending", pending_leaves),
+    ("GET", r"/leaves/calendar", leave_calendar),
+    ("POST", r"/leaves/status", bulk_leave_status),
+    ("POST", r"/leaves/(\d+)/status", leave_status),
+    ("GET", r"/payroll/reports/monthly", payroll_month),
+    ("GET", r"/payroll/reports/trend", payroll_trend),
+    ("GET", r"/payroll/(\d+)", preview_payroll),
+    ("POST", r"/payroll/(\d+)", save_payroll),
+    ("POST", r"/reviews", create_review),
+    ("GET", r"/reviews/distribution", review_distribution),
+    ("GET", r"/reviews/trend", review_trend),
+    ("GET", r"/reviews/employees", review_employee_trends),
+    ("GET", r"/job-openings", job_openings),
+    ("POST", r"/job-openings", create_job_opening),
+    ("GET", r"/job-openings/(\d+)", show_job_opening),
+    ("PATCH", r"/job-openings/(\d+)", patch_job_opening),
+    ("GET", r"/job-openings/(\d+)/pipeline", job_pipeline),
+    ("GET", r"/job-openings/(\d+)/applications", job_applications),
+    ("POST", r"/job-openings/(\d+)/applications", create_application),
+    ("POST", r"/candidates", create_candidate),
+    ("GET", r"/candidates/(\d+)", show_candidate),
+    ("POST", r"/applications/stage", bulk_application_stage),
+]
+ROUTES = [(method, re.compile(pattern + r"/?$"), handler) for method, pattern, handler in ROUTES]
+
+
+def resolve(method, path):
+    allowed = False
+    for route_method, pattern, handler in ROUTES:
+        match = pattern.match(path)
+        if match:
+            if route_method == method:
+                return handler, match
+            allowed = True
+    if allowed:
+        raise HTTPError(405, f"{method} not allowed on {path}")
+    raise HTTPError(404, f"No route for {path}")
+
+
+# ---------------------------
+# SERVER
+# ---------------------------
+
+class APIServer:
+    def __init__(self, db, token=None):
+        self.db = db            # an async_db.AsyncPool
+        self.token = token
+
+    async def handle_request(self, method, target, headers, body):
+        """Return (status, payload) for one parsed request."""
+        if self.token:
+            supplied = headers.get("authorization", "")
+            if not hmac.compare_digest(supplied, f"Bearer {self.token}"):
+                raise HTTPError(401, "Missing or invalid bearer token")
+
+        url = urlsplit(target)
+        if url.path in ("/health", "/health/"):
+            return 200, {"status": "ok", "pool": self.db.stats()}
+        if url.path == "/metrics" and method == "GET":
+            return 200, render_prometheus()
+
+        handler, match = resolve(method, url.path)
+        payload = {}
+        if body:
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                raise HTTPError(400, "Body is not valid JSON")
+            if not isinstance(payload, dict):
+                raise HTTPError(400, "Body must be a JSON object")
+
+        try:
+            return await self.db.run(track_action(handler.__name__)(handler),
+                                     match, parse_qs(url.query), payload)
+        except QueryTimeout as err:
+            raise HTTPError(504, str(err))
+        except services.NotFound as err:
+            raise HTTPError(404, str(err))
+        except services.Conflict as err:
+            raise HTTPError(409, str(err))
+        except services.ServiceError as err:
+            raise HTTPError(400, str(err))
+        except PoolTimeout as err:
+            raise HTTPError(503, str(err))
+
+    async def respond(self, method, target, headers, body):
+        """
+        (status, payload) for one request, failures included. An unexpected
+        error is logged to stderr with its traceback; the client only gets a
+        generic 500, never the database's own message.
+        """
+        try:
+            return await self.handle_request(method, target, headers, body)
+        except HTTPError as err:
+            return err.status, {"error": str(err)}
+        except Exception:
+            print(f"{datetime.now().isoformat(timespec='seconds')} {method} {target} failed:", file=sys.stderr)
+            traceback.print_exc()
+            return 500, {"error": "Internal server error"}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version.upper() == "HTTP/1.1")
+                try:
+                    length = int(headers.get("content-length", "0") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {"error": "Invalid Content-Length"}, False)
+                    break
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {"error": "Request body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.respond(method.upper(), target, headers, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        if isinstance(payload, str):
+            data, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            data, content_type = json.dumps(payload, default=_json_default).encode("utf-8"), "application/json"
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    async def serve(self, host="127.0.0.1", port=8080):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"HRMS API listening on {addresses}")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the HR operations over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--query-timeout", type=float, default=30.0, help="seconds per request")
+    args = parser.parse_args()
+
+    from main import BACKEND, get_pool, open_process_extras
+    with get_pool().connection() as conn:
+        open_process_extras(conn)     # HRMS_DIRECTORY_SNAPSHOT / HRMS_TRIGRAM_INDEX / HRMS_LEAVE_ENGINE
+    db = AsyncPool(get_pool(), query_timeout=args.query_timeout, kill_connect=BACKEND.kill_connect)
+    api = APIServer(db, token=os.environ.get("HRMS_API_TOKEN"))
+    try:
+        asyncio.run(api.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("Shutting down.")
+    finally:
+        api.close()
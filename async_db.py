@@ -0,0 +1,284 @@
+import asyncio
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from db_pool import ConnectionPool, sqlite_connect
+
+# ---------------------------
+# ASYNC DATABASE LAYER
+# ---------------------------
+# asyncio front end over the (thread-safe, blocking) ConnectionPool. Each
+# statement runs on a worker thread sized to the pool, so a slow query holds
+# one worker and one connection while the event loop keeps serving others.
+#
+#   apool = AsyncPool(get_pool(), query_timeout=10)
+#   async with apool.connection() as conn:
+#       cursor = await conn.cursor(dictionary=True)
+#       await cursor.execute("SELECT * FROM employees WHERE emp_id = %s", (7,))
+#       row = await cursor.fetchone()
+#
+#   # or run any of the synchronous HR operations on a pooled connection
+#   emp = await apool.run(services.get_employee, 7)
+#
+# A statement that outlives its timeout (or whose task is cancelled) is
+# interrupted on the server and its connection is discarded, not reused.
+
+DEFAULT_QUERY_TIMEOUT = 30.0
+INTERRUPT_GRACE = 2.0       # seconds to wait for an interrupted statement to unwind
+
+
+class QueryTimeout(asyncio.TimeoutError):
+    """A statement did not finish within its timeout and was interrupted."""
+
+
+class AsyncPool:
+    def __init__(self, pool, query_timeout=DEFAULT_QUERY_TIMEOUT, kill_connect=None, workers=None):
+        """
+        `kill_connect` opens a side connection used to send KILL QUERY for
+        backends (MySQL) whose connections can't be interrupted in-process.
+        """
+        self.pool = pool
+        self.query_timeout = query_timeout
+        self.kill_connect = kill_connect
+        self._executor = ThreadPoolExecutor(max_workers=workers or pool.max_size,
+                                            thread_name_prefix="hrms-db")
+        self._slots = None
+
+    @property
+    def max_size(self):
+        return self.pool.max_size
+
+    def _semaphore(self):
+        # at most max_size tasks wait on the blocking pool, so workers never starve
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool.max_size)
+        return self._slots
+
+    async def acquire(self, timeout=None):
+        slots = self._semaphore()
+        await slots.acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            conn = await loop.run_in_executor(None, self.pool.acquire, timeout)
+        except BaseException:
+            slots.release()
+            raise
+        return AsyncConnection(self, conn)
+
+    def connection(self, timeout=None):
+        """`async with apool.connection() as conn:` - released (or discarded) on exit."""
+        return _Checkout(self, timeout)
+
+    async def run(self, fn, *args, timeout=None, **kwargs):
+        """Run fn(conn, *args, **kwargs) on a pooled connection; returns its result."""
+        async with self.connection() as conn:
+            return await conn.run(fn, *args, timeout=timeout, **kwargs)
+
+    def stats(self):
+        return self.pool.stats()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.pool.close()
+
+
+class _Checkout:
+    def __init__(self, apool, timeout):
+        self._apool = apool
+        self._timeout = timeout
+        self._conn = None
+
+    async def __aenter__(self):
+        self._conn = await self._apool.acquire(self._timeout)
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._conn.close()
+        return False
+
+
+class AsyncConnection:
+    """One pooled connection; statements on it run one at a time."""
+
+    def __init__(self, apool, conn):
+        self._apool = apool
+        self._conn = conn
+        self._lock = asyncio.Lock()
+        self._broken = False
+
+    @property
+    def sync(self):
+        """The underlying blocking connection (for use inside run())."""
+        return self._conn
+
+    def _interrupt(self):
+        raw = getattr(self._conn, "raw", self._conn)
+        if hasattr(raw, "interrupt"):
+            raw.interrupt()
+        elif self._apool.kill_connect and hasattr(raw, "connection_id"):
+            killer = self._apool.kill_connect()
+            try:
+                cursor = killer.cursor()
+                cursor.execute(f"KILL QUERY {int(raw.connection_id)}")
+                cursor.close()
+            finally:
+                killer.close()
+
+    async def _call(self, fn, *args, timeout=None):
+        timeout = self._apool.query_timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            if self._broken:
+                raise QueryTimeout("Connection was interrupted by an earlier timeout")
+            future = loop.run_in_executor(self._apool._executor, fn, *args)
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as err:
+                self._broken = True
+                future.add_done_callback(_consume)
+                await loop.run_in_executor(None, self._interrupt)
+                # let the worker come off the connection before it is dropped
+                await asyncio.wait([future], timeout=INTERRUPT_GRACE)
+                if isinstance(err, asyncio.CancelledError):
+                    raise
+                raise QueryTimeout(f"Query did not finish within {timeout}s") from None
+
+    async def run(self, fn, *args, timeout=None, **kwargs):
+        """Run the synchronous fn(conn, *args, **kwargs) on this connection."""
+        return await self._call(lambda: fn(self._conn, *args, **kwargs), timeout=timeout)
+
+    async def cursor(self, dictionary=False, **kwargs):
+        raw = await self._call(lambda: self._conn.cursor(dictionary=dictionary, **kwargs))
+        return AsyncCursor(self, raw)
+
+    async def execute(self, query, params=(), dictionary=True, timeout=None):
+        """Shortcut: run one statement and return all its rows."""
+        def work():
+            cursor = self._conn.cursor(dictionary=dictionary)
+            try:
+                cursor.execute(query, params)
+                return cursor.fetchall() if cursor.description else []
+            finally:
+                cursor.close()
+        return await self._call(work, timeout=timeout)
+
+    async def commit(self):
+        await self._call(self._conn.commit)
+
+    async def rollback(self):
+        await self._call(self._conn.rollback)
+
+    async def close(self):
+        """Hand the connection back to the pool, or drop it after an interrupt."""
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        try:
+            if self._broken:
+                conn.discard()
+            else:
+                conn.close()
+        finally:
+            self._apool._semaphore().release()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+        return False
+
+
+class AsyncCursor:
+    arraysize = 500
+
+    def __init__(self, conn, raw):
+        self._conn = conn
+        self._raw = raw
+
+    @property
+    def lastrowid(self):
+        return self._raw.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._raw.rowcount
+
+    @property
+    def description(self):
+        return self._raw.description
+
+    async def execute(self, query, params=(), timeout=None):
+        await self._conn._call(self._raw.execute, query, params, timeout=timeout)
+        return self
+
+    async def executemany(self, query, seq_of_params, timeout=None):
+        await self._conn._call(self._raw.executemany, query, seq_of_params, timeout=timeout)
+        return self
+
+    async def fetchone(self):
+        return await self._conn._call(self._raw.fetchone)
+
+    async def fetchmany(self, size=None):
+        return await self._conn._call(self._raw.fetchmany, size or self.arraysize)
+
+    async def fetchall(self):
+        return await self._conn._call(self._raw.fetchall)
+
+    async def close(self):
+        await self._conn._call(self._raw.close)
+
+    def __aiter__(self):
+        return self._rows()
+
+    async def _rows(self):
+        while True:
+            rows = await self.fetchmany()
+            if not rows:
+                return
+            for row in rows:
+                yield row
+
+
+def _consume(future):
+    # an interrupted statement's error is expected; don't log it as unretrieved
+    if not future.cancelled():
+        future.exception()
+
+
+# ---------------------------
+# FAKE BACKEND
+# ---------------------------
+
+def fake_pool(database=None, schema=None, query_timeout=DEFAULT_QUERY_TIMEOUT, **pool_kwargs):
+    """
+    AsyncPool over the SQLite stand-in, for running the HR operations without
+    a MySQL server. With no `database` a temporary file is used (removed by
+    close()); `schema` is an SQL script run once up front.
+    """
+    path = database
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix=".db", prefix="hrms_fake_")
+        os.close(fd)
+    connect = sqlite_connect(path, timeout=30)
+    if schema:
+        conn = connect()
+        try:
+            conn._conn.executescript(schema)
+            conn.commit()
+        finally:
+            conn.close()
+
+    apool = FakeAsyncPool(ConnectionPool(connect, **pool_kwargs), query_timeout=query_timeout)
+    apool.temp_path = None if database else path
+    return apool
+
+
+class FakeAsyncPool(AsyncPool):
+    temp_path = None
+
+    def close(self):
+        super().close()
+        if self.temp_path:
+            os.remove(self.temp_path)
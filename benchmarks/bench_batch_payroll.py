@@ -0,0 +1,41 @@
+"""
+Month-end batch payroll throughput on the SQLite stand-in.
+
+    python benchmarks/bench_batch_payroll.py [headcount] [chunk_size]
+"""
+import os
+import sys
+from datetime import date
+
+from fixtures import CountingConnection, create_schema, populate, temp_database
+
+from payroll_batch import compute_payroll, np, run_batch_payroll
+
+
+def run(headcount, chunk_size):
+    path = temp_database()
+    try:
+        conn = CountingConnection(path)
+        create_schema(conn)
+        populate(conn, employees=headcount, reviews_per_employee=0)
+
+        summary = run_batch_payroll(conn, date(2025, 1, 31), chunk_size)
+        rate = summary['rows_written'] / summary['seconds'] if summary['seconds'] else 0
+        print(f"{headcount} employees, chunk {chunk_size}, numpy={'yes' if np is not None else 'no'}")
+        print(f"  {summary['seconds']:.2f}s  {rate:,.0f} rows/s  {summary['chunks']} chunks  {conn.queries} queries")
+
+        # spot-check the batch against the single-employee rules
+        cursor = conn.cursor()
+        cursor.execute("SELECT basic_salary, hra, pf, insurance, net_salary FROM payroll ORDER BY emp_id LIMIT 1000")
+        for basic, *components in cursor.fetchall():
+            assert all(abs(a - b) < 1e-6 for a, b in zip(components, compute_payroll(basic)))
+        cursor.close()
+        conn.close()
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    headcount = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    run(headcount, chunk_size)
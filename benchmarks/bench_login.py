@@ -0,0 +1,73 @@
+"""
+Logins per second for each password hasher / cost, cold and via the session cache.
+
+    python benchmarks/bench_login.py [seconds_per_case]
+"""
+import sys
+import time
+
+from fixtures import CountingConnection, create_schema
+
+import passwords
+from login_register import authenticate
+
+CASES = [
+    passwords.LegacySha256Hasher(),
+    passwords.Pbkdf2Hasher(iterations=100000),
+    passwords.Pbkdf2Hasher(iterations=310000),
+    passwords.Pbkdf2Hasher(iterations=600000),
+    passwords.ScryptHasher(n=2 ** 14),
+    passwords.ScryptHasher(n=2 ** 15),
+]
+
+
+def rate(fn, seconds):
+    done = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        fn()
+        done += 1
+    return done / (time.perf_counter() - started)
+
+
+def describe(hasher):
+    if isinstance(hasher, passwords.Pbkdf2Hasher):
+        return f"pbkdf2_sha256 i={hasher.iterations}"
+    if isinstance(hasher, passwords.ScryptHasher):
+        return f"scrypt n=2^{hasher.n.bit_length() - 1} r={hasher.r}"
+    return "sha256 (legacy, unsalted)"
+
+
+def run(seconds):
+    conn = CountingConnection()
+    create_schema(conn)
+    cursor = conn.cursor()
+
+    print(f"{'hasher':<28} {'cold logins/s':>14} {'cached logins/s':>16} {'queries/cached':>15}")
+    for i, hasher in enumerate(CASES):
+        passwords.set_default_hasher(hasher)   # so cold logins measure verify, not upgrade
+        username = f"user{i}"
+        cursor.execute("INSERT INTO users (username, password_hash, role) VALUES (%s, %s, 'employee')",
+                       (username, hasher.hash("s3cret")))
+        conn.commit()
+
+        def cold():
+            passwords.forget_logins()
+            assert authenticate(conn, username, "s3cret")
+
+        def cached():
+            assert authenticate(conn, username, "s3cret")
+
+        cold_rate = rate(cold, seconds)
+        authenticate(conn, username, "s3cret")
+        conn.queries = 0
+        cached_rate = rate(cached, seconds)
+        print(f"{describe(hasher):<28} {cold_rate:>14,.1f} {cached_rate:>16,.0f} {conn.queries:>15}")
+
+    cursor.close()
+    conn.close()
+    passwords.set_default_hasher(passwords.Pbkdf2Hasher())
+
+
+if __name__ == "__main__":
+    run(float(sys.argv[1]) if len(sys.argv) > 1 else 1.0)
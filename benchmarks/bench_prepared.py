@@ -0,0 +1,102 @@
+"""
+Hot statements: a fresh plain cursor per call (previous path) vs. the
+prepared-statement registry.
+
+    python benchmarks/bench_prepared.py [calls]            # SQLite stand-in
+    python benchmarks/bench_prepared.py [calls] --mysql    # server in main.DB_CONFIG
+
+Both paths run exactly as the code does, on connections with the default
+settings. On SQLite both already reuse parsed statements through sqlite3's
+statement cache, so the difference there is only the per-call cursor and the
+dict rows; the parse / plan saving the registry exists for is MySQL's, so run
+with --mysql for the numbers that matter.
+"""
+import os
+import sys
+import time
+
+from fixtures import CountingConnection, create_schema, populate, temp_database
+
+import statements
+
+CASES = [
+    ("employee_by_id", lambda i, n: (i % n + 1,)),
+    ("reviews_for_employee", lambda i, n: (i % n + 1,)),
+    ("booked_leaves_between", lambda i, n: (i % n + 1, "2025-12-31", "2025-01-01")),
+    ("insert_leave", lambda i, n: (i % n + 1, "2025-03-03", "2025-03-04", "bench")),
+]
+
+
+def plain_call(conn, name, params):
+    """What each function did before: build a cursor, execute, read, close."""
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(statements.STATEMENTS[name], params)
+        return cursor.fetchall() if cursor.description else cursor.lastrowid
+    finally:
+        cursor.close()
+
+
+def registry_call(conn, name, params):
+    cursor = statements.execute(conn, name, params)
+    return cursor.fetchall() if cursor.description else cursor.lastrowid
+
+
+def timed(conn, fn, name, make_params, calls, headcount):
+    started = time.perf_counter()
+    for i in range(calls):
+        fn(conn, name, make_params(i, headcount))
+    elapsed = time.perf_counter() - started
+    conn.rollback()     # discard the benchmark's inserts
+    return elapsed / calls * 1e6
+
+
+def compare(plain_conn, registry_conn, calls, headcount):
+    print(f"{'statement':<24} {'plain us/call':>14} {'registry us/call':>17} {'saved':>7}")
+    for name, make_params in CASES:
+        before = timed(plain_conn, plain_call, name, make_params, calls, headcount)
+        after = timed(registry_conn, registry_call, name, make_params, calls, headcount)
+        print(f"{name:<24} {before:>14.1f} {after:>17.1f} {(1 - after / before) * 100:>6.0f}%")
+    print(f"prepared cursors created: {statements.counters['prepared']}, reused: {statements.counters['reused']}")
+
+
+def run_sqlite(calls, headcount=2000):
+    path = temp_database()
+    try:
+        setup = CountingConnection(path)
+        create_schema(setup)
+        populate(setup, employees=headcount)
+        setup.close()
+
+        plain_conn = CountingConnection(path)
+        registry_conn = CountingConnection(path)
+        print(f"SQLite stand-in, {headcount} employees, {calls} calls per statement")
+        compare(plain_conn, registry_conn, calls, headcount)
+        plain_conn.close()
+        registry_conn.close()
+    finally:
+        os.remove(path)
+
+
+def run_mysql(calls):
+    import mysql.connector
+    from main import DB_CONFIG
+    plain_conn = mysql.connector.connect(**DB_CONFIG)
+    registry_conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = plain_conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM employees")
+    headcount = cursor.fetchone()[0] or 1
+    cursor.close()
+    print(f"MySQL {DB_CONFIG['host']}/{DB_CONFIG['database']}, {headcount} employees, {calls} calls per statement")
+    compare(plain_conn, registry_conn, calls, headcount)
+    plain_conn.close()
+    registry_conn.close()
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    calls = int(args[0]) if args else 20000
+    if "--mysql" in sys.argv:
+        run_mysql(calls)
+    else:
+        run_sqlite(calls)
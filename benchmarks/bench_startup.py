@@ -0,0 +1,100 @@
+"""
+Cold-start cost of the CLI: what `import main` loads and how long it takes.
+
+    python benchmarks/bench_startup.py [--runs 15] [--top 15] [--budget-ms 60]
+
+Each run imports main in a fresh interpreter under `python -X importtime`
+and the per-module timings are the median over runs. The check fails (exit
+status 1) if importing main takes longer than the budget, or if any module
+that should load on first use (LAZY_MODULES) was imported at startup, so it
+can gate changes to the startup path.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded by the first connection or the first menu opened, never by startup.
+LAZY_MODULES = ("mysql.connector", "numpy", "feature", "login_register", "services", "migrations",
+                "payroll_batch", "payroll_rules", "review_analytics", "employee_history", "leave_engine")
+
+DEFAULT_BUDGET_MS = 60.0
+
+
+def import_once(env):
+    """({module: (self_us, cumulative_us)}, wall seconds) for one cold `import main`."""
+    code = "import main, sys; print(','.join(m for m in %r if m in sys.modules))" % (LAZY_MODULES,)
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=env,
+                          capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - started
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    loaded = [name for name in proc.stdout.strip().split(",") if name]
+    return timings, wall, loaded
+
+
+def interpreter_baseline(env, runs):
+    walls = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], cwd=ROOT, env=env, check=True)
+        walls.append(time.perf_counter() - started)
+    return statistics.median(walls)
+
+
+def run(runs, top):
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    subprocess.run([sys.executable, "-m", "compileall", "-q", ROOT], check=True)   # time imports, not compiles
+
+    per_module = defaultdict(list)
+    walls, loaded = [], set()
+    for _ in range(runs):
+        timings, wall, lazy_loaded = import_once(env)
+        walls.append(wall)
+        loaded.update(lazy_loaded)
+        for name, (self_us, cumulative_us) in timings.items():
+            per_module[name].append((self_us, cumulative_us))
+
+    medians = {name: (statistics.median(s for s, _ in samples), statistics.median(c for _, c in samples))
+               for name, samples in per_module.items()}
+    main_ms = medians.get("main", (0, 0))[1] / 1000
+    baseline = interpreter_baseline(env, runs)
+
+    print(f"{'module':<32} {'self ms':>8} {'cumulative ms':>14}")
+    for name, (self_us, cumulative_us) in sorted(medians.items(), key=lambda kv: -kv[1][1])[:top]:
+        print(f"{name:<32} {self_us / 1000:>8.2f} {cumulative_us / 1000:>14.2f}")
+    print(f"\nimport main: {main_ms:.1f} ms (median of {runs})")
+    print(f"process start to exit: {statistics.median(walls) * 1000:.1f} ms, bare interpreter {baseline * 1000:.1f} ms")
+    return main_ms, sorted(loaded)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report and check the CLI's import-time startup cost.")
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="fail if importing main takes longer (0 = report only)")
+    args = parser.parse_args()
+
+    main_ms, loaded = run(args.runs, args.top)
+    failed = False
+    if loaded:
+        print(f"FAIL: loaded at startup but should load on first use: {', '.join(loaded)}")
+        failed = True
+    if args.budget_ms and main_ms > args.budget_ms:
+        print(f"FAIL: import main took {main_ms:.1f} ms, budget {args.budget_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print("OK: within budget, nothing loaded early.")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,390 @@
+"""
+Every HR operation behind the menus, timed at scale on the SQLite stand-in.
+
+    python benchmarks/bench_suite.py [--employees 10000] [--iterations 200] [--only leave_]
+                                     [--database hrms_bench.db] [--json out.json] [--compare base.json]
+
+Each scenario calls the service-layer function that a feature.py menu option
+runs (the menu only adds input()/print() around it) against a generated
+dataset, and reports latency percentiles, statements sent per call and the
+peak Python memory allocated by one call. Write a run out with --json and
+pass it to --compare on a later commit to see the change per scenario; use
+the same --employees / --seed so both runs see the same data.
+
+--database keeps the generated file for reuse (generation dominates at large
+sizes); write scenarios add to it, so regenerate before comparing runs.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from fixtures import DEPARTMENTS, CountingConnection, create_schema, generate_dataset, temp_database
+
+import payroll_analytics
+import review_analytics
+import services
+from directory_snapshot import disable_directory_snapshot, enable_directory_snapshot, fresh_directory_snapshot
+from employee_cache import employee_rows
+from employee_listing import fetch_employee_page
+from employee_search import search_employees
+from review_summary import fetch_latest_rating_page
+
+MEMORY_SAMPLES = 5
+PERCENTILES = (50, 90, 99)
+MOVE_BATCH = 100            # generated applications job_move_bulk moves per call
+
+
+class Context:
+    """Dataset facts the scenarios draw their arguments from."""
+
+    def __init__(self, conn, seed):
+        self.conn = conn
+        self.rnd = random.Random(seed)
+        cursor = conn.cursor()
+        cursor.execute("SELECT MAX(emp_id) FROM employees")
+        self.max_emp_id = cursor.fetchone()[0] or 0
+        self.generated_max_emp_id = self.max_emp_id    # employee_add raises max_emp_id; these existed before it
+        cursor.execute("SELECT leave_id FROM leaves WHERE status = 'Pending' ORDER BY leave_id")
+        self.pending = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT job_id FROM job_openings ORDER BY job_id")
+        self.job_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT MIN(job_id) FROM job_openings WHERE status = 'Open'")
+        self.open_job = cursor.fetchone()[0]
+        self.applications = []  # opened by job_apply
+        cursor.execute("SELECT application_id FROM applications WHERE stage = 'Applied' ORDER BY application_id")
+        self.applied = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        self.rejected = 0       # ServiceError outcomes (e.g. overlapping leave)
+        self.snapshot_path = None   # set by run(): where employee_list_snapshot builds its snapshot
+
+    def emp_id(self):
+        return self.rnd.randint(1, self.max_emp_id)
+
+    def job_id(self):
+        return self.rnd.choice(self.job_ids)
+
+
+SCENARIOS = {}
+
+
+def scenario(fn):
+    SCENARIOS[fn.__name__] = fn
+    return fn
+
+
+# ---------------------------
+# SCENARIOS
+# ---------------------------
+
+@scenario
+def employee_list_page(ctx, i):
+    return fetch_latest_rating_page(ctx.conn, ctx.rnd.randrange(ctx.max_emp_id), 50)
+
+
+@scenario
+def employee_list_plain(ctx, i):
+    return fetch_employee_page(ctx.conn, ctx.rnd.randrange(ctx.max_emp_id), 50)
+
+
+@scenario
+def employee_list_snapshot(ctx, i):
+    snapshot = fresh_directory_snapshot(ctx.conn) or enable_directory_snapshot(ctx.conn, ctx.snapshot_path, rebuild=True)
+    return snapshot.page(ctx.rnd.randrange(ctx.max_emp_id), 50, ("emp_id", "first_name", "last_name", "salary"))
+
+
+@scenario
+def employee_search(ctx, i):
+    return search_employees(ctx.conn, name=f"First{ctx.rnd.randint(1, 99)}", department=ctx.rnd.choice(DEPARTMENTS))
+
+
+@scenario
+def employee_lookup(ctx, i):
+    employee_rows.clear()       # the database path, not the cache
+    emp_id = ctx.emp_id()
+    return services.get_employee(ctx.conn, emp_id), services.list_reviews(ctx.conn, emp_id)
+
+
+@scenario
+def employee_add(ctx, i):
+    employee = services.add_employee(ctx.conn, "Bench", f"Hire{i}", f"bench{i}@example.com", "",
+                                     ctx.rnd.choice(DEPARTMENTS), "Analyst", 40000)
+    ctx.max_emp_id = max(ctx.max_emp_id, employee['emp_id'])
+    return employee
+
+
+@scenario
+def employee_update(ctx, i):
+    return services.update_employee(ctx.conn, ctx.emp_id(), salary=float(ctx.rnd.randrange(5000, 200000, 500)))
+
+
+@scenario
+def employee_as_of(ctx, i):
+    return services.employee_as_of(ctx.conn, ctx.rnd.randint(1, ctx.generated_max_emp_id),
+                                   date(2026, 1, 1) + timedelta(days=ctx.rnd.randrange(0, 300)))
+
+
+@scenario
+def employee_dept_as_of(ctx, i):
+    return services.department_as_of(ctx.conn, ctx.rnd.choice(DEPARTMENTS),
+                                     date(2026, 1, 1) + timedelta(days=ctx.rnd.randrange(0, 300)))
+
+
+@scenario
+def leave_apply(ctx, i):
+    start = date(2026, 1, 5) + timedelta(days=ctx.rnd.randrange(0, 700))
+    try:
+        return services.apply_leave(ctx.conn, ctx.emp_id(), start, start + timedelta(days=2), "bench")
+    except services.ServiceError:
+        ctx.rejected += 1
+
+
+@scenario
+def leave_pending_list(ctx, i):
+    return services.list_pending_leaves(ctx.conn, department=ctx.rnd.choice(DEPARTMENTS), limit=50)
+
+
+@scenario
+def leave_approve(ctx, i):
+    if ctx.pending:
+        return services.set_leave_status(ctx.conn, ctx.pending.pop(), "Approved")
+
+
+@scenario
+def leave_balance(ctx, i):
+    return services.leave_balance(ctx.conn, ctx.emp_id(), 2024)
+
+
+@scenario
+def leave_calendar(ctx, i):
+    on_date = date(2024, 1, 1) + timedelta(days=ctx.rnd.randrange(0, 730))
+    return services.who_is_out(ctx.conn, on_date, ctx.rnd.choice(DEPARTMENTS))
+
+
+@scenario
+def payroll_calculate(ctx, i):
+    return services.calculate_payroll(ctx.conn, ctx.emp_id())
+
+
+@scenario
+def payroll_save(ctx, i):
+    return services.calculate_payroll(ctx.conn, ctx.emp_id(), save=True, generated_on=date(2026, 1, 28))
+
+
+@scenario
+def payroll_month_report(ctx, i):
+    return payroll_analytics.month_summary(ctx.conn, "2025-03")
+
+
+@scenario
+def payroll_trend(ctx, i):
+    return payroll_analytics.trend(ctx.conn, ctx.rnd.choice(DEPARTMENTS), 12, until="2025-12")
+
+
+@scenario
+def review_record(ctx, i):
+    return services.record_performance_review(ctx.conn, ctx.emp_id(), ctx.rnd.randint(1, 5), "bench")
+
+
+@scenario
+def review_view(ctx, i):
+    emp_id = ctx.emp_id()
+    return services.list_reviews(ctx.conn, emp_id), services.employee_review_stats(ctx.conn, emp_id)
+
+
+@scenario
+def review_distribution(ctx, i):
+    return review_analytics.rating_distribution(ctx.conn, date_from="2021-01", date_to="2023-12")
+
+
+@scenario
+def review_trend(ctx, i):
+    return review_analytics.rating_trend(ctx.conn, ctx.rnd.choice(DEPARTMENTS), 24, until="2023-12")
+
+
+@scenario
+def job_create(ctx, i):
+    job = services.add_job_opening(ctx.conn, f"Bench role {i}", 55000, "9-5")
+    ctx.job_ids.append(job['job_id'])
+    return job
+
+
+@scenario
+def job_list(ctx, i):
+    return services.list_job_openings(ctx.conn, status="Open", after_job_id=ctx.rnd.randrange(len(ctx.job_ids)),
+                                      limit=50)
+
+
+@scenario
+def job_list_salary(ctx, i):
+    low = ctx.rnd.randrange(20000, 200000, 1000)
+    return services.list_job_openings(ctx.conn, min_salary=low, max_salary=low + 20000, limit=50)
+
+
+@scenario
+def job_apply(ctx, i):
+    candidate = services.add_candidate(ctx.conn, "Bench", f"Candidate{i}", f"cand{i}@example.com")
+    application = services.apply_for_job(ctx.conn, candidate['candidate_id'], ctx.open_job)
+    ctx.applications.append(application['application_id'])
+    return application
+
+
+@scenario
+def job_move_bulk(ctx, i):
+    # MOVE_BATCH generated applicants Applied -> Screening per call
+    batch, ctx.applied = ctx.applied[:MOVE_BATCH], ctx.applied[MOVE_BATCH:]
+    return services.move_applications(ctx.conn, batch, "Screening")
+
+
+@scenario
+def job_get(ctx, i):
+    return services.get_job_opening(ctx.conn, ctx.job_id())
+
+
+@scenario
+def job_update(ctx, i):
+    return services.update_job_opening(ctx.conn, ctx.job_id(), salary_offered=ctx.rnd.randrange(20000, 250000, 1000))
+
+
+# ---------------------------
+# HARNESS
+# ---------------------------
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def measure(ctx, fn, iterations):
+    fn(ctx, -1)                 # warm-up: prepared statements, caches, page cache
+    conn = ctx.conn
+    conn.queries = 0
+    timings = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        fn(ctx, i)
+        timings.append(time.perf_counter() - started)
+    queries = conn.queries / iterations
+
+    # separate pass: tracemalloc slows calls down too much to time them under it
+    tracemalloc.start()
+    peak = 0
+    for i in range(MEMORY_SAMPLES):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        fn(ctx, iterations + i)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    timings.sort()
+    result = {f"p{pct}_ms": percentile(timings, pct) * 1000 for pct in PERCENTILES}
+    result.update(mean_ms=sum(timings) / len(timings) * 1000, max_ms=timings[-1] * 1000,
+                  queries=queries, peak_kib=peak / 1024)
+    return result
+
+
+def run(args):
+    path = args.database or temp_database()
+    reuse = bool(args.database) and os.path.exists(path) and os.path.getsize(path) > 0
+    try:
+        conn = CountingConnection(path)
+        if reuse:
+            print(f"Reusing {path}")
+        else:
+            started = time.perf_counter()
+            create_schema(conn)
+            generate_dataset(conn, employees=args.employees, leaves_per_employee=args.leaves,
+                             reviews_per_employee=args.reviews, payroll_months=args.payroll_months,
+                             job_openings=args.jobs, candidates=args.candidates, seed=args.seed)
+            print(f"Generated {args.employees} employees in {time.perf_counter() - started:.1f}s")
+
+        ctx = Context(conn, args.seed)
+        ctx.snapshot_path = path + ".snap"
+        names = [name for name in SCENARIOS if not args.only or any(name.startswith(p) for p in args.only)]
+        # every call (warm-up and memory samples included) moves its own batch
+        needed = MOVE_BATCH * (args.iterations + 1 + MEMORY_SAMPLES)
+        if "job_move_bulk" in names and len(ctx.applied) < needed:
+            names.remove("job_move_bulk")
+            print(f"(job_move_bulk skipped: needs {needed} Applied applications, have {len(ctx.applied)};"
+                  f" raise --candidates)")
+        print(f"{'scenario':<22} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'queries':>8} {'peak KiB':>9}")
+        results = {}
+        for name in names:
+            r = results[name] = measure(ctx, SCENARIOS[name], args.iterations)
+            print(f"{name:<22} {r['p50_ms']:>8.3f} {r['p90_ms']:>8.3f} {r['p99_ms']:>8.3f} {r['max_ms']:>8.2f}"
+                  f" {r['queries']:>8.1f} {r['peak_kib']:>9.1f}")
+        if ctx.rejected:
+            print(f"({ctx.rejected} leave requests rejected as overlapping)")
+        conn.close()
+    finally:
+        disable_directory_snapshot()
+        for leftover in (path + ".snap", path + ".snap.lock"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        if not args.database:
+            os.remove(path)
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mib = rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    print(f"Process peak RSS: {rss_mib:.1f} MiB")
+    return {"commit": _git_commit(), "python": platform.python_version(), "peak_rss_mib": rss_mib,
+            "params": {k: getattr(args, k) for k in ("employees", "leaves", "reviews", "payroll_months",
+                                                     "jobs", "candidates", "iterations", "seed")},
+            "results": results}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, current):
+    print(f"\nAgainst {baseline.get('commit') or 'baseline'} -> {current.get('commit') or 'this run'}")
+    if baseline.get("params") != current.get("params"):
+        print("Note: runs used different parameters; deltas are not like for like.")
+    print(f"{'scenario':<22} {'p50 before':>11} {'p50 now':>9} {'change':>8} {'queries':>13}")
+    for name, now in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<22} {'-':>11} {now['p50_ms']:>9.3f}")
+            continue
+        change = (now['p50_ms'] / before['p50_ms'] - 1) * 100 if before['p50_ms'] else 0.0
+        queries = f"{before['queries']:.1f} -> {now['queries']:.1f}"
+        print(f"{name:<22} {before['p50_ms']:>11.3f} {now['p50_ms']:>9.3f} {change:>+7.0f}% {queries:>13}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark every HR operation on generated data.")
+    parser.add_argument("--employees", type=int, default=10000)
+    parser.add_argument("--leaves", type=int, default=4, help="leave requests per employee")
+    parser.add_argument("--reviews", type=int, default=3, help="performance reviews per employee")
+    parser.add_argument("--payroll-months", type=int, default=6)
+    parser.add_argument("--jobs", type=int, default=500, help="job openings")
+    parser.add_argument("--candidates", type=int, default=25000, help="candidates, one Applied application each")
+    parser.add_argument("--iterations", type=int, default=200, help="timed calls per scenario")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="*", help="scenario name prefixes to run")
+    parser.add_argument("--database", help="keep / reuse the generated SQLite file at this path")
+    parser.add_argument("--json", help="write the results here")
+    parser.add_argument("--compare", help="results file of an earlier run to compare against")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            compare(json.load(fh), results)
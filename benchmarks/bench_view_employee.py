@@ -0,0 +1,68 @@
+"""
+Employee list with latest rating: old N+1 path vs. single set-based query.
+
+    python benchmarks/bench_view_employee.py [headcount ...]
+"""
+import os
+import sys
+import time
+
+from fixtures import CountingConnection, create_schema, populate, temp_database
+
+from review_summary import fetch_employees_with_latest_rating, rebuild_latest_reviews
+
+
+def n_plus_one(conn):
+    """The listing as view_employee used to do it: one query per employee."""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("SELECT emp_id, first_name, last_name, job_title, department, salary FROM employees ORDER BY emp_id")
+    employees = cursor.fetchall()
+    rows = []
+    for emp in employees:
+        cursor.execute("""
+            SELECT rating, review_date
+            FROM performance_reviews
+            WHERE emp_id = %s
+            ORDER BY review_date DESC, review_id DESC
+            LIMIT 1
+        """, (emp['emp_id'],))
+        rows.append((emp, cursor.fetchone()))
+    cursor.close()
+    return rows
+
+
+def measure(conn, label, fn):
+    conn.queries = 0
+    started = time.perf_counter()
+    rows = fn(conn)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"  {label:<28} {len(rows):>8} rows  {conn.queries:>8} queries  {elapsed:>10.1f} ms")
+    return rows
+
+
+def run(headcount):
+    path = temp_database()
+    try:
+        conn = CountingConnection(path)
+        create_schema(conn)
+        populate(conn, employees=headcount)
+        rebuild_latest_reviews(conn)
+
+        print(f"\n{headcount} employees")
+        old = measure(conn, "N+1 (previous)", n_plus_one)
+        window = measure(conn, "window function", lambda c: fetch_employees_with_latest_rating(c, use_summary=False))
+        summary = measure(conn, "summary table join", fetch_employees_with_latest_rating)
+
+        # all three paths must agree on every employee's latest rating
+        expected = [latest['rating'] if latest else None for _, latest in old]
+        assert expected == [r['latest_rating'] for r in window]
+        assert expected == [r['latest_rating'] for r in summary]
+        conn.close()
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 50000]
+    for size in sizes:
+        run(size)
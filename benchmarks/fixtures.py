@@ -0,0 +1,153 @@
+import os
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+
+# Make the project modules importable when running `python benchmarks/<script>.py`
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from db_pool import SQLiteConnection  # noqa: E402
+from storage import create_sqlite_schema  # noqa: E402
+
+DEPARTMENTS = ["Sales", "HR", "Engineering", "Finance", "Support", "Marketing"]
+TITLES = ["Associate", "Analyst", "Engineer", "Manager", "Lead", "Director"]
+
+
+class CountingConnection(SQLiteConnection):
+    """SQLiteConnection that counts every statement sent to the database."""
+
+    def __init__(self, database=":memory:", **kwargs):
+        super().__init__(database, **kwargs)
+        self.queries = 0
+
+    def cursor(self, dictionary=False, **_ignored):
+        cursor = super().cursor(dictionary=dictionary)
+        owner = self
+        execute, executemany = cursor.execute, cursor.executemany
+
+        def counted_execute(query, params=()):
+            owner.queries += 1
+            return execute(query, params)
+
+        def counted_executemany(query, seq_of_params):
+            owner.queries += 1
+            return executemany(query, seq_of_params)
+
+        cursor.execute = counted_execute
+        cursor.executemany = counted_executemany
+        return cursor
+
+
+def temp_database():
+    """Return a path to a fresh on-disk SQLite file (removed by the caller)."""
+    fd, path = tempfile.mkstemp(suffix=".db", prefix="hrms_bench_")
+    os.close(fd)
+    return path
+
+
+def create_schema(conn):
+    """Same tables as the embedded SQLite backend (storage.py)."""
+    create_sqlite_schema(conn)
+
+
+def populate(conn, employees=1000, reviews_per_employee=3, seed=42):
+    """Insert synthetic employees and performance reviews."""
+    rnd = random.Random(seed)
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT INTO employees (first_name, last_name, email, phone, department, job_title, salary) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+        [
+            (f"First{i}", f"Last{i}", f"user{i}@example.com", f"+1-555-{i:07d}",
+             rnd.choice(DEPARTMENTS), rnd.choice(TITLES), float(rnd.randrange(5000, 200000, 500)))
+            for i in range(1, employees + 1)
+        ],
+    )
+    start = date(2020, 1, 1)
+    cursor.executemany(
+        "INSERT INTO performance_reviews (emp_id, review_date, rating, comments) VALUES (%s, %s, %s, %s)",
+        [
+            (emp_id, start + timedelta(days=rnd.randrange(0, 1500)), rnd.randint(1, 5), "synthetic")
+            for emp_id in range(1, employees + 1)
+            for _ in range(reviews_per_employee)
+        ],
+    )
+    conn.commit()
+    cursor.close()
+
+
+LEAVE_STATUSES = ["Approved", "Approved", "Pending", "Rejected"]
+WORK_HOURS = ["9-5", "10-6", "Shifts", "Flexible"]
+
+
+def generate_dataset(conn, employees=1000, leaves_per_employee=4, reviews_per_employee=3,
+                     payroll_months=6, job_openings=200, candidates=0, seed=42):
+    """
+    Fill every HR table with synthetic data at the given scale, then build the
+    derived tables the application expects. Same seed, same data.
+    """
+    # imported here so the light benchmarks don't pull in the whole service layer
+    import payroll_analytics
+    import review_analytics
+    from payroll_batch import compute_payroll_batch
+    from review_summary import rebuild_latest_reviews
+
+    populate(conn, employees=employees, reviews_per_employee=reviews_per_employee, seed=seed)
+    rnd = random.Random(seed + 1)
+    cursor = conn.cursor()
+
+    # non-overlapping leaves: each employee's requests fall in distinct fortnights
+    first = date(2024, 1, 1)
+    slots = max(leaves_per_employee, 52)
+    leaves = []
+    for emp_id in range(1, employees + 1):
+        for slot in rnd.sample(range(slots), leaves_per_employee):
+            start = first + timedelta(days=slot * 14 + rnd.randrange(0, 7))
+            leaves.append((emp_id, start, start + timedelta(days=rnd.randrange(0, 5)),
+                           "synthetic", rnd.choice(LEAVE_STATUSES)))
+    cursor.executemany(
+        "INSERT INTO leaves (emp_id, start_date, end_date, reason, status) VALUES (%s, %s, %s, %s, %s)", leaves)
+
+    cursor.execute("SELECT emp_id, salary FROM employees ORDER BY emp_id")
+    staff = cursor.fetchall()
+    basics = [float(salary) for _, salary in staff]
+    hra, pf, insurance, net = compute_payroll_batch(basics)
+    for month in range(payroll_months):
+        run_date = date(2025 + month // 12, month % 12 + 1, 28)
+        cursor.executemany(
+            "INSERT INTO payroll (emp_id, basic_salary, hra, pf, insurance, net_salary, generated_on) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+            [(emp_id, *amounts, run_date)
+             for (emp_id, _), *amounts in zip(staff, basics, hra, pf, insurance, net)],
+        )
+
+    cursor.executemany(
+        "INSERT INTO job_openings (title, salary_offered, work_hours, status) VALUES (%s, %s, %s, %s)",
+        [(f"{rnd.choice(TITLES)} {rnd.choice(DEPARTMENTS)} #{i}", float(rnd.randrange(20000, 250000, 1000)),
+          rnd.choice(WORK_HOURS), rnd.choice(["Open", "Open", "Closed"]))
+         for i in range(1, job_openings + 1)],
+    )
+
+    # each candidate applies to one open job; everyone starts in Applied
+    cursor.execute("SELECT job_id FROM job_openings WHERE status = 'Open' ORDER BY job_id")
+    open_jobs = [row[0] for row in cursor.fetchall()]
+    if candidates and open_jobs:
+        stamp = "2026-01-05 09:00:00"
+        cursor.executemany(
+            "INSERT INTO candidates (first_name, last_name, email, phone, created_at) VALUES (%s, %s, %s, %s, %s)",
+            [(f"Cand{i}", f"Last{i}", f"cand{i}@example.com", "", stamp) for i in range(1, candidates + 1)],
+        )
+        cursor.executemany(
+            "INSERT INTO applications (job_id, candidate_id, stage, applied_at, stage_changed_at) "
+            "VALUES (%s, %s, 'Applied', %s, %s)",
+            [(rnd.choice(open_jobs), i, stamp, stamp) for i in range(1, candidates + 1)],
+        )
+    conn.commit()
+    cursor.close()
+
+    rebuild_latest_reviews(conn)
+    payroll_analytics.rebuild_rollups(conn)
+    review_analytics.rebuild_rollups(conn)
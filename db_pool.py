@@ -0,0 +1,434 @@
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import date, datetime
+
+# ---------------------------
+# CONNECTION POOL
+# ---------------------------
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out before the timeout."""
+
+
+class PoolClosed(Exception):
+    """Raised when a connection is requested from a pool that was closed."""
+
+
+def default_health_check(raw):
+    """Return True if the raw connection still answers (mysql.connector pings here)."""
+    check = getattr(raw, "is_connected", None)
+    if check is None:
+        return True
+    return check()
+
+
+class _Entry:
+    __slots__ = ("raw", "created_at", "last_used", "state")
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        # Per physical connection, kept across checkouts (e.g. the prepared
+        # cursors of statements.py). Values with a close() method are closed
+        # when the pool closes the connection.
+        self.state = {}
+
+
+class PooledConnection:
+    """
+    Thin proxy handed out by the pool. Everything is delegated to the real
+    connection except close(), which hands the connection back to the pool.
+    """
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+
+    @property
+    def raw(self):
+        if self._entry is None:
+            raise PoolClosed("Connection was already returned to the pool.")
+        return self._entry.raw
+
+    @property
+    def connection_state(self):
+        """Dict that lives as long as the pooled physical connection (see _Entry.state)."""
+        if self._entry is None:
+            raise PoolClosed("Connection was already returned to the pool.")
+        return self._entry.state
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+    def is_connected(self):
+        if self._entry is None:
+            return False
+        return default_health_check(self._entry.raw)
+
+    def close(self):
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool._release(entry)
+
+    def discard(self):
+        """Drop the underlying connection instead of returning it to the pool."""
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool._release(entry, broken=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of DB-API connections.
+
+    connect       -- zero-argument callable returning a new raw connection
+    max_size      -- hard cap on open connections (idle + checked out)
+    min_size      -- connections opened eagerly by prefill()
+    timeout       -- seconds acquire() waits for a free slot before PoolTimeout
+    max_idle      -- idle connections older than this are closed (None = never)
+    max_lifetime  -- connections older than this are recycled (None = never)
+    health_check  -- callable(raw) -> bool run before handing out an idle connection
+    """
+
+    def __init__(self, connect, max_size=10, min_size=0, timeout=5.0,
+                 max_idle=300.0, max_lifetime=3600.0, health_check=default_health_check):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._connect = connect
+        self.max_size = max_size
+        self.min_size = min(min_size, max_size)
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.health_check = health_check
+
+        self._idle = deque()
+        self._open = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+
+        self._metrics = {
+            "checkouts": 0,
+            "created": 0,
+            "closed": 0,
+            "recycled": 0,
+            "evicted_idle": 0,
+            "failed_health_checks": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "wait_seconds": 0.0,
+            "checkout_seconds": 0.0,
+        }
+
+    # -- public API ----------------------------------------------------------
+
+    def prefill(self):
+        """Open connections until min_size are available."""
+        while True:
+            with self._cond:
+                if self._closed or self._open >= self.min_size:
+                    return
+                self._open += 1
+            entry = self._create()
+            with self._cond:
+                self._idle.append(entry)
+                self._cond.notify()
+
+    def acquire(self, timeout=None):
+        """Check out a connection, waiting up to `timeout` seconds for a free slot."""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        waited = False
+
+        while True:
+            stale = []
+            entry = None
+            create = False
+            with self._cond:
+                if self._closed:
+                    raise PoolClosed("Connection pool is closed.")
+                stale = self._evict_locked()
+                if self._idle:
+                    entry = self._idle.pop()
+                elif self._open < self.max_size:
+                    self._open += 1
+                    create = True
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._metrics["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"No database connection available within {timeout}s "
+                            f"(pool size {self.max_size})."
+                        )
+                    if not waited:
+                        waited = True
+                        self._metrics["waits"] += 1
+                    self._cond.wait(remaining)
+                    continue
+
+            self._close_raw_all(stale)
+
+            if create:
+                try:
+                    entry = self._create()
+                except Exception:
+                    with self._cond:
+                        self._open -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._healthy(entry):
+                self._drop(entry, "failed_health_checks")
+                continue
+
+            elapsed = time.monotonic() - started
+            with self._cond:
+                self._metrics["checkouts"] += 1
+                self._metrics["checkout_seconds"] += elapsed
+                if waited:
+                    self._metrics["wait_seconds"] += elapsed
+            return PooledConnection(self, entry)
+
+    def connection(self, timeout=None):
+        """Alias of acquire() that reads well in `with pool.connection() as conn:`."""
+        return self.acquire(timeout)
+
+    def stats(self):
+        """Return a snapshot of pool counters and current occupancy."""
+        with self._cond:
+            snapshot = dict(self._metrics)
+            snapshot["open"] = self._open
+            snapshot["idle"] = len(self._idle)
+            snapshot["in_use"] = self._open - len(self._idle)
+            snapshot["max_size"] = self.max_size
+        checkouts = snapshot["checkouts"]
+        snapshot["avg_checkout_ms"] = (snapshot["checkout_seconds"] / checkouts * 1000.0) if checkouts else 0.0
+        return snapshot
+
+    def close(self):
+        """Close idle connections and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+            self._metrics["closed"] += len(idle)
+            self._cond.notify_all()
+        self._close_raw_all(idle)
+
+    # -- internals -----------------------------------------------------------
+
+    def _create(self):
+        raw = self._connect()
+        with self._cond:
+            self._metrics["created"] += 1
+        return _Entry(raw)
+
+    def _healthy(self, entry):
+        if self.health_check is None:
+            return True
+        try:
+            return bool(self.health_check(entry.raw))
+        except Exception:
+            return False
+
+    def _expired(self, entry, now):
+        if self.max_lifetime is not None and now - entry.created_at >= self.max_lifetime:
+            return "recycled"
+        if self.max_idle is not None and now - entry.last_used >= self.max_idle:
+            return "evicted_idle"
+        return None
+
+    def _evict_locked(self):
+        """Remove expired idle entries (caller holds the lock); return them for closing."""
+        if not self._idle:
+            return []
+        now = time.monotonic()
+        keep = deque()
+        stale = []
+        for entry in self._idle:
+            reason = self._expired(entry, now)
+            if reason:
+                self._metrics[reason] += 1
+                stale.append(entry)
+            else:
+                keep.append(entry)
+        if stale:
+            self._idle = keep
+            self._open -= len(stale)
+            self._metrics["closed"] += len(stale)
+            self._cond.notify(len(stale))
+        return stale
+
+    def _release(self, entry, broken=False):
+        if not broken:
+            try:
+                # never leak an open transaction to the next borrower
+                entry.raw.rollback()
+            except Exception:
+                broken = True
+
+        now = time.monotonic()
+        if not broken and self._expired(entry, now) == "recycled":
+            self._drop(entry, "recycled")
+            return
+        if broken:
+            self._drop(entry, "failed_health_checks")
+            return
+
+        with self._cond:
+            if self._closed:
+                self._open -= 1
+                self._metrics["closed"] += 1
+                close_it = True
+            else:
+                entry.last_used = now
+                self._idle.append(entry)
+                close_it = False
+            self._cond.notify()
+        if close_it:
+            self._close_raw_all([entry])
+
+    def _drop(self, entry, reason):
+        with self._cond:
+            self._open -= 1
+            self._metrics[reason] += 1
+            self._metrics["closed"] += 1
+            self._cond.notify()
+        self._close_raw_all([entry])
+
+    @staticmethod
+    def _close_raw_all(entries):
+        for entry in entries:
+            for value in entry.state.values():
+                close = getattr(value, "close", None)
+                if close is not None:
+                    try:
+                        close()
+                    except Exception:
+                        pass
+            entry.state.clear()
+            try:
+                entry.raw.close()
+            except Exception:
+                pass
+
+
+# ---------------------------
+# SQLITE STAND-IN (offline testing)
+# ---------------------------
+
+sqlite3.register_adapter(date, lambda d: d.isoformat())
+sqlite3.register_adapter(datetime, lambda d: d.isoformat(" "))
+
+
+def _dict_row(cursor, row):
+    return {col[0]: row[i] for i, col in enumerate(cursor.description)}
+
+
+class SQLiteCursor:
+    """Cursor adapter accepting mysql.connector-style `%s` placeholders."""
+
+    dialect = "sqlite"      # see storage.dialect_of
+
+    def __init__(self, raw_cursor, dictionary=False):
+        self._cursor = raw_cursor
+        if dictionary:
+            self._cursor.row_factory = _dict_row
+
+    @staticmethod
+    def _sql(query):
+        return query.replace("%s", "?")
+
+    def execute(self, query, params=()):
+        self._cursor.execute(self._sql(query), tuple(params or ()))
+        return self
+
+    def executemany(self, query, seq_of_params):
+        self._cursor.executemany(self._sql(query), seq_of_params)
+        return self
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=None):
+        if size is None:
+            return self._cursor.fetchmany()
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+
+class SQLiteConnection:
+    """
+    Minimal mysql.connector look-alike over sqlite3 so the pool and the HR
+    functions can run without a MySQL server.
+    """
+
+    dialect = "sqlite"      # see storage.dialect_of
+
+    def __init__(self, database=":memory:", **kwargs):
+        kwargs.setdefault("check_same_thread", False)
+        self._conn = sqlite3.connect(database, **kwargs)
+        self._open = True
+
+    def cursor(self, dictionary=False, **_ignored):
+        return SQLiteCursor(self._conn.cursor(), dictionary=dictionary)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def start_transaction(self):
+        """BEGIN IMMEDIATE: take the database write lock now instead of at the first write."""
+        if not self._conn.in_transaction:
+            self._conn.execute("BEGIN IMMEDIATE")
+
+    def is_connected(self):
+        return self._open
+
+    def interrupt(self):
+        """Abort the statement running on this connection (from another thread)."""
+        self._conn.interrupt()
+
+    def close(self):
+        if self._open:
+            self._open = False
+            self._conn.close()
+
+
+def sqlite_connect(database=":memory:", **kwargs):
+    """Return a connect() callable producing SQLiteConnection objects for a pool."""
+    return lambda: SQLiteConnection(database, **kwargs)
@@ -0,0 +1,452 @@
+"""
+Shared, memory-mapped snapshot of the employee directory.
+
+    python directory_snapshot.py build [--path hrms_directory.snap]
+    python directory_snapshot.py stats [--path hrms_directory.snap]
+"""
+import argparse
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from employee_listing import DEFAULT_PAGE_SIZE, stream_employees
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers in one process only
+    fcntl = None
+
+# ---------------------------
+# DIRECTORY SNAPSHOT
+# ---------------------------
+# The directory (one row per employee) laid out column by column in a file
+# that every CLI process on the host maps read/write and shares through the
+# page cache: no per-process copy, no per-row Python objects until a row is
+# actually read. Numbers live in typed columns (native byte order, so the file
+# is host-local); the text columns hold (offset, length) pairs into a UTF-8
+# heap. Rows are kept sorted by emp_id, so lookups and keyset pages are a
+# bisect over the emp_id column.
+#
+# Writes (add_employee / update_employee via note_directory) patch the file in
+# place under an exclusive lock on <path>.lock. Changed text is appended to
+# the heap; when rows or heap run out of room the file is rewritten at twice
+# the size (compacting the heap), renamed over the old one, and the old one
+# is marked superseded so processes still mapping it switch over.
+#
+# Readers never lock: the header carries a sequence number that a writer
+# makes odd while it works and even when done (a seqlock), and a read that
+# saw it odd or changing is simply retried.
+#
+# Writes made elsewhere (another host, a process without the snapshot, a
+# bulk import) never reach the file, so the header is also stamped with the
+# database state it reflects: MAX(emp_id) and MAX(history_id), one index
+# probe each, so the check costs the same however long the history grows.
+# fresh_directory_snapshot() compares the stamp with the
+# database and rebuilds the file when they differ. A write made here advances
+# the stamp only if the file was current just before it; otherwise the stamp
+# is left behind and the next read rebuilds.
+
+MAGIC = b"HRDS"
+FORMAT_VERSION = 2
+# magic, version, seq, count, capacity, heap_used, heap_capacity, superseded, max_emp_id, max_history_id
+HEADER = struct.Struct("<4sIQIIIIIQQ")
+HEADER_SIZE = 64
+
+NUMBER_COLUMNS = (("salary", "d"), ("emp_id", "i"), ("user_id", "i"))
+TEXT_COLUMNS = ("first_name", "last_name", "department", "job_title")
+SNAPSHOT_COLUMNS = ("emp_id", "user_id", "first_name", "last_name", "department", "job_title", "salary")
+
+MIN_CAPACITY = 1024
+MIN_HEAP = 64 * 1024
+
+DB_MARK = ("SELECT (SELECT MAX(emp_id) FROM employees) AS max_emp_id, "
+           "(SELECT MAX(history_id) FROM employee_history) AS max_history_id")
+
+
+def db_mark(conn):
+    """(MAX(emp_id), MAX(history_id)): the database state a snapshot is stamped with."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(DB_MARK)
+        max_emp_id, max_history_id = cursor.fetchone()
+    finally:
+        cursor.close()
+    return int(max_emp_id or 0), int(max_history_id or 0)
+
+
+def _layout(capacity):
+    """{section: (offset, typecode)} for a file holding `capacity` rows; and the heap offset."""
+    sections, offset = {}, HEADER_SIZE
+    for name, typecode in NUMBER_COLUMNS:
+        sections[name] = (offset, typecode)
+        offset += capacity * array(typecode).itemsize
+    for name in TEXT_COLUMNS:
+        for part in ("off", "len"):
+            sections[f"{name}.{part}"] = (offset, "I")
+            offset += capacity * array("I").itemsize
+    return sections, offset
+
+
+def _capacity_for(rows):
+    return max(MIN_CAPACITY, -(-rows * 2 // 8) * 8)
+
+
+def _encode(value):
+    return b"" if value is None else str(value).encode("utf-8")
+
+
+def write_snapshot(path, rows, capacity=None, heap_capacity=None, mark=(0, 0)):
+    """Write `rows` (dicts, sorted by emp_id) stamped with db_mark `mark` as a fresh snapshot file at `path`, atomically."""
+    columns = {name: array(typecode) for name, typecode in NUMBER_COLUMNS}
+    text = {f"{name}.{part}": array("I") for name in TEXT_COLUMNS for part in ("off", "len")}
+    heap = bytearray()
+    for row in rows:
+        salary = row.get('salary')
+        columns['salary'].append(math.nan if salary is None else float(salary))
+        columns['emp_id'].append(int(row['emp_id']))
+        columns['user_id'].append(int(row.get('user_id') or 0))
+        for name in TEXT_COLUMNS:
+            data = _encode(row.get(name))
+            text[f"{name}.off"].append(len(heap))
+            text[f"{name}.len"].append(len(data))
+            heap += data
+    count = len(columns['emp_id'])
+    capacity = max(capacity or 0, _capacity_for(count))
+    heap_capacity = max(heap_capacity or 0, MIN_HEAP, len(heap) * 2)
+    sections, heap_offset = _layout(capacity)
+    columns.update(text)
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.truncate(heap_offset + heap_capacity)
+        fh.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, count, capacity, len(heap), heap_capacity, 0, *mark))
+        for name, (offset, _) in sections.items():
+            fh.seek(offset)
+            columns[name].tofile(fh)
+        fh.seek(heap_offset)
+        fh.write(heap)
+    os.replace(tmp, path)
+
+
+class DirectorySnapshot:
+    """One process's mapping of the snapshot file at `path`."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()       # this process's writers; other processes use the lock file
+        self._map()
+
+    # -- mapping --------------------------------------------------------
+
+    def _map(self):
+        with open(self.path, "r+b") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0)
+        magic, version, _, _, capacity, _, heap_capacity, _, _, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"{self.path} is not a directory snapshot (version {FORMAT_VERSION})")
+        self.capacity = capacity
+        sections, self._heap_offset = _layout(capacity)
+        self._offsets = {name: offset for name, (offset, _) in sections.items()}
+        buffer = memoryview(self._mm)
+        self._views = {name: buffer[offset:offset + capacity * array(typecode).itemsize].cast(typecode)
+                       for name, (offset, typecode) in sections.items()}
+        self._views['heap'] = buffer[self._heap_offset:self._heap_offset + heap_capacity]
+        self._buffer = buffer
+
+    def close(self):
+        for view in self._views.values():
+            view.release()
+        self._buffer.release()
+        self._mm.close()
+
+    def _header(self):
+        # (seq, count, heap_used, heap_capacity, superseded)
+        _, _, seq, count, _, heap_used, heap_capacity, superseded, _, _ = HEADER.unpack_from(self._mm, 0)
+        return seq, count, heap_used, heap_capacity, superseded
+
+    def _stamp(self):
+        return HEADER.unpack_from(self._mm, 0)[8:10]
+
+    def _set_header(self, seq, count, heap_used, superseded=0, mark=None):
+        HEADER.pack_into(self._mm, 0, MAGIC, FORMAT_VERSION, seq, count, self.capacity, heap_used,
+                         len(self._views['heap']), superseded, *(mark or self._stamp()))
+
+    def _read(self, fn):
+        """Run fn(count) against a consistent state of the file (seqlock read)."""
+        while True:
+            seq, count, _, _, superseded = self._header()
+            if superseded:
+                with self._lock:
+                    if self._header()[4]:
+                        self.close()
+                        self._map()
+                continue
+            if seq % 2:
+                time.sleep(0)
+                continue
+            try:
+                result = fn(count)
+            except (IndexError, UnicodeDecodeError):
+                result = None       # torn read; the sequence check below retries it
+            if self._header()[0] == seq:
+                return result
+
+    # -- reads ----------------------------------------------------------
+
+    def __len__(self):
+        return self._header()[1]
+
+    def mark(self):
+        """The db_mark this file was last brought up to date with."""
+        return self._read(lambda count: self._stamp())
+
+    def _text(self, name, i):
+        offset, length = self._views[f"{name}.off"][i], self._views[f"{name}.len"][i]
+        return str(self._views['heap'][offset:offset + length], "utf-8")
+
+    def _row(self, i, columns):
+        row = {}
+        for name in columns:
+            if name in TEXT_COLUMNS:
+                row[name] = self._text(name, i)
+            elif name == 'salary':
+                salary = self._views['salary'][i]
+                row[name] = None if math.isnan(salary) else salary
+            elif name == 'user_id':
+                row[name] = self._views['user_id'][i] or None
+            else:
+                row[name] = self._views[name][i]
+        return row
+
+    def get(self, emp_id, columns=SNAPSHOT_COLUMNS):
+        """The employee's row as a dict, or None."""
+        emp_id = int(emp_id)
+
+        def read(count):
+            ids = self._views['emp_id']
+            i = bisect_left(ids, emp_id, 0, count)
+            return self._row(i, columns) if i < count and ids[i] == emp_id else None
+        return self._read(read)
+
+    def page(self, after_emp_id=0, limit=DEFAULT_PAGE_SIZE, columns=SNAPSHOT_COLUMNS):
+        """Up to `limit` rows with emp_id > after_emp_id, like employee_listing.fetch_employee_page."""
+        def read(count):
+            start = bisect_right(self._views['emp_id'], int(after_emp_id), 0, count)
+            return [self._row(i, columns) for i in range(start, min(start + limit, count))]
+        return self._read(read)
+
+    def pages(self, page_size=DEFAULT_PAGE_SIZE, after_emp_id=0, columns=SNAPSHOT_COLUMNS):
+        """Yield the directory one keyset page at a time (see employee_listing.iter_employee_pages)."""
+        while True:
+            page = self.page(after_emp_id, page_size, columns)
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            after_emp_id = page[-1]['emp_id']
+
+    def emp_id_for_user(self, user_id):
+        """emp_id linked to a login user_id, or None (searched in place, no copy of the column)."""
+        needle = array("i", [int(user_id)]).tobytes()
+
+        def read(count):
+            view = self._views['user_id']
+            base = self._offsets['user_id']
+            end = base + count * view.itemsize
+            pos = self._mm.find(needle, base, end)
+            while pos != -1 and (pos - base) % view.itemsize:
+                pos = self._mm.find(needle, pos + 1, end)
+            return None if pos == -1 else self._views['emp_id'][(pos - base) // view.itemsize]
+        return self._read(read) if user_id else None
+
+    def stats(self):
+        seq, count, heap_used, heap_capacity, _ = self._header()
+        return {"path": os.path.abspath(self.path), "employees": count, "capacity": self.capacity,
+                "heap_used": heap_used, "heap_capacity": heap_capacity, "writes": seq // 2,
+                "stamped_max_emp_id": self._stamp()[0], "stamped_max_history_id": self._stamp()[1],
+                "file_bytes": len(self._mm)}
+
+    # -- writes ---------------------------------------------------------
+
+    def _file_lock(self):
+        fh = open(f"{self.path}.lock", "a+b")
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        return fh       # closing it releases the lock
+
+    def upsert(self, emp, marks=None):
+        """
+        Insert or replace one employee (a dict with emp_id and any SNAPSHOT_COLUMNS).
+        `marks` is the (before, after) db_mark of the transaction that wrote it;
+        the stamp moves to `after` only if it was at `before`.
+        """
+        with self._lock:
+            lock = self._file_lock()
+            try:
+                if self._header()[4]:           # replaced while we waited for the lock
+                    self.close()
+                    self._map()
+                mark = self._stamp()
+                if marks is not None and mark == tuple(marks[0]):
+                    mark = tuple(marks[1])
+                if not self._upsert_in_place(emp, mark):
+                    self._rewrite(emp, mark)
+            finally:
+                lock.close()
+
+    def _upsert_in_place(self, emp, mark):
+        seq, count, heap_used, heap_capacity, _ = self._header()
+        emp_id = int(emp['emp_id'])
+        ids = self._views['emp_id']
+        i = bisect_left(ids, emp_id, 0, count)
+        exists = i < count and ids[i] == emp_id
+        if not exists and count >= self.capacity:
+            return False
+        current = self._row(i, SNAPSHOT_COLUMNS) if exists else {}
+        row = dict(current, **{k: emp[k] for k in SNAPSHOT_COLUMNS if k in emp})
+        encoded = {name: _encode(row.get(name)) for name in TEXT_COLUMNS}
+        appended = sum(len(data) for name, data in encoded.items() if data != _encode(current.get(name)))
+        if heap_used + appended > heap_capacity:
+            return False
+
+        self._set_header(seq + 1, count, heap_used)       # odd: readers wait
+        if not exists:
+            for name, offset in self._offsets.items():
+                size = self._views[name].itemsize
+                self._mm.move(offset + (i + 1) * size, offset + i * size, (count - i) * size)
+            count += 1
+        salary = row.get('salary')
+        self._views['salary'][i] = math.nan if salary is None else float(salary)
+        self._views['emp_id'][i] = emp_id
+        self._views['user_id'][i] = int(row.get('user_id') or 0)
+        heap = self._views['heap']
+        for name, data in encoded.items():
+            if exists and data == _encode(current.get(name)):
+                continue
+            heap[heap_used:heap_used + len(data)] = data
+            self._views[f"{name}.off"][i] = heap_used
+            self._views[f"{name}.len"][i] = len(data)
+            heap_used += len(data)
+        self._set_header(seq + 2, count, heap_used, mark=mark)
+        return True
+
+    def _rewrite(self, extra, mark):
+        count = self._header()[1]
+        rows = {row['emp_id']: row for row in (self._row(i, SNAPSHOT_COLUMNS) for i in range(count))}
+        rows[int(extra['emp_id'])] = dict(rows.get(int(extra['emp_id']), {}),
+                                          **{k: extra[k] for k in SNAPSHOT_COLUMNS if k in extra})
+        write_snapshot(self.path, [rows[k] for k in sorted(rows)], mark=mark)
+        seq, count, heap_used, _, _ = self._header()
+        self._set_header(seq, count, heap_used, superseded=1)
+        self.close()
+        self._map()
+
+
+def build(conn, path):
+    """Write a fresh snapshot of the employees table to `path` (one streamed read)."""
+    mark = db_mark(conn)        # taken first: a write in between makes the stamp look stale, not current
+    rows = [dict(row, emp_id=int(row['emp_id'])) for row in stream_employees(conn, SNAPSHOT_COLUMNS)]
+    lock = open(f"{path}.lock", "a+b")
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        old = None
+        if os.path.exists(path):
+            try:
+                old = DirectorySnapshot(path)
+            except ValueError:
+                pass
+        write_snapshot(path, rows, mark=mark)
+        if old is not None:
+            seq, count, heap_used, _, _ = old._header()
+            old._set_header(seq, count, heap_used, superseded=1)
+            old.close()
+    finally:
+        lock.close()
+    return len(rows)
+
+
+# ---------------------------
+# PROCESS-WIDE SNAPSHOT
+# ---------------------------
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def get_directory_snapshot():
+    return _snapshot
+
+
+def enable_directory_snapshot(conn, path, rebuild=False):
+    """Map the snapshot at `path`, building it from the employees table if missing (or asked to)."""
+    global _snapshot
+    if rebuild or not os.path.exists(path):
+        build(conn, path)
+    try:
+        snapshot = DirectorySnapshot(path)
+    except ValueError:      # unreadable / older format: replace it
+        build(conn, path)
+        snapshot = DirectorySnapshot(path)
+    with _snapshot_lock:
+        _snapshot = snapshot
+    return snapshot
+
+
+def disable_directory_snapshot():
+    global _snapshot
+    with _snapshot_lock:
+        snapshot, _snapshot = _snapshot, None
+    if snapshot is not None:
+        snapshot.close()
+
+
+def fresh_directory_snapshot(conn):
+    """The snapshot (None if not enabled), rebuilt first if the database has changed since it was stamped."""
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.mark() != db_mark(conn):
+        build(conn, snapshot.path)      # marks the mapped file superseded; the next read remaps
+    return snapshot
+
+
+def note_directory(emp, marks=None):
+    """Keep the snapshot (if enabled) in step with an added / updated employee (see DirectorySnapshot.upsert)."""
+    snapshot = _snapshot
+    if snapshot is not None:
+        snapshot.upsert(emp, marks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or inspect the shared employee directory snapshot.")
+    parser.add_argument("command", choices=["build", "stats"])
+    parser.add_argument("--path", default=os.environ.get("HRMS_DIRECTORY_SNAPSHOT", "hrms_directory.snap"))
+    args = parser.parse_args()
+
+    if args.command == "stats":
+        if not os.path.exists(args.path):
+            print(f"No snapshot at {args.path}")
+            sys.exit(1)
+        snapshot = DirectorySnapshot(args.path)
+        for key, value in snapshot.stats().items():
+            print(f"{key}: {value}")
+        snapshot.close()
+        sys.exit(0)
+
+    from main import get_db_connection
+    conn = get_db_connection()
+    if not conn:
+        sys.exit(1)
+    try:
+        started = time.perf_counter()
+        rows = build(conn, args.path)
+        print(f"Wrote {rows} employees to {args.path} in {time.perf_counter() - started:.2f}s")
+    finally:
+        conn.close()
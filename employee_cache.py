@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+
+from directory_snapshot import get_directory_snapshot
+from statements import fetch_one
+
+# ---------------------------
+# READ-THROUGH EMPLOYEE CACHE
+# ---------------------------
+# Hot lookups (employee row by emp_id, emp_id by user_id) are served from a
+# bounded LRU with a TTL. Writes in this process invalidate the affected keys;
+# the TTL bounds how long another process's write can go unseen.
+
+DEFAULT_MAX_SIZE = 10000
+DEFAULT_TTL = 60.0   # seconds
+
+
+class LRUCache:
+    """Thread-safe LRU cache with per-entry expiry and hit/miss/eviction counters."""
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, ttl=DEFAULT_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self._counters["misses"] += 1
+                return default
+            expires_at, value = item
+            if self.ttl is not None and time.monotonic() >= expires_at:
+                del self._data[key]
+                self._counters["expirations"] += 1
+                self._counters["misses"] += 1
+                return default
+            self._data.move_to_end(key)
+            self._counters["hits"] += 1
+            return value
+
+    def peek(self, key):
+        """Return the cached value without touching recency or counters."""
+        with self._lock:
+            item = self._data.get(key)
+        return item[1] if item is not None else None
+
+    def put(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self._counters["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._counters["invalidations"] += len(self._data)
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._counters)
+            snapshot["size"] = len(self._data)
+            snapshot["max_size"] = self.max_size
+        lookups = snapshot["hits"] + snapshot["misses"]
+        snapshot["hit_rate"] = snapshot["hits"] / lookups if lookups else 0.0
+        return snapshot
+
+
+employee_rows = LRUCache()
+user_employee_ids = LRUCache()
+
+
+def _emp_key(emp_id):
+    """emp_ids arrive as typed text; anything non-numeric can't match a row."""
+    try:
+        return int(str(emp_id).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def get_employee(conn, emp_id):
+    """Return the employees row for emp_id (a fresh dict), or None."""
+    key = _emp_key(emp_id)
+    if key is None:
+        return None
+    row = employee_rows.get(key)
+    if row is None:
+        row = fetch_one(conn, "employee_by_id", (key,))
+        if row is None:
+            return None
+        employee_rows.put(key, row)
+        if row.get('user_id') is not None:
+            user_employee_ids.put(row['user_id'], key)
+    # callers may edit what they get back; keep the cached copy pristine
+    return dict(row)
+
+
+def get_emp_id_for_user(conn, user_id):
+    """Return the emp_id linked to a login user_id, or None."""
+    emp_id = user_employee_ids.get(user_id)
+    if emp_id is not None:
+        return emp_id
+    snapshot = get_directory_snapshot()
+    if snapshot is not None:
+        # links made outside this application are not in the snapshot, so a miss falls through
+        emp_id = snapshot.emp_id_for_user(user_id)
+        if emp_id is not None:
+            user_employee_ids.put(user_id, emp_id)
+            return emp_id
+    row = fetch_one(conn, "emp_id_for_user", (user_id,), dictionary=False)
+    if row is None:
+        return None
+    user_employee_ids.put(user_id, row[0])
+    return row[0]
+
+
+def invalidate_employee(emp_id, user_id=None):
+    """Drop cached data for an employee after it was written."""
+    key = _emp_key(emp_id)
+    if key is not None:
+        cached = employee_rows.peek(key)
+        employee_rows.invalidate(key)
+        if cached is not None and cached.get('user_id') is not None:
+            user_employee_ids.invalidate(cached['user_id'])
+    if user_id is not None:
+        user_employee_ids.invalidate(user_id)
+
+
+def cache_stats():
+    return {"employees": employee_rows.stats(), "user_ids": user_employee_ids.stats()}
@@ -0,0 +1,219 @@
+"""
+Employee change history and point-in-time lookups.
+
+    python employee_history.py show <emp_id>
+    python employee_history.py as-of <emp_id> <YYYY-MM-DD>
+    python employee_history.py department <name> <YYYY-MM-DD>
+"""
+import sys
+from datetime import date, datetime
+
+# ---------------------------
+# CHANGE LOG
+# ---------------------------
+# employee_history is append-only: every add_employee / update_employee writes
+# one row holding the employee's tracked fields as they are from effective_at
+# on, in the same transaction as the change itself. Rows are never updated or
+# deleted.
+#
+# The first change to an employee who predates the log first records their
+# state before it as a baseline effective from BASELINE_AT, so dates before
+# the log started resolve to the earliest known state. Employees with no
+# history rows at all have never changed: their current row is their state at
+# any date.
+#
+# Point-in-time reads never scan the log: one employee's state is a single
+# seek on (emp_id, effective_at); a department's members are the employees
+# ever logged in it up to that date (department index), each checked with the
+# same seek.
+#
+# The table and its indexes (emp_id, effective_at, history_id) and
+# (department, effective_at, emp_id) are created by migration 4 (migrations.py).
+
+TRACKED_FIELDS = ("first_name", "last_name", "department", "job_title", "salary")
+BASELINE_AT = "1970-01-01 00:00:00"
+
+INSERT_HISTORY = """
+    INSERT INTO employee_history
+        (emp_id, effective_at, first_name, last_name, department, job_title, salary, changed_fields)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+# bulk loads (import_employees): every employee inserted after `emp_id > %s`
+RECORD_INSERTED_AFTER = """
+    INSERT INTO employee_history
+        (emp_id, effective_at, first_name, last_name, department, job_title, salary, changed_fields)
+    SELECT emp_id, %s, first_name, last_name, department, job_title, salary, 'created'
+    FROM employees
+    WHERE emp_id > %s
+"""
+
+HAS_HISTORY = "SELECT 1 AS logged FROM employee_history WHERE emp_id = %s LIMIT 1"
+
+HISTORY_FOR_EMPLOYEE = """
+    SELECT history_id, emp_id, effective_at, first_name, last_name, department, job_title, salary,
+           changed_fields
+    FROM employee_history
+    WHERE emp_id = %s
+    ORDER BY effective_at, history_id"""
+
+STATE_AS_OF = """
+    SELECT emp_id, effective_at, first_name, last_name, department, job_title, salary
+    FROM employee_history
+    WHERE emp_id = %s AND effective_at <= %s
+    ORDER BY effective_at DESC, history_id DESC
+    LIMIT 1
+"""
+
+# latest snapshot at or before a moment, per employee (one index seek)
+_STATE_AT = """
+    SELECT history_id FROM employee_history h2
+    WHERE h2.emp_id = h.emp_id AND h2.effective_at <= %s
+    ORDER BY h2.effective_at DESC, h2.history_id DESC
+    LIMIT 1
+"""
+
+# members logged in the department by then, each checked with _STATE_AT
+DEPARTMENT_AS_OF = f"""
+    SELECT h.emp_id, h.effective_at, h.first_name, h.last_name, h.department, h.job_title, h.salary
+    FROM (
+        SELECT DISTINCT emp_id FROM employee_history
+        WHERE department = %s AND effective_at <= %s
+    ) candidates
+    JOIN employee_history h ON h.emp_id = candidates.emp_id
+    WHERE h.history_id = ({_STATE_AT}) AND h.department = %s
+"""
+
+NEVER_LOGGED_IN_DEPARTMENT = """
+    SELECT e.emp_id, NULL AS effective_at, e.first_name, e.last_name, e.department, e.job_title, e.salary
+    FROM employees e
+    WHERE e.department = %s
+      AND NOT EXISTS (SELECT 1 FROM employee_history h WHERE h.emp_id = e.emp_id)
+"""
+
+
+def _timestamp(value):
+    """'YYYY-MM-DD HH:MM:SS' for a datetime; a date means the end of that day."""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return f"{value.isoformat()} 23:59:59"
+    text = str(value).strip()
+    return f"{text} 23:59:59" if len(text) == 10 else text
+
+
+def _snapshot(emp_id, effective_at, employee, changed):
+    return (emp_id, effective_at, *(employee.get(field) for field in TRACKED_FIELDS), ",".join(changed))
+
+
+def record_change(cursor, before, after, changed, at=None):
+    """
+    Append `after` (the employee's row with the change applied) to the log.
+    `before` is the row as it was; if the employee has no history yet it is
+    logged first as the baseline. Runs on the caller's cursor so the log
+    commits or rolls back with the UPDATE.
+    """
+    emp_id = after['emp_id']
+    cursor.execute(HAS_HISTORY, (emp_id,))
+    if cursor.fetchone() is None:
+        cursor.execute(INSERT_HISTORY, _snapshot(emp_id, BASELINE_AT, before, ["baseline"]))
+    cursor.execute(INSERT_HISTORY, _snapshot(emp_id, _timestamp(at or datetime.now()), after, changed))
+
+
+def record_new_employee(cursor, employee, at=None):
+    """Log a newly inserted employee's starting state (on the INSERT's cursor)."""
+    cursor.execute(INSERT_HISTORY, _snapshot(employee['emp_id'], _timestamp(at or datetime.now()),
+                                             employee, ["created"]))
+
+
+def record_inserted_after(cursor, after_emp_id, at=None):
+    """
+    Log every employee with emp_id > after_emp_id as created (one INSERT ...
+    SELECT on the bulk insert's cursor). The caller keeps other writers from
+    adding employees in between; returns the rows logged.
+    """
+    cursor.execute(RECORD_INSERTED_AFTER, (_timestamp(at or datetime.now()), after_emp_id))
+    return cursor.rowcount
+
+
+# ---------------------------
+# QUERIES
+# ---------------------------
+
+def _rows(conn, query, params):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def history(conn, emp_id, limit=None):
+    """Every logged state of one employee, oldest first."""
+    query, params = HISTORY_FOR_EMPLOYEE, (emp_id,)
+    if limit:
+        query += " LIMIT %s"
+        params += (limit,)
+    return _rows(conn, query, params)
+
+
+def employee_as_of(conn, emp_id, when):
+    """
+    The employee's tracked fields at `when` (date = end of that day), or
+    None if they did not exist yet. Employees never logged get their current row.
+    """
+    at = _timestamp(when)
+    rows = _rows(conn, STATE_AS_OF, (emp_id, at))
+    if rows:
+        return rows[0]
+    logged = _rows(conn, HAS_HISTORY, (emp_id,))
+    if logged:
+        return None     # first logged after `when`
+    current = _rows(conn, "SELECT emp_id, first_name, last_name, department, job_title, salary "
+                          "FROM employees WHERE emp_id = %s", (emp_id,))
+    if not current:
+        return None
+    current[0]['effective_at'] = None
+    return current[0]
+
+
+def department_as_of(conn, department, when):
+    """Everyone in `department` at `when`, with their tracked fields then, ordered by emp_id."""
+    at = _timestamp(when)
+    logged = _rows(conn, DEPARTMENT_AS_OF, (department, at, at, department))
+    never_logged = _rows(conn, NEVER_LOGGED_IN_DEPARTMENT, (department,))
+    return sorted(logged + never_logged, key=lambda row: row['emp_id'])
+
+
+def print_states(rows):
+    print(f"{'emp':>6} {'since':<19} {'name':<24} {'department':<16} {'job title':<20} {'salary':>12}")
+    for r in rows:
+        since = str(r['effective_at'] or "(unchanged)")
+        if since.startswith(BASELINE_AT[:10]):
+            since = "(before log)"
+        salary = "" if r['salary'] is None else f"{float(r['salary']):,.2f}"
+        print(f"{r['emp_id']:>6} {since:<19} {(r['first_name'] or '') + ' ' + (r['last_name'] or ''):<24}"
+              f" {r['department'] or '':<16} {r['job_title'] or '':<20} {salary:>12}")
+
+
+if __name__ == "__main__":
+    commands = {"show": 1, "as-of": 2, "department": 2}
+    if len(sys.argv) < 2 or len(sys.argv) - 2 != commands.get(sys.argv[1]):
+        print(__doc__.strip())
+        sys.exit(2)
+    from main import get_db_connection
+    conn = get_db_connection()
+    if not conn:
+        sys.exit(1)
+    try:
+        command, args = sys.argv[1], sys.argv[2:]
+        if command == "show":
+            print_states(history(conn, args[0]))
+        elif command == "as-of":
+            state = employee_as_of(conn, args[0], args[1])
+            print_states([state]) if state else print(f"Employee {args[0]} did not exist on {args[1]}.")
+        else:
+            print_states(department_as_of(conn, args[0], args[1]))
+    finally:
+        conn.close()
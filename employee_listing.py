@@ -0,0 +1,125 @@
+# ---------------------------
+# KEYSET-PAGINATED EMPLOYEE LISTING
+# ---------------------------
+# Pages are fetched with `WHERE emp_id > <last seen> ORDER BY emp_id LIMIT n`,
+# so every page costs one index range read no matter how deep into the table
+# it is, and only one page is ever held in memory.
+
+DEFAULT_PAGE_SIZE = 50
+DEFAULT_FETCH_SIZE = 1000
+
+LISTING_COLUMNS = ("emp_id", "first_name", "last_name", "job_title", "department", "salary")
+
+EMPLOYEE_PAGE = "SELECT {columns} FROM employees WHERE emp_id > %s ORDER BY emp_id LIMIT %s"
+ALL_EMPLOYEES = "SELECT {columns} FROM employees ORDER BY emp_id"
+
+
+def _column_list(columns):
+    return ", ".join(columns)
+
+
+def fetch_employee_page(conn, after_emp_id=0, limit=DEFAULT_PAGE_SIZE, columns=LISTING_COLUMNS, dictionary=True):
+    """Return up to `limit` employees with emp_id greater than `after_emp_id`."""
+    cursor = conn.cursor(dictionary=dictionary)
+    try:
+        cursor.execute(EMPLOYEE_PAGE.format(columns=_column_list(columns)), (after_emp_id, limit))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def iter_pages(conn, fetch_page, page_size=DEFAULT_PAGE_SIZE, after_emp_id=0, key='emp_id'):
+    """
+    Generic keyset pager: yields lists of rows from fetch_page(conn, after, limit).
+    Rows must carry `key` (dict key or first tuple element).
+    """
+    while True:
+        page = fetch_page(conn, after_emp_id, page_size)
+        if not page:
+            return
+        yield page
+        last = page[-1]
+        after_emp_id = last[key] if isinstance(last, dict) else last[0]
+        if len(page) < page_size:
+            return
+
+
+def iter_employee_pages(conn, page_size=DEFAULT_PAGE_SIZE, after_emp_id=0, columns=LISTING_COLUMNS, dictionary=True):
+    """Yield the employees table one keyset page at a time."""
+    def fetch(c, after, limit):
+        return fetch_employee_page(c, after, limit, columns, dictionary)
+    return iter_pages(conn, fetch, page_size, after_emp_id)
+
+
+def stream_chunks(conn, query, params=(), fetch_size=DEFAULT_FETCH_SIZE, dictionary=False, on_columns=None):
+    """
+    Run one unbuffered query and yield its rows in lists of up to `fetch_size`.
+    Rows are read off the socket as they are consumed, so memory stays flat;
+    the connection is busy until the generator finishes or is closed.
+    on_columns, if given, is called with the result's column names first.
+    """
+    cursor = conn.cursor(dictionary=dictionary, buffered=False)
+    exhausted = False
+    try:
+        cursor.execute(query, params)
+        if on_columns is not None:
+            on_columns([col[0] for col in cursor.description or ()])
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                exhausted = True
+                return
+            yield rows
+    finally:
+        if not exhausted:
+            # abandoned early: discard the unread rows so the connection is reusable
+            consume = getattr(conn, "consume_results", None)
+            if consume is not None:
+                try:
+                    consume()
+                except Exception:
+                    pass
+        cursor.close()
+
+
+def stream_employees(conn, columns=LISTING_COLUMNS, fetch_size=DEFAULT_FETCH_SIZE, dictionary=True):
+    """Yield every employee, in emp_id order, from a single unbuffered query."""
+    query = ALL_EMPLOYEES.format(columns=_column_list(columns))
+    chunks = stream_chunks(conn, query, (), fetch_size, dictionary)
+    try:
+        for rows in chunks:
+            yield from rows
+    finally:
+        chunks.close()
+
+
+# ---------------------------
+# INTERACTIVE PAGER
+# ---------------------------
+
+def browse_pages(pages, render_row, prompt="Enter an Employee ID", empty_message="No employees found."):
+    """
+    Print pages one at a time. Returns the text the operator typed (usually an
+    ID) or None if they went back / the listing was empty.
+    """
+    shown = 0
+    pages = iter(pages)
+    page = next(pages, None)
+    while page is not None:
+        for row in page:
+            render_row(row)
+        shown += len(page)
+        page = next(pages, None)
+        if page is None:
+            break
+        answer = input(f"\n{prompt}, press Enter for more, or q to go back: ").strip()
+        if answer.lower() == 'q':
+            return None
+        if answer:
+            return answer
+
+    if not shown:
+        print(empty_message)
+        return None
+    answer = input(f"\nEnd of list. {prompt} (or press Enter to go back): ").strip()
+    return answer or None
@@ -0,0 +1,222 @@
+import threading
+
+from employee_listing import LISTING_COLUMNS, DEFAULT_PAGE_SIZE, stream_employees
+
+# ---------------------------
+# EMPLOYEE SEARCH
+# ---------------------------
+# Prefix searches and department / job title filters are answered by the
+# database through indexes (LIKE 'abc%' is an index range scan): the name,
+# department and job title indexes of migration 3, plus on SQLite the
+# COLLATE NOCASE name indexes of migration 6 that its case-insensitive LIKE
+# needs. Substring searches ('%abc%') cannot use a B-tree, so they go through
+# the optional in-process trigram index when it has been enabled
+# (HRMS_TRIGRAM_INDEX=1 in main.py / api_server.py).
+
+
+def escape_like(text):
+    # '!' as the escape character behaves the same in MySQL and SQLite
+    return text.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+
+
+def _filters(department, job_title):
+    clauses, values = [], []
+    if department:
+        clauses.append("department = %s")
+        values.append(department)
+    if job_title:
+        clauses.append("job_title = %s")
+        values.append(job_title)
+    return clauses, values
+
+
+def search_query(name=None, department=None, job_title=None, substring=False,
+                 limit=DEFAULT_PAGE_SIZE, after_emp_id=0):
+    """(sql, params) of the database search behind search_employees."""
+    clauses, values = _filters(department, job_title)
+    columns = ", ".join(LISTING_COLUMNS)
+    if name and not substring:
+        # One index range scan per name column, each cut to the first `limit`
+        # matches by emp_id, merged and sorted by emp_id. An OR of the two, or
+        # a bare UNION ... ORDER BY emp_id LIMIT, lets the planner walk the
+        # primary key in emp_id order instead; sorting the derived table keeps
+        # it on the name indexes, and inside each branch `emp_id + 0` (an
+        # expression, which the primary key order can't satisfy) does the
+        # same. UNION drops the rows matching on both names.
+        pattern = escape_like(name) + "%"
+        where = " AND ".join(clauses + ["emp_id > %s"])
+        branch = (f"SELECT {columns} FROM (SELECT {columns} FROM employees"
+                  f" WHERE {{column}} LIKE %s ESCAPE '!' AND {where} ORDER BY emp_id + 0 LIMIT %s) {{alias}}")
+        query = (f"SELECT {columns} FROM (" + branch.format(column="first_name", alias="by_first") + " UNION "
+                 + branch.format(column="last_name", alias="by_last") + ") matches ORDER BY emp_id LIMIT %s")
+        return query, (pattern, *values, after_emp_id, limit) * 2 + (limit,)
+
+    if name:
+        pattern = "%" + escape_like(name) + "%"
+        clauses.append("(first_name LIKE %s ESCAPE '!' OR last_name LIKE %s ESCAPE '!')")
+        values.extend([pattern, pattern])
+    clauses.append("emp_id > %s")
+    values.append(after_emp_id)
+
+    query = (f"SELECT {columns} FROM employees WHERE "
+             + " AND ".join(clauses) + " ORDER BY emp_id LIMIT %s")
+    values.append(limit)
+    return query, tuple(values)
+
+
+def search_employees(conn, name=None, department=None, job_title=None, substring=False,
+                     limit=DEFAULT_PAGE_SIZE, after_emp_id=0):
+    """
+    Find employees by first/last name and/or exact department / job title.
+
+    name matches as a prefix of first or last name; with substring=True it may
+    appear anywhere in either (uses the trigram index if one is enabled).
+    Results are ordered by emp_id; pass the last emp_id seen as after_emp_id
+    for the next page.
+    """
+    name = (name or "").strip()
+    if name and substring:
+        index = get_trigram_index()
+        if index is not None and len(name) >= 3:
+            ids = index.search(name, department, job_title, limit=limit, after_emp_id=after_emp_id)
+            return fetch_employees_by_ids(conn, ids)
+
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(*search_query(name, department, job_title, substring, limit, after_emp_id))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+EMPLOYEES_BY_IDS = ("SELECT " + ", ".join(LISTING_COLUMNS)
+                    + " FROM employees WHERE emp_id IN ({placeholders}) ORDER BY emp_id")
+
+
+def fetch_employees_by_ids(conn, emp_ids):
+    if not emp_ids:
+        return []
+    placeholders = ", ".join(["%s"] * len(emp_ids))
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(EMPLOYEES_BY_IDS.format(placeholders=placeholders), tuple(emp_ids))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+# ---------------------------
+# IN-PROCESS TRIGRAM INDEX
+# ---------------------------
+
+def trigrams(text):
+    text = f"  {text.lower()} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _folded(text):
+    # department / job title filters match regardless of case, as on MySQL's default collation
+    return text.casefold() if text else text
+
+
+class TrigramIndex:
+    """
+    Inverted index from name trigrams to emp_ids, plus the department and job
+    title of each employee so filters are applied without touching the DB.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._docs = {}   # emp_id -> (first, last (lowered), department, job_title (casefolded), trigrams)
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, emp):
+        """Index (or re-index) one employee row."""
+        emp_id = emp['emp_id']
+        first = (emp.get('first_name') or '').lower()
+        last = (emp.get('last_name') or '').lower()
+        grams = trigrams(first) | trigrams(last)
+        with self._lock:
+            self.remove(emp_id)
+            self._docs[emp_id] = (first, last, _folded(emp.get('department')), _folded(emp.get('job_title')), grams)
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(emp_id)
+
+    def remove(self, emp_id):
+        with self._lock:
+            doc = self._docs.pop(emp_id, None)
+            if doc is None:
+                return
+            for gram in doc[4]:
+                ids = self._postings.get(gram)
+                if ids is not None:
+                    ids.discard(emp_id)
+                    if not ids:
+                        del self._postings[gram]
+
+    def search(self, text, department=None, job_title=None, limit=DEFAULT_PAGE_SIZE, after_emp_id=0):
+        """Return up to `limit` sorted emp_ids whose first or last name contains `text`."""
+        needle = text.lower().strip()
+        department, job_title = _folded(department), _folded(job_title)
+        # inner trigrams only: the padded edges would force a prefix match
+        grams = {needle[i:i + 3] for i in range(len(needle) - 2)}
+        with self._lock:
+            postings = sorted((self._postings.get(g, set()) for g in grams), key=len)
+            if not postings or not postings[0]:
+                return []
+            candidates = set(postings[0])
+            for ids in postings[1:]:
+                candidates &= ids
+                if not candidates:
+                    return []
+
+            matches = []
+            for emp_id in sorted(candidates):
+                if emp_id <= after_emp_id:
+                    continue
+                first, last, dept, title, _ = self._docs[emp_id]
+                if needle not in first and needle not in last:
+                    continue   # trigrams matched but not contiguously
+                if department and dept != department:
+                    continue
+                if job_title and title != job_title:
+                    continue
+                matches.append(emp_id)
+                if len(matches) >= limit:
+                    break
+            return matches
+
+
+_trigram_index = None
+_trigram_lock = threading.Lock()
+
+
+def get_trigram_index():
+    return _trigram_index
+
+
+def enable_trigram_index(conn):
+    """Build the process-wide trigram index from the employees table."""
+    global _trigram_index
+    index = TrigramIndex()
+    for emp in stream_employees(conn):
+        index.add(emp)
+    with _trigram_lock:
+        _trigram_index = index
+    return index
+
+
+def disable_trigram_index():
+    global _trigram_index
+    with _trigram_lock:
+        _trigram_index = None
+
+
+def index_employee(emp):
+    """Keep the trigram index (if enabled) in step with an added / updated employee."""
+    index = _trigram_index
+    if index is not None:
+        index.add(emp)
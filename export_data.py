@@ -0,0 +1,264 @@
+"""
+Stream HR tables out to CSV or to a compact columnar file (.hrc).
+
+    python export_data.py payroll --since 2025-01-01 --until 2025-01-31 -o payroll_jan.csv
+    python export_data.py performance_reviews --format columnar -o reviews.hrc
+    python export_data.py all --format columnar -o exports/
+
+Rows are pulled with one unbuffered query per table and written chunk by
+chunk, so memory use does not grow with the size of the table.
+"""
+import argparse
+import csv
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+from datetime import date, datetime
+from decimal import Decimal
+
+from employee_listing import DEFAULT_FETCH_SIZE, stream_chunks
+
+# table -> date column the --since/--until filter applies to (None = no filter)
+EXPORT_TABLES = {
+    "employees": None,
+    "payroll": "generated_on",
+    "performance_reviews": "review_date",
+    "leaves": "start_date",
+    "job_openings": None,
+}
+
+FORMATS = ("csv", "columnar")
+
+
+def export_query(table, since=None, until=None):
+    """Build the SELECT for one table, with the optional date range filter."""
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown table {table!r}; choose from {', '.join(EXPORT_TABLES)}")
+    date_column = EXPORT_TABLES[table]
+    clauses, params = [], []
+    if (since or until) and date_column is None:
+        raise ValueError(f"{table} has no date column to filter on")
+    if since:
+        clauses.append(f"{date_column} >= %s")
+        params.append(since)
+    if until:
+        clauses.append(f"{date_column} <= %s")
+        params.append(until)
+    query = f"SELECT * FROM {table}"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    return query, tuple(params)
+
+
+# ---------------------------
+# CSV
+# ---------------------------
+
+def write_csv(fh, chunks, columns):
+    writer = csv.writer(fh)
+    header_written = False
+    rows = 0
+    for chunk in chunks:
+        if not header_written:
+            writer.writerow(columns)
+            header_written = True
+        writer.writerows(chunk)
+        rows += len(chunk)
+    if not header_written:
+        writer.writerow(columns)
+    return rows
+
+
+# ---------------------------
+# COLUMNAR (.hrc)
+# ---------------------------
+# Layout:  MAGIC | chunk* | footer JSON | uint64 footer length | MAGIC
+# Each chunk stores its rows column by column; each column block is
+#   1 byte type ('i' int64, 'f' float64, 's' utf-8 text, 'n' all null)
+#   null bitmap (ceil(rows / 8) bytes, bit set = NULL)
+#   uint32 compressed length + zlib-compressed values
+# The footer holds the column names, row count and the offset of every chunk.
+
+COLUMNAR_MAGIC = b"HRCOL01\n"
+
+
+def _column_type(values):
+    kind = "n"
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool) or isinstance(value, int):
+            if kind == "n":
+                kind = "i"
+        elif isinstance(value, (float, Decimal)):
+            if kind in ("n", "i"):
+                kind = "f"
+        else:
+            return "s"
+    return kind
+
+
+def _text(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", "replace")
+    return str(value)
+
+
+def _encode_column(values):
+    kind = _column_type(values)
+    bitmap = bytearray((len(values) + 7) // 8)
+    for i, value in enumerate(values):
+        if value is None:
+            bitmap[i >> 3] |= 1 << (i & 7)
+
+    if kind == "i":
+        payload = array("q", (0 if v is None else int(v) for v in values)).tobytes()
+    elif kind == "f":
+        payload = array("d", (0.0 if v is None else float(v) for v in values)).tobytes()
+    elif kind == "s":
+        encoded = [b"" if v is None else _text(v).encode("utf-8") for v in values]
+        offsets = array("I", [0])
+        total = 0
+        for item in encoded:
+            total += len(item)
+            offsets.append(total)
+        payload = offsets.tobytes() + b"".join(encoded)
+    else:
+        payload = b""
+
+    packed = zlib.compress(payload, 1)
+    return kind.encode() + bytes(bitmap) + struct.pack("<I", len(packed)) + packed
+
+
+def write_columnar(fh, chunks, columns):
+    fh.write(COLUMNAR_MAGIC)
+    offsets = []
+    rows = 0
+    for chunk in chunks:
+        offsets.append(fh.tell())
+        fh.write(struct.pack("<I", len(chunk)))
+        for col in range(len(columns)):
+            fh.write(_encode_column([row[col] for row in chunk]))
+        rows += len(chunk)
+    footer = json.dumps({"columns": columns, "rows": rows, "chunks": offsets}).encode("utf-8")
+    fh.write(footer)
+    fh.write(struct.pack("<Q", len(footer)))
+    fh.write(COLUMNAR_MAGIC)
+    return rows
+
+
+def _decode_column(fh, count):
+    kind = fh.read(1).decode()
+    bitmap = fh.read((count + 7) // 8)
+    (size,) = struct.unpack("<I", fh.read(4))
+    payload = zlib.decompress(fh.read(size))
+
+    if kind == "i":
+        values = array("q")
+        values.frombytes(payload)
+        values = values.tolist()
+    elif kind == "f":
+        values = array("d")
+        values.frombytes(payload)
+        values = values.tolist()
+    elif kind == "s":
+        offsets = array("I")
+        offsets.frombytes(payload[:(count + 1) * 4])
+        data = payload[(count + 1) * 4:]
+        values = [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(count)]
+    else:
+        values = [None] * count
+
+    return [None if bitmap[i >> 3] & (1 << (i & 7)) else values[i] for i in range(count)]
+
+
+def read_columnar(path):
+    """Yield rows (as dicts) back out of a .hrc file, one chunk in memory at a time."""
+    with open(path, "rb") as fh:
+        if fh.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise ValueError(f"{path} is not a columnar export")
+        fh.seek(-(8 + len(COLUMNAR_MAGIC)), os.SEEK_END)
+        (footer_len,) = struct.unpack("<Q", fh.read(8))
+        fh.seek(-(8 + len(COLUMNAR_MAGIC) + footer_len), os.SEEK_END)
+        footer = json.loads(fh.read(footer_len))
+
+        columns = footer["columns"]
+        for offset in footer["chunks"]:
+            fh.seek(offset)
+            (count,) = struct.unpack("<I", fh.read(4))
+            data = [_decode_column(fh, count) for _ in columns]
+            for i in range(count):
+                yield {name: data[c][i] for c, name in enumerate(columns)}
+
+
+# ---------------------------
+# EXPORT
+# ---------------------------
+
+def export_table(conn, table, path, fmt="csv", since=None, until=None, fetch_size=DEFAULT_FETCH_SIZE):
+    """Stream one table into `path`; returns the number of rows written."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; choose from {', '.join(FORMATS)}")
+    query, params = export_query(table, since, until)
+    columns = []
+    chunks = stream_chunks(conn, query, params, fetch_size, on_columns=columns.extend)
+
+    # the first chunk fills in the column names before anything is written
+    first = next(chunks, None)
+
+    def all_chunks():
+        if first is not None:
+            yield first
+            yield from chunks
+
+    try:
+        if fmt == "csv":
+            with open(path, "w", newline="", encoding="utf-8") as fh:
+                return write_csv(fh, all_chunks(), columns)
+        with open(path, "wb") as fh:
+            return write_columnar(fh, all_chunks(), columns)
+    finally:
+        chunks.close()
+
+
+def default_filename(table, fmt):
+    return f"{table}.{'csv' if fmt == 'csv' else 'hrc'}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export HR tables to CSV or columnar files.")
+    parser.add_argument("table", choices=list(EXPORT_TABLES) + ["all"])
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("-o", "--output", help="output file (or directory when exporting all)")
+    parser.add_argument("--since", type=date.fromisoformat, help="first date to include (YYYY-MM-DD)")
+    parser.add_argument("--until", type=date.fromisoformat, help="last date to include (YYYY-MM-DD)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_FETCH_SIZE)
+    args = parser.parse_args()
+
+    if args.table == "all":
+        out_dir = args.output or "."
+        os.makedirs(out_dir, exist_ok=True)
+        targets = [(t, os.path.join(out_dir, default_filename(t, args.format))) for t in EXPORT_TABLES]
+    else:
+        targets = [(args.table, args.output or default_filename(args.table, args.format))]
+
+    from main import get_db_connection
+    conn = get_db_connection()
+    if not conn:
+        sys.exit(1)
+    try:
+        for table, path in targets:
+            # tables without a date column are exported whole
+            dated = EXPORT_TABLES[table] is not None
+            count = export_table(conn, table, path, args.format,
+                                 args.since if dated else None,
+                                 args.until if dated else None,
+                                 args.chunk_size)
+            print(f"{table}: {count} rows -> {path}")
+    finally:
+        conn.close()
@@ -1,8 +1,20 @@
-import mysql.connector
 from datetime import date
-
-# NOTE: Expected DB schema details were removed from this file to reduce clutter.
-# See db_config.md in the project root for database setup notes and expected tables.
+import services
+from directory_snapshot import fresh_directory_snapshot
+from employee_cache import get_employee
+import employee_history as employee_history_log
+from employee_listing import DEFAULT_PAGE_SIZE, browse_pages, iter_employee_pages, iter_pages
+from employee_search import search_employees
+from instrumentation import track_action
+from payroll_analytics import month_summary, print_month, print_trend, shift_month, trend
+from payroll_batch import BatchPayrollError, RunInProgress, print_summary, run_batch_payroll
+import review_analytics
+from review_summary import attach_latest_ratings, fetch_latest_rating_page, has_summary_table
+from statements import fetch_all
+import storage
+
+# NOTE: The database schema (tables and indexes) is created and versioned by
+# migrations.py; `python migrations.py migrate` brings a database up to date.
 
 
 # ---------------------------
@@ -15,7 +27,9 @@ def employee_info_menu(conn):
         print("1. Add a new employee (enter personal & job details)")
         print("2. List all employees and view details")
         print("3. Edit an employee's details")
-        print("4. Return to previous menu")
+        print("4. Search employees by name, department or job title")
+        print("5. Employee history / department as of a past date")
+        print("6. Return to previous menu")
         choice = input("What would you like to do? ")
 
         if choice == '1':
@@ -25,11 +39,16 @@ def employee_info_menu(conn):
         elif choice == '3':
             update_employee(conn)
         elif choice == '4':
+            search_employee(conn)
+        elif choice == '5':
+            employee_history(conn)
+        elif choice == '6':
             break
         else:
             print("Invalid choice.")
 
 
+@track_action("add_employee")
 def add_employee(conn):
     print("\n--- Add a New Employee ---")
     first_name = input("First name: ").strip()
@@ -48,69 +67,53 @@ def add_employee(conn):
         except ValueError:
             print("That doesn't look like a number. Please enter the salary as digits only.")
 
-    cursor = conn.cursor()
-    query = """
-        INSERT INTO employees (first_name, last_name, email, phone, department, job_title, salary)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-    """
-
     try:
-        cursor.execute(query, (first_name, last_name, email, phone, department, job_title, salary))
-        conn.commit()
-        new_id = cursor.lastrowid
-        print(f"Employee {first_name} {last_name} added — employee ID {new_id}.")
-    except mysql.connector.Error as err:
+        added = services.add_employee(conn, first_name, last_name, email, phone, department, job_title, salary)
+        print(f"Employee {first_name} {last_name} added — employee ID {added['emp_id']}.")
+    except (services.ServiceError, *storage.DB_ERRORS) as err:
         print(f"Unable to add employee: {err}")
-    finally:
-        cursor.close()
 
 
+@track_action("view_employee")
 def view_employee(conn):
     """
     Show a list of all employees with key details and latest rating info.
     Then allow user to enter an employee ID to view full details + reviews.
     """
-    cursor = conn.cursor(dictionary=True)
-
-    # Fetch all employees
-    cursor.execute("SELECT emp_id, first_name, last_name, job_title, department, salary FROM employees ORDER BY emp_id")
-    employees = cursor.fetchall()
-
-    if not employees:
-        print("\nNo employees found.")
-        cursor.close()
-        return
+    # Employees and their latest rating, one page (single query) at a time;
+    # with the directory snapshot enabled (rebuilt first if the database has moved
+    # on since it was stamped) only the ratings come from the database.
+    # An unmigrated database without the summary table ranks performance_reviews instead.
+    use_summary = has_summary_table(conn)
+    snapshot = fresh_directory_snapshot(conn)
+    if snapshot is None:
+        pages = iter_pages(conn, lambda c, after, limit: fetch_latest_rating_page(c, after, limit, use_summary),
+                           DEFAULT_PAGE_SIZE)
+    else:
+        pages = (attach_latest_ratings(conn, page, use_summary) for page in snapshot.pages(DEFAULT_PAGE_SIZE))
 
-    # For each employee fetch latest review (if any)
-    print("\n--- Employees List ---")
-    for emp in employees:
-        emp_id = emp['emp_id']
-        # get latest review
-        cursor.execute("""
-            SELECT rating, review_date
-            FROM performance_reviews
-            WHERE emp_id = %s
-            ORDER BY review_date DESC, review_id DESC
-            LIMIT 1
-        """, (emp_id,))
-        latest = cursor.fetchone()
-        rating_text = f"Latest Rating: {latest['rating']} (on {latest['review_date']})" if latest else "Rating not added yet"
+    def show(emp):
+        if emp['latest_rating'] is not None:
+            rating_text = f"Latest Rating: {emp['latest_rating']} (on {emp['latest_review_date']})"
+        else:
+            rating_text = "Rating not added yet"
 
         print(f"{emp['emp_id']}. {emp['first_name']} {emp['last_name']} | Job: {emp.get('job_title', '---')} | Dept: {emp.get('department','---')} | Salary: {emp.get('salary')}")
         print(f"   {rating_text}")
 
-    # Ask user if they want details for a specific employee
-    emp_id_in = input("\nEnter Employee ID to view full details (or press Enter to go back): ").strip()
-    if not emp_id_in:
-        cursor.close()
-        return
+    print("\n--- Employees List ---")
+    emp_id_in = browse_pages(pages, show, prompt="Enter Employee ID to view full details")
+    if emp_id_in:
+        show_employee_details(conn, emp_id_in)
 
-    cursor.execute("SELECT * FROM employees WHERE emp_id = %s", (emp_id_in,))
-    employee = cursor.fetchone()
+
+@track_action("show_employee_details")
+def show_employee_details(conn, emp_id_in):
+    """Print one employee's full record followed by all their performance reviews."""
+    employee = get_employee(conn, emp_id_in)
 
     if not employee:
         print("Employee not found.")
-        cursor.close()
         return
 
     print("\n--- Employee Details ---")
@@ -118,33 +121,24 @@ def view_employee(conn):
         print(f"{key.replace('_',' ').title()}: {value}")
 
     # Show all performance reviews for this employee (if any)
-    cursor.execute("""
-        SELECT review_date, rating, comments
-        FROM performance_reviews
-        WHERE emp_id = %s
-        ORDER BY review_date DESC, review_id DESC
-    """, (emp_id_in,))
-    reviews = cursor.fetchall()
+    reviews = fetch_all(conn, "reviews_for_employee", (employee['emp_id'],))
     if reviews:
         print("\nPerformance Reviews:")
         for r in reviews:
             print(f" - {r['review_date']}: Rating {r['rating']} | {r['comments']}")
+        print_review_stats(review_analytics.review_stats(reviews[::-1]))
     else:
         print("\nPerformance Reviews: Rating not added yet")
 
-    cursor.close()
-
 
+@track_action("update_employee")
 def update_employee(conn):
     emp_id = input("Enter Employee ID to update: ").strip()
 
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM employees WHERE emp_id = %s", (emp_id,))
-    employee = cursor.fetchone()
+    employee = get_employee(conn, emp_id)
 
     if not employee:
         print("❌ Error: Employee not found.")
-        cursor.close()
         return
 
     print("\n--- Current Employee Details ---")
@@ -161,48 +155,85 @@ def update_employee(conn):
     new_dept = input("New Department (leave blank = no change): ").strip()
     new_salary_str = input("New Salary (leave blank = no change): ").strip()
 
-    updates = []
-    values = []
-
-    if new_first:
-        updates.append("first_name = %s")
-        values.append(new_first)
-    if new_last:
-        updates.append("last_name = %s")
-        values.append(new_last)
-    if new_phone:
-        updates.append("phone = %s")
-        values.append(new_phone)
-    if new_job:
-        updates.append("job_title = %s")
-        values.append(new_job)
-    if new_dept:
-        updates.append("department = %s")
-        values.append(new_dept)
+    changes = {
+        'first_name': new_first,
+        'last_name': new_last,
+        'phone': new_phone,
+        'job_title': new_job,
+        'department': new_dept,
+    }
     if new_salary_str:
         try:
-            new_salary = float(new_salary_str)
-            updates.append("salary = %s")
-            values.append(new_salary)
+            changes['salary'] = float(new_salary_str)
         except ValueError:
             print("Invalid salary entered. Salary not changed.")
 
-    if not updates:
+    changes = {field: value for field, value in changes.items() if value not in (None, "")}
+    if not changes:
         print("No changes entered.")
-        cursor.close()
         return
 
-    values.append(emp_id)
-    update_query = "UPDATE employees SET " + ", ".join(updates) + " WHERE emp_id = %s"
-
     try:
-        cursor.execute(update_query, tuple(values))
-        conn.commit()
+        services.update_employee(conn, employee['emp_id'], **changes)
         print("✅ Employee updated successfully.")
-    except mysql.connector.Error as err:
+    except (services.ServiceError, *storage.DB_ERRORS) as err:
+        print(f"Error: {err}")
+
+
+@track_action("search_employee")
+def search_employee(conn):
+    print("\n--- Search Employees ---")
+    name = input("Name (first or last, leave blank = any): ").strip()
+    contains = False
+    if name:
+        contains = input("Match anywhere in the name instead of the start? (Y/N): ").upper().strip() == "Y"
+    department = input("Department (leave blank = any): ").strip()
+    job_title = input("Job title (leave blank = any): ").strip()
+
+    def fetch(c, after, limit):
+        return search_employees(c, name, department, job_title, substring=contains,
+                                limit=limit, after_emp_id=after)
+
+    def show(emp):
+        print(f"{emp['emp_id']}. {emp['first_name']} {emp['last_name']} | Job: {emp.get('job_title', '---')} | Dept: {emp.get('department','---')}")
+
+    print("\n--- Matching Employees ---")
+    emp_id_in = browse_pages(iter_pages(conn, fetch, DEFAULT_PAGE_SIZE), show,
+                             prompt="Enter Employee ID to view full details",
+                             empty_message="No matching employees.")
+    if emp_id_in:
+        show_employee_details(conn, emp_id_in)
+
+
+@track_action("employee_history")
+def employee_history(conn):
+    print("\n--- Employee History ---")
+    print("1. Change history of one employee")
+    print("2. One employee as of a date")
+    print("3. A department's members as of a date")
+    choice = input("Enter choice: ").strip()
+    try:
+        if choice == '1':
+            rows = services.employee_changes(conn, input("Employee ID: ").strip())
+            if not rows:
+                print("No changes recorded for this employee yet.")
+                return
+        elif choice == '2':
+            emp_id = input("Employee ID: ").strip()
+            rows = [services.employee_as_of(conn, emp_id, input("Date (YYYY-MM-DD): ").strip())]
+        elif choice == '3':
+            department = input("Department: ").strip()
+            rows = services.department_as_of(conn, department, input("Date (YYYY-MM-DD): ").strip())
+            if not rows:
+                print("Nobody was in that department on that date.")
+                return
+        else:
+            print("Invalid choice.")
+            return
+    except (services.ServiceError, *storage.DB_ERRORS) as err:
         print(f"Error: {err}")
-    finally:
-        cursor.close()
+        return
+    employee_history_log.print_states(rows)
 
 
 # ---------------------------
@@ -216,7 +247,8 @@ def leave_management_menu(conn, role):
         if role == 'admin':
             print("1. Apply Leave for Employee")
             print("2. Approve/Reject Leave Requests")
-            print("3. Back to Main Menu")
+            print("3. Team Calendar (who is out)")
+            print("4. Back to Main Menu")
             admin_choice = input("Enter choice: ")
 
             if admin_choice == '1':
@@ -227,6 +259,9 @@ def leave_management_menu(conn, role):
                 approve_leave(conn)
 
             elif admin_choice == '3':
+                team_calendar(conn)
+
+            elif admin_choice == '4':
                 break
 
             else:
@@ -237,58 +272,91 @@ def leave_management_menu(conn, role):
             break
 
 
+@track_action("apply_leave")
 def apply_leave(conn, emp_id):
     print("\n--- Leave Request ---")
     start_date = input("Start date (YYYY-MM-DD): ").strip()
     end_date = input("End date (YYYY-MM-DD): ").strip()
     reason = input("Reason for leave (short explanation): ").strip()
 
-    cursor = conn.cursor()
-    query = """
-        INSERT INTO leaves (emp_id, start_date, end_date, reason, status)
-        VALUES (%s, %s, %s, %s, 'Pending')
-    """
-
     try:
-        cursor.execute(query, (emp_id, start_date, end_date, reason))
-        conn.commit()
+        leave = services.apply_leave(conn, emp_id, start_date, end_date, reason)
         print("Leave request submitted — status: Pending. Your manager will review it shortly.")
-    except mysql.connector.Error as err:
+        balance = services.leave_balance(conn, emp_id, leave['start_date'].year)
+        print(f"Leave balance for {balance['year']}: {balance['remaining']} of {balance['allowance']} days remaining.")
+    except (services.ServiceError, *storage.DB_ERRORS) as err:
         print(f"Could not submit leave: {err}")
-    finally:
-        cursor.close()
 
 
-def approve_leave(conn):
-    cursor = conn.cursor(dictionary=True)
-
-    query = """
-        SELECT l.leave_id, e.emp_id, e.first_name, e.last_name,
-               l.start_date, l.end_date, l.reason
-        FROM leaves l
-        JOIN employees e ON l.emp_id = e.emp_id
-        WHERE l.status = 'Pending'
-    """
-
-    cursor.execute(query)
-    pending = cursor.fetchall()
+@track_action("team_calendar")
+def team_calendar(conn):
+    on_date = input("Date (YYYY-MM-DD, Enter for today): ").strip() or date.today().isoformat()
+    department = input("Department (Enter for all): ").strip()
+    try:
+        out = services.who_is_out(conn, on_date, department)
+    except (services.ServiceError, *storage.DB_ERRORS) as err:
+        print(f"Error: {err}")
+        return
 
-    if not pending:
-        print("No pending leave requests.")
-        cursor.close()
+    if not out:
+        print(f"Nobody is on approved leave on {on_date}.")
         return
+    print(f"\n--- On leave {on_date} ---")
+    for row in out:
+        print(f"{row['emp_id']} | {row['first_name']} {row['last_name']} | {row['department']}")
+
+
+def _parse_id_list(text):
+    """'4, 7, 10-12' -> [4, 7, 10, 11, 12]"""
+    ids = []
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            low, high = part.split("-", 1)
+            ids.extend(range(int(low), int(high) + 1))
+        else:
+            ids.append(int(part))
+    return ids
+
 
+@track_action("approve_leave")
+def approve_leave(conn):
     print("\n--- Pending Leave Requests ---")
-    for leave in pending:
-        print(f"ID {leave['leave_id']} | {leave['first_name']} {leave['last_name']}")
+    print("Filter the queue (press Enter to skip any filter).")
+    filters = {
+        'department': input("Department: ").strip() or None,
+        'emp_id': input("Employee ID: ").strip() or None,
+        'date_from': input("From date (YYYY-MM-DD): ").strip() or None,
+        'date_to': input("To date (YYYY-MM-DD): ").strip() or None,
+    }
+
+    def show(leave):
+        print(f"ID {leave['leave_id']} | {leave['first_name']} {leave['last_name']} ({leave['department']})")
         print(f"   {leave['start_date']} ➝ {leave['end_date']} | {leave['reason']}\n")
 
-    leave_id = input("Enter Leave ID to process (0 to cancel): ").strip()
-    if leave_id == '0':
-        cursor.close()
+    try:
+        answer = browse_pages(services.iter_pending_leave_pages(conn, DEFAULT_PAGE_SIZE, **filters), show,
+                              prompt="Enter Leave IDs (e.g. 4,7,10-15) or 'all'",
+                              empty_message="No pending leave requests.")
+    except services.ServiceError as err:
+        print(f"Error: {err}")
+        return
+    if not answer:
+        return
+
+    try:
+        if answer.lower() == 'all':
+            leave_ids = services.pending_leave_ids(conn, **filters)
+        else:
+            leave_ids = _parse_id_list(answer)
+    except ValueError:
+        print("Invalid Leave ID list.")
+        return
+    if not leave_ids:
         return
 
-    action = input("Approve or Reject? (A/R): ").upper().strip()
+    action = input(f"Approve or Reject {len(leave_ids)} request(s)? (A/R): ").upper().strip()
 
     if action == 'A':
         status = "Approved"
@@ -296,95 +364,123 @@ def approve_leave(conn):
         status = "Rejected"
     else:
         print("Invalid choice.")
-        cursor.close()
         return
 
     try:
-        cursor.execute("UPDATE leaves SET status=%s WHERE leave_id=%s", (status, leave_id))
-        conn.commit()
-        print(f"✅ Leave {leave_id} marked as {status}.")
-    except mysql.connector.Error as err:
+        result = services.set_leave_statuses(conn, leave_ids, status)
+        print(f"✅ {result['updated']} leave request(s) marked as {status}.")
+        skipped = result['requested'] - result['updated']
+        if skipped:
+            print(f"{skipped} ID(s) were not pending and were left unchanged.")
+    except (services.ServiceError, *storage.DB_ERRORS) as err:
         print(f"Error: {err}")
-    finally:
-        cursor.close()
 
 
 # ---------------------------
 # PAYROLL MANAGEMENT
 # ---------------------------
 
-def calculate_payroll(conn):
-    print("\n### Payroll Calculator ###")
+def payroll_management_menu(conn):
+    while True:
+        print("\n### Payroll Management ###")
+        print("1. Calculate payroll for one employee")
+        print("2. Run payroll for all employees")
+        print("3. Payroll cost reports")
+        print("4. Return to previous menu")
+        choice = input("Choose an action: ").strip()
 
-    cursor = conn.cursor(dictionary=True)
+        if choice == '1':
+            calculate_payroll(conn)
+        elif choice == '2':
+            run_payroll_for_all(conn)
+        elif choice == '3':
+            payroll_reports(conn)
+        elif choice == '4':
+            break
+        else:
+            print("Invalid choice.")
 
-    cursor.execute("SELECT emp_id, first_name, last_name, salary FROM employees ORDER BY emp_id")
-    employees = cursor.fetchall()
 
-    if not employees:
-        print("No employees found.")
-        cursor.close()
+@track_action("run_payroll_for_all")
+def run_payroll_for_all(conn):
+    print("\n### Batch Payroll Run ###")
+    confirm = input(f"Generate payroll for every employee dated {date.today()}? (Y/N): ").upper().strip()
+    if confirm != "Y":
         return
 
-    print("\n--- Employee List ---")
-    for emp in employees:
-        print(f"{emp['emp_id']}. {emp['first_name']} {emp['last_name']}  | Salary: {emp['salary']}")
+    def progress(summary):
+        print(f"  ... {summary['rows_written']} payroll rows written")
 
-    emp_id = input("\nEnter Employee ID to calculate payroll: ").strip()
+    try:
+        print_summary(run_batch_payroll(conn, progress=progress))
+    except BatchPayrollError as err:
+        print(f"{err}\nRun the batch again to resume from where it stopped.")
+    except RunInProgress as err:
+        print(f"{err}. Wait for it to finish, or resume it with `python payroll_batch.py --force`.")
+
+@track_action("payroll_reports")
+def payroll_reports(conn):
+    month = input("Month (YYYY-MM, Enter for this month): ").strip() or date.today().strftime("%Y-%m")
+    try:
+        rows = month_summary(conn, month)
+        if rows:
+            print(f"\n--- Payroll cost by department, {month} ---")
+            print_month(rows)
+        else:
+            print(f"No payroll recorded for {month}.")
 
-    cursor.execute("SELECT * FROM employees WHERE emp_id = %s", (emp_id,))
-    emp = cursor.fetchone()
+        department = input("\nTrend for department (Enter for whole company): ").strip() or None
+        print(f"\n--- Last 12 months up to {month} ---")
+        print_trend(trend(conn, department, 12, until=month))
+    except storage.DB_ERRORS as err:
+        print(f"Error: {err}")
 
-    if not emp:
-        print("Employee not found.")
-        cursor.close()
-        return
 
-    basic_salary = float(emp["salary"])
+@track_action("calculate_payroll")
+def calculate_payroll(conn):
+    print("\n### Payroll Calculator ###")
 
-    # HRA fixed proportion
-    hra = basic_salary * 0.24
+    def show(emp):
+        print(f"{emp['emp_id']}. {emp['first_name']} {emp['last_name']}  | Salary: {emp['salary']}")
 
-    # Option B: If salary < 10000, remove both PF and Insurance
-    if basic_salary < 10000:
-        pf = 0.0
-        insurance = 0.0
+    print("\n--- Employee List ---")
+    columns = ("emp_id", "first_name", "last_name", "salary")
+    snapshot = fresh_directory_snapshot(conn)
+    if snapshot is None:
+        pages = iter_employee_pages(conn, columns=columns)
     else:
-        pf = basic_salary * 0.12
-        insurance = 1500.0
-
-    gross_salary = basic_salary + hra
-    deductions = pf + insurance
-    net_salary = gross_salary - deductions
+        pages = snapshot.pages(columns=columns)
+    emp_id = browse_pages(pages, show, prompt="Enter Employee ID to calculate payroll")
+    if not emp_id:
+        return
 
-    # Safety: ensure net salary not negative
-    if net_salary < 0:
-        net_salary = 0.0
+    # components come from the employee's department rule set (payroll_rules)
+    try:
+        payroll = services.calculate_payroll(conn, emp_id)
+    except services.NotFound:
+        print("Employee not found.")
+        return
+    except services.ServiceError as err:
+        print(err)
+        return
 
     print("\n--- Payroll Summary ---")
-    print(f"Employee: {emp['first_name']} {emp['last_name']}")
-    print(f"Basic salary: {basic_salary}")
-    print(f"HRA (24%): {hra}")
-    print(f"Provident Fund (12%): -{pf}")
-    print(f"Insurance: -{insurance}")
-    print(f"Net (take-home): {net_salary}")
+    print(f"Employee: {payroll['first_name']} {payroll['last_name']}")
+    print(f"Rule set: {payroll['rule_set']} (v{payroll['rule_set_version']})")
+    print(f"Basic salary: {payroll['basic_salary']}")
+    for name, amount in payroll['components'].items():
+        print(f"{name}: {amount:+.2f}")
+    print(f"Net (take-home): {payroll['net_salary']}")
 
     save = input("\nWould you like to save this payroll record? (Y/N): ").upper().strip()
 
     if save == "Y":
-        query = """
-            INSERT INTO payroll (emp_id, basic_salary, hra, pf, insurance, net_salary, generated_on)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """
         try:
-            cursor.execute(query, (emp_id, basic_salary, hra, pf, insurance, net_salary, date.today()))
-            conn.commit()
+            services.save_payroll(conn, payroll)
             print("Payroll record saved.")
-        except mysql.connector.Error as err:
+        except storage.DB_ERRORS as err:
             print(f"Could not save payroll: {err}")
 
-    cursor.close()
-
 
 # ---------------------------
 # PERFORMANCE MANAGEMENT
@@ -395,7 +491,8 @@ def performance_management_menu(conn):
         print("\n### Performance Management ###")
         print("1. Add a performance review for an employee")
         print("2. See reviews for an employee")
-        print("3. Return to previous menu")
+        print("3. Calibration: rating distributions and trends")
+        print("4. Return to previous menu")
         choice = input("Choose an action: ").strip()
 
         if choice == '1':
@@ -403,21 +500,20 @@ def performance_management_menu(conn):
         elif choice == '2':
             view_reviews_for_employee(conn)
         elif choice == '3':
+            review_calibration(conn)
+        elif choice == '4':
             break
         else:
             print("Invalid choice.")
 
 
+@track_action("record_performance_review")
 def record_performance_review(conn):
     emp_id = input("Employee ID: ").strip()
     # verify employee exists
-    c = conn.cursor()
-    c.execute("SELECT emp_id FROM employees WHERE emp_id = %s", (emp_id,))
-    if not c.fetchone():
+    if not get_employee(conn, emp_id):
         print("Employee not found.")
-        c.close()
         return
-    c.close()
 
     while True:
         rating_str = input("Rating (1-5): ").strip()
@@ -431,51 +527,56 @@ def record_performance_review(conn):
             print("Invalid rating. Enter an integer between 1 and 5.")
 
     comments = input("Comments: ").strip()
-    today = date.today().strftime("%Y-%m-%d")
-
-    cursor = conn.cursor()
-    query = """INSERT INTO performance_reviews 
-               (emp_id, review_date, rating, comments) 
-               VALUES (%s, %s, %s, %s)"""
 
     try:
-        cursor.execute(query, (emp_id, today, rating, comments))
-        conn.commit()
+        services.record_performance_review(conn, emp_id, rating, comments)
         print("✅ Review recorded.")
-    except mysql.connector.Error as err:
+    except (services.ServiceError, *storage.DB_ERRORS) as err:
         print(f"Error: {err}")
-    finally:
-        cursor.close()
 
 
+@track_action("view_reviews_for_employee")
 def view_reviews_for_employee(conn):
     emp_id = input("Employee ID to view reviews: ").strip()
 
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM employees WHERE emp_id = %s", (emp_id,))
-    emp = cursor.fetchone()
+    emp = get_employee(conn, emp_id)
     if not emp:
         print("Employee not found.")
-        cursor.close()
         return
 
     print(f"\nReviews for {emp['first_name']} {emp['last_name']}:")
 
-    cursor.execute("""
-        SELECT review_date, rating, comments
-        FROM performance_reviews
-        WHERE emp_id = %s
-        ORDER BY review_date DESC, review_id DESC
-    """, (emp_id,))
-    reviews = cursor.fetchall()
+    reviews = services.list_reviews(conn, emp_id)
 
     if not reviews:
         print("Rating not added yet.")
     else:
         for r in reviews:
             print(f" - {r['review_date']}: Rating {r['rating']} | {r['comments']}")
+        print_review_stats(review_analytics.review_stats(reviews[::-1]))
+
 
-    cursor.close()
+def print_review_stats(stats):
+    trend_text = "n/a" if stats['trend_per_year'] is None else f"{stats['trend_per_year']:+.2f} per year"
+    print(f"Average {stats['average']:.2f} over {stats['reviews']} reviews | "
+          f"last 3: {stats['rolling_average']:.2f} | trend: {trend_text}")
+
+
+@track_action("review_calibration")
+def review_calibration(conn):
+    department = input("Department (Enter for all): ").strip() or None
+    try:
+        print("\n--- Latest rating per employee ---")
+        review_analytics.print_distribution(review_analytics.latest_rating_distribution(conn, department))
+        print("\n--- Reviews given in the last 12 months ---")
+        start = shift_month(date.today().strftime("%Y-%m"), -11)
+        review_analytics.print_distribution(review_analytics.rating_distribution(conn, department, date_from=start))
+        print("\n--- Monthly average rating (3-month rolling) ---")
+        review_analytics.print_trend(review_analytics.rating_trend(conn, department))
+        if department and input("\nShow per-employee trends? (Y/N): ").upper().strip() == "Y":
+            review_analytics.print_employee_trends(review_analytics.employee_trends(conn, department))
+    except storage.DB_ERRORS as err:
+        print(f"Error: {err}")
 
 
 # ---------------------------
@@ -486,9 +587,12 @@ def recruitment_management_menu(conn):
     while True:
         print("\n### Recruitment Management Menu ###")
         print("1. Add Job Opening")
-        print("2. View All Job Openings")
+        print("2. Browse Job Openings (filter by status, salary, title)")
         print("3. Update Job Opening")
-        print("4. Back to Main Menu")
+        print("4. Add Candidate / Apply to an Opening")
+        print("5. View an Opening's Applicant Pipeline")
+        print("6. Move Applicants to a Stage")
+        print("7. Back to Main Menu")
 
         choice = input("Enter choice: ").strip()
 
@@ -499,11 +603,18 @@ def recruitment_management_menu(conn):
         elif choice == '3':
             update_job_opening(conn)
         elif choice == '4':
+            add_candidate(conn)
+        elif choice == '5':
+            view_pipeline(conn)
+        elif choice == '6':
+            move_applicants(conn)
+        elif choice == '7':
             break
         else:
             print("Invalid choice.")
 
 
+@track_action("add_job_opening")
 def add_job_opening(conn):
     print("\n--- Add Job Opening ---")
     title = input("Job Title: ").strip()
@@ -516,49 +627,48 @@ def add_job_opening(conn):
             print("Invalid salary. Enter a numeric value.")
     work_hours = input("Work Hours (e.g., 9 AM - 6 PM): ").strip()
 
-    query = """
-        INSERT INTO job_openings (title, salary_offered, work_hours, status)
-        VALUES (%s, %s, %s, 'Open')
-    """
-
-    cursor = conn.cursor()
     try:
-        cursor.execute(query, (title, salary, work_hours))
-        conn.commit()
+        services.add_job_opening(conn, title, salary, work_hours)
         print("✅ Job opening added successfully.")
-    except mysql.connector.Error as err:
+    except (services.ServiceError, *storage.DB_ERRORS) as err:
         print(f"Error: {err}")
-    finally:
-        cursor.close()
 
 
+@track_action("view_job_openings")
 def view_job_openings(conn):
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM job_openings ORDER BY job_id")
-    jobs = cursor.fetchall()
-    cursor.close()
-
-    if not jobs:
-        print("No job openings available.")
-        return
-
     print("\n--- Job Openings ---")
-    for job in jobs:
+    print("Filter the list (press Enter to skip any filter).")
+    filters = {
+        'status': input("Status (Open/Closed): ").strip() or None,
+        'min_salary': input("Minimum salary: ").strip() or None,
+        'max_salary': input("Maximum salary: ").strip() or None,
+        'title_prefix': input("Title starts with: ").strip() or None,
+    }
+
+    def show(job):
         print(f"ID: {job['job_id']} | {job['title']}")
         print(f"Salary: {job['salary_offered']} | Hours: {job['work_hours']}")
         print(f"Status: {job['status']}\n")
 
+    try:
+        job_id = browse_pages(services.iter_job_opening_pages(conn, DEFAULT_PAGE_SIZE, **filters), show,
+                              prompt="Enter Job ID to view its applicants",
+                              empty_message="No job openings match.")
+    except services.ServiceError as err:
+        print(f"Error: {err}")
+        return
+    if job_id:
+        view_pipeline(conn, job_id)
+
 
+@track_action("update_job_opening")
 def update_job_opening(conn):
     job_id = input("Enter Job ID to update: ").strip()
 
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM job_openings WHERE job_id=%s", (job_id,))
-    job = cursor.fetchone()
-
-    if not job:
+    try:
+        job = services.get_job_opening(conn, job_id)
+    except services.NotFound:
         print("Job opening not found.")
-        cursor.close()
         return
 
     print("\n--- Current Job Details ---")
@@ -571,38 +681,128 @@ def update_job_opening(conn):
     new_hours = input("New Work Hours (leave blank = no change): ").strip()
     new_status = input("New Status (Open/Closed) (leave blank = no change): ").strip()
 
-    updates = []
-    values = []
-
     if new_salary:
         try:
-            values.append(float(new_salary))
-            updates.append("salary_offered = %s")
+            float(new_salary)
         except ValueError:
             print("Invalid salary entered. Salary not changed.")
-    if new_hours:
-        updates.append("work_hours = %s")
-        values.append(new_hours)
-    if new_status:
-        updates.append("status = %s")
-        values.append(new_status)
-
-    if not updates:
+            new_salary = None
+
+    if not (new_salary or new_hours or new_status):
         print("No changes entered.")
-        cursor.close()
         return
 
-    values.append(job_id)
-    query = "UPDATE job_openings SET " + ", ".join(updates) + " WHERE job_id=%s"
-
     try:
-        cursor.execute(query, tuple(values))
-        conn.commit()
+        services.update_job_opening(conn, job_id, new_salary, new_hours, new_status)
         print("✅ Job updated successfully.")
-    except mysql.connector.Error as err:
+    except (services.ServiceError, *storage.DB_ERRORS) as err:
+        print(f"Error: {err}")
+
+
+@track_action("add_candidate")
+def add_candidate(conn):
+    print("\n--- Add Candidate ---")
+    candidate_id = input("Existing Candidate ID (leave blank to register a new candidate): ").strip()
+    try:
+        if not candidate_id:
+            candidate = services.add_candidate(conn, input("First name: ").strip(), input("Last name: ").strip(),
+                                               input("Email: ").strip(), input("Phone: ").strip())
+            candidate_id = candidate['candidate_id']
+            print(f"✅ Candidate {candidate_id} registered.")
+        job_ids = _parse_id_list(input("Apply to Job ID(s) (e.g. 4,7 — blank = none): ").strip() or "")
+    except ValueError:
+        print("Invalid Job ID list.")
+        return
+    except (services.ServiceError, *storage.DB_ERRORS) as err:
+        print(f"Error: {err}")
+        return
+
+    for job_id in job_ids:
+        try:
+            application = services.apply_for_job(conn, candidate_id, job_id)
+            print(f"✅ Application {application['application_id']} opened for job {job_id}.")
+        except (services.ServiceError, *storage.DB_ERRORS) as err:
+            print(f"Job {job_id}: {err}")
+
+
+@track_action("view_pipeline")
+def view_pipeline(conn, job_id=None):
+    job_id = job_id or input("Enter Job ID: ").strip()
+    try:
+        counts = services.pipeline_counts(conn, job_id)
+    except services.NotFound:
+        print("Job opening not found.")
+        return
+    except services.ServiceError as err:
+        print(f"Error: {err}")
+        return
+
+    print("\n--- Pipeline ---")
+    print(" | ".join(f"{stage}: {n}" for stage, n in counts.items()))
+    stage = input("Show applicants in stage (blank = all, q = back): ").strip().title()
+    if stage == 'Q':
+        return
+
+    def show(app):
+        print(f"App {app['application_id']} | Candidate {app['candidate_id']}: {app['first_name']} {app['last_name']}"
+              f" <{app['email']}> | {app['stage']} since {app['stage_changed_at']}")
+
+    try:
+        candidate_id = browse_pages(services.iter_application_pages(conn, job_id, DEFAULT_PAGE_SIZE, stage or None),
+                                    show, prompt="Enter a Candidate ID to see their applications",
+                                    empty_message="No applicants.")
+    except services.ServiceError as err:
+        print(f"Error: {err}")
+        return
+    if candidate_id:
+        show_candidate(conn, candidate_id)
+
+
+def show_candidate(conn, candidate_id):
+    try:
+        candidate = services.get_candidate(conn, candidate_id)
+    except services.ServiceError as err:
+        print(f"Error: {err}")
+        return
+    print(f"\nCandidate {candidate['candidate_id']}: {candidate['first_name']} {candidate['last_name']}"
+          f" | {candidate['email']} | {candidate['phone']}")
+    for app in candidate['applications']:
+        print(f"   App {app['application_id']} | Job {app['job_id']} {app['title']} | {app['stage']}"
+              f" (applied {app['applied_at']})")
+
+
+@track_action("move_applicants")
+def move_applicants(conn):
+    print("\n--- Move Applicants ---")
+    job_id = input("Job ID: ").strip()
+    answer = input("Application IDs (e.g. 4,7,10-15) or a stage name to move everyone in it: ").strip()
+    if not answer:
+        return
+    try:
+        if answer.title() in services.STAGE_TRANSITIONS:
+            application_ids = services.application_ids_in_stage(conn, job_id, answer.title())
+        else:
+            application_ids = _parse_id_list(answer)
+    except ValueError:
+        print("Invalid Application ID list.")
+        return
+    except services.ServiceError as err:
         print(f"Error: {err}")
-    finally:
-        cursor.close()
+        return
+    if not application_ids:
+        print("No applicants to move.")
+        return
+
+    stage = input(f"Move {len(application_ids)} applicant(s) to which stage "
+                  f"({'/'.join(services.APPLICATION_STAGES[1:])})? ").strip().title()
+    try:
+        result = services.move_applications(conn, application_ids, stage)
+    except (services.ServiceError, *storage.DB_ERRORS) as err:
+        print(f"Error: {err}")
+        return
+    print(f"✅ {result['moved']} applicant(s) moved to {stage}.")
+    if result['skipped']:
+        print(f"{len(result['skipped'])} skipped (unknown ID, or their stage can't move to {stage}).")
 
 
 # ---------------------------
@@ -627,7 +827,7 @@ def main_menu(conn):
         elif choice == '2':
             leave_management_menu(conn, role)
         elif choice == '3':
-            calculate_payroll(conn)
+            payroll_management_menu(conn)
         elif choice == '4':
             performance_management_menu(conn)
         elif choice == '5':
@@ -644,19 +844,12 @@ def main_menu(conn):
 # ---------------------------
 
 if __name__ == "__main__":
-    try:
-        conn = mysql.connector.connect(
-            host="localhost",
-            user="your_user",
-            password="your_password",
-            database="your_database"
-        )
-        main_menu(conn)
-    except mysql.connector.Error as err:
-        print(f"Database connection error: {err}")
-    finally:
+    # Borrow from the same pool main.py uses instead of opening a private connection.
+    from main import get_db_connection, get_pool
+    conn = get_db_connection()
+    if conn:
         try:
-            if conn.is_connected():
-                conn.close()
-        except Exception:
-            pass
\ No newline at end of file
+            main_menu(conn)
+        finally:
+            conn.close()
+            get_pool().close()
@@ -0,0 +1,216 @@
+"""
+Bulk-load employees from a CSV or JSONL file.
+
+    python import_employees.py staff.csv
+    python import_employees.py staff.jsonl --batch-size 2000 --errors rejected.csv
+
+CSV files need a header row; JSONL files hold one JSON object per line. Both
+use the employees column names: first_name, last_name, email, phone,
+department, job_title, salary. Rows that fail validation (or that the
+database rejects) are reported and skipped; the rest are loaded.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+import employee_history
+import storage
+from directory_snapshot import fresh_directory_snapshot
+
+EMPLOYEE_FIELDS = ("first_name", "last_name", "email", "phone", "department", "job_title", "salary")
+
+INSERT_EMPLOYEE = """
+    INSERT INTO employees (first_name, last_name, email, phone, department, job_title, salary)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Highest emp_id before a batch goes in; the batch's employees are the ones
+# above it. On MySQL FOR UPDATE also locks the gap above the last row, so no
+# other session can add an employee in that range until the batch commits;
+# on SQLite the batch holds the database write lock from here on.
+LAST_EMP_ID = "SELECT MAX(emp_id) FROM employees"
+
+
+class RowError(ValueError):
+    """A source row that can't be loaded."""
+
+
+def validate_employee(record):
+    """
+    Apply the same rules as add_employee: text fields are stripped, salary
+    must be a number. Returns the INSERT parameter tuple.
+    """
+    values = []
+    for field in EMPLOYEE_FIELDS[:-1]:
+        value = record.get(field)
+        values.append("" if value is None else str(value).strip())
+
+    salary_raw = record.get("salary")
+    if salary_raw is None or str(salary_raw).strip() == "":
+        raise RowError("salary is missing")
+    try:
+        salary = float(str(salary_raw).strip())
+    except ValueError:
+        raise RowError(f"salary {salary_raw!r} is not a number")
+    values.append(salary)
+    return tuple(values)
+
+
+def read_records(path, fmt=None):
+    """Yield (line_number, dict) pairs from a CSV or JSONL file, one at a time."""
+    fmt = fmt or ("jsonl" if path.lower().endswith((".jsonl", ".ndjson", ".json")) else "csv")
+    with open(path, newline="", encoding="utf-8") as fh:
+        if fmt == "csv":
+            reader = csv.DictReader(fh)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_number, line in enumerate(fh, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as err:
+                    yield line_number, RowError(f"invalid JSON: {err}")
+                    continue
+                if not isinstance(record, dict):
+                    yield line_number, RowError("expected a JSON object")
+                    continue
+                yield line_number, record
+
+
+def _last_emp_id(conn, cursor):
+    if storage.dialect_of(conn) == "sqlite":
+        conn.start_transaction()
+        cursor.execute(LAST_EMP_ID)
+    else:
+        cursor.execute(LAST_EMP_ID + " FOR UPDATE")
+    return cursor.fetchone()[0] or 0
+
+
+def _flush(conn, batch, report):
+    """
+    Insert one batch with a single executemany, log the new employees'
+    starting state to employee_history, and commit; return rows loaded.
+    """
+    if not batch:
+        return 0
+    cursor = conn.cursor()
+    try:
+        after = _last_emp_id(conn, cursor)
+        cursor.executemany(INSERT_EMPLOYEE, [params for _, params in batch])
+        employee_history.record_inserted_after(cursor, after)
+        conn.commit()
+        return len(batch)
+    except Exception:
+        conn.rollback()
+    finally:
+        cursor.close()
+
+    # Something in the batch was rejected: isolate it row by row, still one commit.
+    loaded = 0
+    cursor = conn.cursor()
+    try:
+        after = _last_emp_id(conn, cursor)
+        for line_number, params in batch:
+            try:
+                cursor.execute(INSERT_EMPLOYEE, params)
+                loaded += 1
+            except storage.DB_ERRORS as err:
+                report(line_number, f"database rejected row: {err}")
+        employee_history.record_inserted_after(cursor, after)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return loaded
+
+
+def import_employees(conn, records, batch_size=DEFAULT_BATCH_SIZE, report=None, dry_run=False):
+    """
+    Load (line_number, record) pairs into employees in batches, then bring
+    the directory snapshot (if enabled) up to date with them.
+    Returns a summary dict with counts of rows read, loaded and rejected.
+    """
+    summary = {"read": 0, "loaded": 0, "rejected": 0, "batches": 0}
+
+    def reject(line_number, reason):
+        summary["rejected"] += 1
+        if report:
+            report(line_number, reason)
+
+    batch = []
+    for line_number, record in records:
+        summary["read"] += 1
+        if isinstance(record, Exception):
+            reject(line_number, str(record))
+            continue
+        try:
+            params = validate_employee(record)
+        except RowError as err:
+            reject(line_number, str(err))
+            continue
+        batch.append((line_number, params))
+        if len(batch) >= batch_size:
+            if not dry_run:
+                summary["loaded"] += _flush(conn, batch, reject)
+                summary["batches"] += 1
+            batch = []
+
+    if batch and not dry_run:
+        summary["loaded"] += _flush(conn, batch, reject)
+        summary["batches"] += 1
+
+    if summary["loaded"]:
+        fresh_directory_snapshot(conn)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import employees from CSV or JSONL.")
+    parser.add_argument("path", help="CSV (with header) or JSONL file")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="override detection by file extension")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="rows per INSERT/commit")
+    parser.add_argument("--errors", help="also write rejected rows (line, reason) to this CSV file")
+    parser.add_argument("--dry-run", action="store_true", help="validate only, load nothing")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        print(f"File not found: {args.path}")
+        sys.exit(2)
+
+    error_file = open(args.errors, "w", newline="", encoding="utf-8") if args.errors else None
+    error_writer = csv.writer(error_file) if error_file else None
+    if error_writer:
+        error_writer.writerow(["line", "reason"])
+
+    def report(line_number, reason):
+        print(f"Line {line_number}: {reason}", file=sys.stderr)
+        if error_writer:
+            error_writer.writerow([line_number, reason])
+
+    conn = None
+    if not args.dry_run:
+        from main import get_db_connection
+        conn = get_db_connection()
+        if not conn:
+            sys.exit(1)
+    try:
+        summary = import_employees(conn, read_records(args.path, args.format),
+                                   args.batch_size, report, args.dry_run)
+    finally:
+        if conn:
+            conn.close()
+        if error_file:
+            error_file.close()
+
+    verb = "Validated" if args.dry_run else "Loaded"
+    count = summary["read"] - summary["rejected"] if args.dry_run else summary["loaded"]
+    print(f"{verb} {count} of {summary['read']} rows ({summary['rejected']} rejected).")
+    sys.exit(1 if summary["rejected"] else 0)
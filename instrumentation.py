@@ -0,0 +1,389 @@
+import contextlib
+import contextvars
+import functools
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# ---------------------------
+# QUERY INSTRUMENTATION
+# ---------------------------
+# Wrap a connect() callable with instrument_connect() and every cursor it
+# hands out is timed. Per statement (literals and IN-lists folded into one
+# fingerprint) we keep a latency histogram, call / error counts and rows
+# returned; per user action (see track_action) the number of round trips
+# and the time spent in the database. Statements slower than the threshold
+# go to the slow-query log. render_prometheus() exports everything in the
+# Prometheus text format.
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 25, 50, 100, 250, 1000)
+
+SLOW_QUERY_SECONDS = 0.5
+SLOW_LOG_KEEP = 100         # recent slow queries kept in memory
+FINGERPRINT_MAX = 200
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)      # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """[(upper bound label, cumulative count)] as Prometheus expects."""
+        out, running = [], 0
+        for bound, n in zip(self.buckets + (None,), self.counts):
+            running += n
+            out.append(("+Inf" if bound is None else repr(bound), running))
+        return out
+
+    def quantile(self, q):
+        """Upper bucket bound holding the q-th quantile (coarse, for reports)."""
+        if not self.count:
+            return 0.0
+        target, running = q * self.count, 0
+        for bound, n in zip(self.buckets, self.counts):
+            running += n
+            if running >= target:
+                return bound
+        return float("inf")
+
+
+class StatementStats:
+    __slots__ = ("latency", "calls", "errors", "rows")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+
+
+class ActionStats:
+    __slots__ = ("queries", "db_seconds", "calls")
+
+    def __init__(self):
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_seconds = Histogram(LATENCY_BUCKETS)
+        self.calls = 0
+
+
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+
+@functools.lru_cache(maxsize=2048)
+def fingerprint(query):
+    """Normalise a statement so each call site aggregates under one key."""
+    text = _WHITESPACE.sub(" ", query).strip()
+    text = _STRING.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _IN_LIST.sub("(...)", text.replace("%s", "?"))
+    return text[:FINGERPRINT_MAX]
+
+
+class Metrics:
+    def __init__(self, slow_query_seconds=SLOW_QUERY_SECONDS):
+        self.slow_query_seconds = slow_query_seconds
+        self.slow_log_path = None
+        self.statements = {}        # fingerprint -> StatementStats
+        self.actions = {}           # action name -> ActionStats
+        self.slow_queries = deque(maxlen=SLOW_LOG_KEEP)
+        self.slow_total = 0
+        self._lock = threading.Lock()
+
+    def record_query(self, query, seconds, rows=0, error=None):
+        key = fingerprint(query)
+        with self._lock:
+            stats = self.statements.get(key)
+            if stats is None:
+                stats = self.statements[key] = StatementStats()
+            stats.latency.observe(seconds)
+            stats.calls += 1
+            stats.rows += rows
+            if error is not None:
+                stats.errors += 1
+        action = _current_action.get()
+        while action is not None:
+            action.queries += 1
+            action.db_seconds += seconds
+            action = action.parent
+        if seconds >= self.slow_query_seconds:
+            self._log_slow(key, query, seconds, error)
+
+    def record_rows(self, query, rows):
+        key = fingerprint(query)
+        with self._lock:
+            stats = self.statements.get(key)
+            if stats is not None:
+                stats.rows += rows
+
+    def record_action(self, name, queries, db_seconds):
+        with self._lock:
+            stats = self.actions.get(name)
+            if stats is None:
+                stats = self.actions[name] = ActionStats()
+            stats.queries.observe(queries)
+            stats.db_seconds.observe(db_seconds)
+            stats.calls += 1
+
+    def _log_slow(self, key, query, seconds, error):
+        action = _current_action.get()
+        entry = {
+            'at': datetime.now().isoformat(timespec="seconds"),
+            'seconds': round(seconds, 4),
+            'action': action.name if action else None,
+            'statement': key,
+            'error': str(error) if error else None,
+        }
+        with self._lock:
+            self.slow_queries.append(entry)
+            self.slow_total += 1
+            path = self.slow_log_path
+        line = (f"{entry['at']} slow query {seconds * 1000:.1f} ms"
+                f" [{entry['action'] or '-'}] {_WHITESPACE.sub(' ', query).strip()}")
+        if path:
+            with open(path, "a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+        else:
+            print(line, file=sys.stderr)
+
+    def reset(self):
+        with self._lock:
+            self.statements.clear()
+            self.actions.clear()
+            self.slow_queries.clear()
+            self.slow_total = 0
+
+
+metrics = Metrics()
+
+
+def configure(slow_query_seconds=None, slow_log_path=None):
+    """Set the slow-query threshold and send the slow log to a file instead of stderr."""
+    if slow_query_seconds is not None:
+        metrics.slow_query_seconds = slow_query_seconds
+    if slow_log_path is not None:
+        metrics.slow_log_path = slow_log_path
+
+
+# ---------------------------
+# USER ACTIONS
+# ---------------------------
+
+class _Action:
+    __slots__ = ("name", "parent", "queries", "db_seconds")
+
+    def __init__(self, name, parent):
+        self.name = name
+        self.parent = parent
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_current_action = contextvars.ContextVar("hrms_action", default=None)
+
+
+class track_action(contextlib.ContextDecorator):
+    """
+    Count the queries issued while one user action runs:
+
+        @track_action("view_employee")
+        def view_employee(conn): ...
+
+    Nested actions each see the queries of the ones inside them.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._tokens = []
+
+    def __enter__(self):
+        action = _Action(self.name, _current_action.get())
+        self._tokens.append((_current_action.set(action), action))
+        return action
+
+    def __exit__(self, exc_type, exc, tb):
+        token, action = self._tokens.pop()
+        _current_action.reset(token)
+        metrics.record_action(self.name, action.queries, action.db_seconds)
+        return False
+
+    def _recreate_cm(self):
+        # a fresh instance per call, so recursive / concurrent calls don't share state
+        return track_action(self.name)
+
+
+# ---------------------------
+# CURSOR / CONNECTION WRAPPERS
+# ---------------------------
+
+class InstrumentedCursor:
+    def __init__(self, cursor, registry):
+        self._wrapped = cursor
+        self._metrics = registry
+        self._query = None
+
+    def __getattr__(self, name):
+        return getattr(self._wrapped, name)
+
+    def _timed(self, method, query, params):
+        started = time.perf_counter()
+        try:
+            result = method(query, params)
+        except Exception as err:
+            self._metrics.record_query(query, time.perf_counter() - started, error=err)
+            raise
+        elapsed = time.perf_counter() - started
+        # rows for reads are counted as they are fetched; writes report rowcount
+        rowcount = getattr(self._wrapped, "rowcount", -1)
+        is_read = getattr(self._wrapped, "description", None) is not None
+        self._metrics.record_query(query, elapsed, 0 if is_read or rowcount is None or rowcount < 0 else rowcount)
+        self._query = query if is_read else None
+        return result
+
+    def execute(self, query, params=()):
+        return self._timed(self._wrapped.execute, query, params)
+
+    def executemany(self, query, seq_of_params):
+        return self._timed(self._wrapped.executemany, query, seq_of_params)
+
+    def _fetched(self, rows):
+        if self._query is not None and rows:
+            self._metrics.record_rows(self._query, rows)
+
+    def fetchone(self):
+        row = self._wrapped.fetchone()
+        self._fetched(1 if row is not None else 0)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._wrapped.fetchmany(size) if size is not None else self._wrapped.fetchmany()
+        self._fetched(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._wrapped.fetchall()
+        self._fetched(len(rows))
+        return rows
+
+    def __iter__(self):
+        for row in self._wrapped:
+            self._fetched(1)
+            yield row
+
+
+class InstrumentedConnection:
+    """Delegates to the real connection; cursor() returns an InstrumentedCursor."""
+
+    def __init__(self, conn, registry=None):
+        self._wrapped = conn
+        self._metrics = registry or metrics
+
+    def __getattr__(self, name):
+        return getattr(self._wrapped, name)
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._wrapped.cursor(*args, **kwargs), self._metrics)
+
+
+def instrument_connect(connect, registry=None):
+    """Wrap a connect() callable (as given to ConnectionPool) so every connection is instrumented."""
+    return lambda: InstrumentedConnection(connect(), registry)
+
+
+# ---------------------------
+# EXPORT
+# ---------------------------
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def _histogram_lines(name, labels, histogram):
+    lines = []
+    for bound, count in histogram.cumulative():
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.6f}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+def render_prometheus(registry=None):
+    """All aggregated metrics in the Prometheus text exposition format."""
+    registry = registry or metrics
+    with registry._lock:
+        statements = sorted(registry.statements.items())
+        actions = sorted(registry.actions.items())
+        slow_total = registry.slow_total
+
+    lines = [
+        "# HELP hrms_query_duration_seconds Statement latency by statement fingerprint.",
+        "# TYPE hrms_query_duration_seconds histogram",
+    ]
+    for key, stats in statements:
+        lines.extend(_histogram_lines("hrms_query_duration_seconds", f'statement="{_label(key)}"', stats.latency))
+    lines += ["# HELP hrms_query_rows_total Rows returned (reads) or affected (writes).",
+              "# TYPE hrms_query_rows_total counter"]
+    lines += [f'hrms_query_rows_total{{statement="{_label(k)}"}} {s.rows}' for k, s in statements]
+    lines += ["# HELP hrms_query_errors_total Statements that raised.",
+              "# TYPE hrms_query_errors_total counter"]
+    lines += [f'hrms_query_errors_total{{statement="{_label(k)}"}} {s.errors}' for k, s in statements]
+    lines += ["# HELP hrms_action_queries Database round trips per user action.",
+              "# TYPE hrms_action_queries histogram"]
+    for name, stats in actions:
+        lines.extend(_histogram_lines("hrms_action_queries", f'action="{_label(name)}"', stats.queries))
+    lines += ["# HELP hrms_action_db_seconds Time spent in the database per user action.",
+              "# TYPE hrms_action_db_seconds histogram"]
+    for name, stats in actions:
+        lines.extend(_histogram_lines("hrms_action_db_seconds", f'action="{_label(name)}"', stats.db_seconds))
+    lines += ["# HELP hrms_slow_queries_total Statements over the slow-query threshold.",
+              "# TYPE hrms_slow_queries_total counter",
+              f"hrms_slow_queries_total {slow_total}"]
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path, registry=None):
+    """Write the metrics atomically (for node_exporter's textfile collector)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(render_prometheus(registry))
+    os.replace(tmp, path)
+
+
+def report(registry=None, top=15):
+    """Plain-text summary: slowest statements by total time, then actions."""
+    registry = registry or metrics
+    with registry._lock:
+        statements = sorted(registry.statements.items(), key=lambda kv: -kv[1].latency.sum)[:top]
+        actions = sorted(registry.actions.items())
+    lines = [f"{'total ms':>10} {'calls':>7} {'p95 <=':>8} {'rows':>8}  statement"]
+    for key, s in statements:
+        lines.append(f"{s.latency.sum * 1000:>10.1f} {s.calls:>7} {s.latency.quantile(0.95) * 1000:>6.1f}ms"
+                     f" {s.rows:>8}  {key[:80]}")
+    lines.append("")
+    lines.append(f"{'action':<28} {'calls':>6} {'avg queries':>12} {'avg db ms':>10}")
+    for name, a in actions:
+        lines.append(f"{name:<28} {a.calls:>6} {a.queries.sum / a.calls:>12.1f}"
+                     f" {a.db_seconds.sum / a.calls * 1000:>10.2f}")
+    return "\n".join(lines)
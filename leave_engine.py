@@ -0,0 +1,254 @@
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+from employee_listing import DEFAULT_FETCH_SIZE, stream_chunks
+
+# ---------------------------
+# LEAVE ENGINE
+# ---------------------------
+# An in-process view of every booked (Pending or Approved) leave, kept so that
+# balances and the team calendar never scan the leaves table. Enabled with
+# HRMS_LEAVE_ENGINE=1 (main.py). It only follows the bookings and status
+# changes made through this process, so services.apply_leave still checks
+# overlaps against the database, under a per-employee lock.
+#
+#   per employee   sorted, non-overlapping intervals with prefix sums of
+#                  working days -> overlap test and days-used-in-range by bisect
+#   per day        the leave_ids covering that day -> "who is out on X"
+#
+# Dates are held as ordinals (date.toordinal()) throughout.
+
+ANNUAL_LEAVE_DAYS = 24          # working days per calendar year
+BOOKED_STATUSES = ("Pending", "Approved")
+
+
+def _ordinal(value):
+    if isinstance(value, date):
+        return value.toordinal()
+    return date.fromisoformat(str(value)[:10]).toordinal()
+
+
+def working_days(first, last):
+    """Mon-Fri days in the inclusive ordinal range [first, last]."""
+    if last < first:
+        return 0
+    full_weeks, extra = divmod(last - first + 1, 7)
+    days = full_weeks * 5
+    weekday = date.fromordinal(first).weekday()
+    for i in range(extra):
+        if (weekday + i) % 7 < 5:
+            days += 1
+    return days
+
+
+class EmployeeLeaves:
+    """One employee's booked leaves as parallel sorted arrays."""
+
+    __slots__ = ("starts", "ends", "leave_ids", "_prefix")
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.leave_ids = []
+        self._prefix = None     # _prefix[i] = working days in intervals [0, i)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _span(self, first, last):
+        # intervals are disjoint, so both starts and ends are sorted
+        return bisect_left(self.ends, first), bisect_right(self.starts, last)
+
+    def overlapping(self, first, last):
+        """leave_ids of booked intervals touching [first, last]."""
+        lo, hi = self._span(first, last)
+        return self.leave_ids[lo:hi]
+
+    def add(self, leave_id, first, last):
+        i = bisect_left(self.starts, first)
+        self.starts.insert(i, first)
+        self.ends.insert(i, last)
+        self.leave_ids.insert(i, leave_id)
+        self._prefix = None
+
+    def remove(self, leave_id, first):
+        i = bisect_left(self.starts, first)
+        while i < len(self.starts) and self.starts[i] == first:
+            if self.leave_ids[i] == leave_id:
+                del self.starts[i], self.ends[i], self.leave_ids[i]
+                self._prefix = None
+                return True
+            i += 1
+        return False
+
+    def days_used(self, first, last):
+        """Working days booked inside [first, last]."""
+        lo, hi = self._span(first, last)
+        if lo >= hi:
+            return 0
+        if self._prefix is None:
+            prefix = [0]
+            for s, e in zip(self.starts, self.ends):
+                prefix.append(prefix[-1] + working_days(s, e))
+            self._prefix = prefix
+        total = self._prefix[hi] - self._prefix[lo]
+        # only the two edge intervals can stick out of the range
+        for i in {lo, hi - 1}:
+            s, e = self.starts[i], self.ends[i]
+            total -= working_days(s, e) - working_days(max(s, first), min(e, last))
+        return total
+
+
+class LeaveEngine:
+    def __init__(self, allowance=ANNUAL_LEAVE_DAYS):
+        self.allowance = allowance
+        self._by_employee = {}      # emp_id -> EmployeeLeaves
+        self._leaves = {}           # leave_id -> (emp_id, first, last, status)
+        self._by_day = {}           # ordinal -> set of leave_ids
+        self._departments = {}      # emp_id -> department
+        self.overlaps = []          # leave_ids loaded from data that was already double-booked
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._leaves)
+
+    def note_employee(self, emp_id, department):
+        with self._lock:
+            self._departments[emp_id] = department
+
+    def conflicts(self, emp_id, start_date, end_date):
+        """leave_ids of this employee's booked leaves overlapping the range."""
+        with self._lock:
+            leaves = self._by_employee.get(emp_id)
+            if not leaves:
+                return []
+            return leaves.overlapping(_ordinal(start_date), _ordinal(end_date))
+
+    def book(self, leave_id, emp_id, start_date, end_date, status="Pending"):
+        first, last = _ordinal(start_date), _ordinal(end_date)
+        with self._lock:
+            self.release(leave_id)
+            leaves = self._by_employee.setdefault(emp_id, EmployeeLeaves())
+            if leaves.overlapping(first, last):
+                # pre-existing double booking: on the calendar, but kept out of
+                # the interval arrays so they stay disjoint
+                self.overlaps.append(leave_id)
+            else:
+                leaves.add(leave_id, first, last)
+            self._leaves[leave_id] = (emp_id, first, last, status)
+            for day in range(first, last + 1):
+                self._by_day.setdefault(day, set()).add(leave_id)
+
+    def set_status(self, leave_id, status, only_pending=False):
+        """Follow a status change; anything not booked frees the interval."""
+        with self._lock:
+            entry = self._leaves.get(leave_id)
+            if entry is None or (only_pending and entry[3] != "Pending"):
+                return
+            if status in BOOKED_STATUSES:
+                self._leaves[leave_id] = entry[:3] + (status,)
+            else:
+                self.release(leave_id)
+
+    def release(self, leave_id):
+        with self._lock:
+            entry = self._leaves.pop(leave_id, None)
+            if entry is None:
+                return
+            emp_id, first, last, _ = entry
+            leaves = self._by_employee[emp_id]
+            if leaves.remove(leave_id, first):
+                self._promote_overlaps(emp_id, leaves, first, last)
+            elif leave_id in self.overlaps:
+                self.overlaps.remove(leave_id)
+            for day in range(first, last + 1):
+                ids = self._by_day.get(day)
+                if ids is not None:
+                    ids.discard(leave_id)
+                    if not ids:
+                        del self._by_day[day]
+
+    def _promote_overlaps(self, emp_id, leaves, first, last):
+        """Move double-booked leaves that [first, last] was blocking into the interval arrays."""
+        for leave_id in list(self.overlaps):
+            other_emp, other_first, other_last, _ = self._leaves[leave_id]
+            if other_emp != emp_id or other_last < first or other_first > last:
+                continue
+            if not leaves.overlapping(other_first, other_last):
+                leaves.add(leave_id, other_first, other_last)
+                self.overlaps.remove(leave_id)
+
+    def days_used(self, emp_id, year):
+        with self._lock:
+            leaves = self._by_employee.get(emp_id)
+            if not leaves:
+                return 0
+            return leaves.days_used(date(year, 1, 1).toordinal(), date(year, 12, 31).toordinal())
+
+    def balance(self, emp_id, year):
+        used = self.days_used(emp_id, year)
+        return {'emp_id': emp_id, 'year': year, 'allowance': self.allowance,
+                'used': used, 'remaining': self.allowance - used}
+
+    def out_on(self, on_date, department=None, include_pending=False):
+        """[(emp_id, leave_id, status)] for everyone on leave that day."""
+        statuses = BOOKED_STATUSES if include_pending else ("Approved",)
+        with self._lock:
+            out = []
+            for leave_id in self._by_day.get(_ordinal(on_date), ()):
+                emp_id, _, _, status = self._leaves[leave_id]
+                if status not in statuses:
+                    continue
+                if department and self._departments.get(emp_id) != department:
+                    continue
+                out.append((emp_id, leave_id, status))
+            return sorted(out)
+
+
+# ---------------------------
+# PROCESS-WIDE ENGINE
+# ---------------------------
+# Off by default: a long-running process enables it once at startup. While it
+# is off, callers fall back to indexed queries on the leaves table.
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_leave_engine():
+    return _engine
+
+
+def enable_leave_engine(conn, allowance=ANNUAL_LEAVE_DAYS):
+    """Load every booked leave and each employee's department in two streamed reads."""
+    global _engine
+    engine = LeaveEngine(allowance)
+    chunks = stream_chunks(conn, "SELECT emp_id, department FROM employees", (), DEFAULT_FETCH_SIZE)
+    for rows in chunks:
+        for emp_id, department in rows:
+            engine.note_employee(emp_id, department)
+    chunks = stream_chunks(conn, """
+        SELECT leave_id, emp_id, start_date, end_date, status
+        FROM leaves
+        WHERE status IN ('Pending', 'Approved')
+    """, (), DEFAULT_FETCH_SIZE)
+    for rows in chunks:
+        for leave_id, emp_id, start_date, end_date, status in rows:
+            engine.book(leave_id, emp_id, start_date, end_date, status)
+    with _engine_lock:
+        _engine = engine
+    return engine
+
+
+def disable_leave_engine():
+    global _engine
+    with _engine_lock:
+        _engine = None
+
+
+def note_employee(emp):
+    """Keep the engine's department map in step with an added / updated employee."""
+    engine = _engine
+    if engine is not None:
+        engine.note_employee(emp['emp_id'], emp.get('department'))
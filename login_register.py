@@ -1,11 +1,11 @@
-import hashlib
 import getpass
-import mysql.connector
-
-def hash_password(password):
-    """Return SHA-256 hash of the provided password."""
-    return hashlib.sha256(password.encode()).hexdigest()
+from instrumentation import track_action
+from passwords import (burn_dummy_verify, cached_login, forget_logins, hash_password,
+                       remember_login, verify_password)
+from statements import fetch_one
+import storage
 
+@track_action("register_user")
 def register_user(conn, is_admin=False):
     """Register a new user. For admins set is_admin=True."""
     username = input("Choose a username: ").strip()
@@ -28,26 +28,90 @@ def register_user(conn, is_admin=False):
         cursor.execute(query, (username, hashed_pass, role))
         conn.commit()
         print(f"User '{username}' created successfully as {role}.")
-    except mysql.connector.Error as err:
+    except storage.DB_ERRORS as err:
         print(f"Registration failed: {err}")
     finally:
         cursor.close()
 
+@track_action("login")
+def authenticate(conn, username, password):
+    """
+    Verify credentials and return a small user dict, or None.
+    Recently verified logins are answered from the session cache without a
+    DB round trip; legacy SHA-256 hashes are upgraded on success.
+    """
+    user = cached_login(username, password)
+    if user:
+        return user
+
+    row = fetch_one(conn, "user_by_username", (username,))
+
+    if not row:
+        burn_dummy_verify(password)
+        return None
+
+    ok, needs_rehash = verify_password(password, row['password_hash'])
+    if not ok:
+        return None
+
+    if needs_rehash:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("UPDATE users SET password_hash = %s WHERE id = %s",
+                           (hash_password(password), row['id']))
+            conn.commit()
+        except storage.DB_ERRORS as err:
+            # the old hash still works; try again on the next login
+            conn.rollback()
+            print(f"Note: could not upgrade stored password hash: {err}")
+        finally:
+            cursor.close()
+
+    user = {'id': row['id'], 'username': row['username'], 'role': row['role']}
+    remember_login(username, password, user)
+    return user
+
+def _change_user(conn, query, params):
+    """
+    Run one write to users; True if it touched a row. Cached logins are
+    dropped either way, so a changed password or role, or a deleted user,
+    stops authenticating from the session cache at once.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        conn.commit()
+        return cursor.rowcount > 0
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        forget_logins()
+
+def change_password(conn, user_id, new_password):
+    """Store a new password for the user (hashed with the default hasher)."""
+    return _change_user(conn, "UPDATE users SET password_hash = %s WHERE id = %s",
+                        (hash_password(new_password), user_id))
+
+def set_role(conn, user_id, role):
+    """Make the user an 'admin' or an 'employee'."""
+    if role not in ('admin', 'employee'):
+        raise ValueError(f"Unknown role {role!r}")
+    return _change_user(conn, "UPDATE users SET role = %s WHERE id = %s", (role, user_id))
+
+def delete_user(conn, user_id):
+    return _change_user(conn, "DELETE FROM users WHERE id = %s", (user_id,))
+
 def login_user(conn):
     """Authenticate and return a small user dict on success."""
     username = input("Username: ").strip()
     password = getpass.getpass("Password (input hidden): ").strip()
-    hashed_pass = hash_password(password)
-    
-    cursor = conn.cursor(dictionary=True)
-    query = "SELECT id, username, role, password_hash FROM users WHERE username = %s"
-    cursor.execute(query, (username,))
-    user = cursor.fetchone()
-    cursor.close()
 
-    if user and user['password_hash'] == hashed_pass:
+    user = authenticate(conn, username, password)
+    if user:
         print(f"Welcome back, {user['username']}!")
-        return {'id': user['id'], 'username': user['username'], 'role': user['role']}
+        return user
     else:
         print("Login failed: incorrect username or password.")
-        return None
\ No newline at end of file
+        return None
@@ -1,6 +1,16 @@
-import mysql.connector
-from login_register import login_user, register_user
-from feature import *
+import os
+import storage
+from db_pool import ConnectionPool, PoolTimeout
+from directory_snapshot import enable_directory_snapshot
+from instrumentation import configure, instrument_connect, write_prometheus
+from employee_cache import get_emp_id_for_user
+from storage import backend_from_env, bootstrap
+
+# Startup only loads what the first prompt needs. The database driver loads
+# with the first connection (storage.load_driver), the login and menu modules
+# (and the service layer behind them) when first chosen, and no connection is
+# opened until an option that touches the database is picked. Check with
+# `python benchmarks/bench_startup.py`.
 
 DB_CONFIG = {
     'host': 'localhost',
@@ -9,26 +19,121 @@ DB_CONFIG = {
     'database': 'hrms_db'
 }
 
+# Storage backend: the MySQL server above, or with HRMS_DB_BACKEND=sqlite an
+# embedded SQLite file (HRMS_SQLITE_PATH, default hrms.db) whose tables are
+# created on first use.
+BACKEND = backend_from_env(DB_CONFIG)
+
+# Pool sizing: connections are reused across menu selections instead of
+# paying a fresh TCP + auth handshake on every keystroke.
+POOL_CONFIG = {
+    'max_size': 10,
+    'min_size': 1,
+    'timeout': 5.0,        # seconds to wait for a free connection
+    'max_idle': 300.0,     # close connections idle longer than this
+    'max_lifetime': 3600.0 # recycle connections older than this
+}
+
+# Query instrumentation: statements slower than this are logged; set
+# HRMS_METRICS_FILE to have the aggregated metrics written (Prometheus text
+# format) when the program exits.
+SLOW_QUERY_SECONDS = 0.5
+SLOW_QUERY_LOG = os.environ.get("HRMS_SLOW_QUERY_LOG")
+METRICS_FILE = os.environ.get("HRMS_METRICS_FILE")
+
+# Directory snapshot: with HRMS_DIRECTORY_SNAPSHOT set to a file path, the
+# employee listings and the login -> employee lookup read a memory-mapped
+# snapshot shared by every CLI process on this host (directory_snapshot.py),
+# built from the database by the first process that needs it.
+DIRECTORY_SNAPSHOT = os.environ.get("HRMS_DIRECTORY_SNAPSHOT")
+
+# Trigram index: with HRMS_TRIGRAM_INDEX=1, substring name searches are
+# answered from an in-memory index of every employee's name, built from the
+# database on first connection (employee_search.py). It is per process and
+# only sees this process's own writes, so it suits a long-running API server
+# that all writes go through better than many short CLI sessions.
+TRIGRAM_INDEX = os.environ.get("HRMS_TRIGRAM_INDEX", "").strip().lower() in ("1", "true", "yes", "on")
+
+# Leave engine: with HRMS_LEAVE_ENGINE=1, leave balances and the team calendar
+# are answered from an in-memory copy of every booked leave (leave_engine.py),
+# loaded on first connection. Like the trigram index it is per process and
+# only follows this process's own writes; overlap checks always go to the
+# database.
+LEAVE_ENGINE = os.environ.get("HRMS_LEAVE_ENGINE", "").strip().lower() in ("1", "true", "yes", "on")
+
+_pool = None
+_extras_opened = False
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        configure(SLOW_QUERY_SECONDS, SLOW_QUERY_LOG)
+        if BACKEND.auto_bootstrap:
+            bootstrap(BACKEND)
+        connect = instrument_connect(BACKEND.connect)
+        _pool = ConnectionPool(connect, **POOL_CONFIG)
+    return _pool
+
 def get_db_connection():
+    """Check out a pooled connection; conn.close() hands it back to the pool."""
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        return conn
-    except mysql.connector.Error as err:
-        print(f"Error connecting to MySQL: {err}")
+        conn = get_pool().acquire()
+    except storage.DB_ERRORS as err:
+        print(f"Error connecting to the database: {err}")
         return None
+    except PoolTimeout as err:
+        print(f"Database is busy: {err}")
+        return None
+    open_process_extras(conn)
+    return conn
+
+def open_process_extras(conn):
+    """Enable the configured directory snapshot / trigram index / leave engine, once per process."""
+    global _extras_opened
+    if _extras_opened:
+        return
+    _extras_opened = True
+    if DIRECTORY_SNAPSHOT:
+        try:
+            enable_directory_snapshot(conn, DIRECTORY_SNAPSHOT)
+        except (OSError, ValueError, *storage.DB_ERRORS) as err:
+            print(f"Directory snapshot unavailable, reading from the database: {err}")
+    if TRIGRAM_INDEX:
+        from employee_search import enable_trigram_index
+        try:
+            index = enable_trigram_index(conn)
+            print(f"Trigram name index built for {len(index)} employees.")
+        except storage.DB_ERRORS as err:
+            print(f"Trigram index unavailable, substring searches read the database: {err}")
+    if LEAVE_ENGINE:
+        from leave_engine import enable_leave_engine
+        try:
+            enable_leave_engine(conn)
+        except storage.DB_ERRORS as err:
+            print(f"Leave engine unavailable, leave queries read the database: {err}")
 
 def get_employee_id(conn, user_id):
-    cursor = conn.cursor()
-    query = "SELECT emp_id FROM employees WHERE user_id = %s"
     try:
-        cursor.execute(query, (user_id,))
-        row = cursor.fetchone()
-        return row[0] if row else None
-    except mysql.connector.Error as err:
+        # cached user_id -> emp_id mapping, see employee_cache.py
+        return get_emp_id_for_user(conn, user_id)
+    except storage.DB_ERRORS as err:
         print(f"Error fetching employee ID: {err}")
         return None
-    finally:
-        cursor.close()
+
+# admin main-menu choice -> (feature.py menu function, keyword arguments)
+ADMIN_MENUS = {
+    '1': ("employee_info_menu", {}),
+    '2': ("leave_management_menu", {'role': 'admin'}),
+    '3': ("payroll_management_menu", {}),
+    '4': ("performance_management_menu", {}),
+    '5': ("recruitment_management_menu", {}),
+}
+
+def load_feature():
+    """The menus module, imported on first use."""
+    import feature
+    return feature
 
 def main_menu(user_data):
     print(f"\nHello {user_data['username']}, welcome back — Role: {user_data['role']}")
@@ -56,6 +161,27 @@ def main_menu(user_data):
         print("6. Sign out")
         choice = input("Please enter the number of your choice: ")
 
+        if choice == '6':
+            print("Signing you out. See you soon.")
+            break
+        if user_data['role'] == 'admin':
+            menu = ADMIN_MENUS.get(choice)
+            if menu is None:
+                print("Invalid choice. Try again.")
+                continue
+        elif choice == '1':
+            print("Showing your details...")
+            continue
+        elif choice == '4':
+            print("Showing your performance history...")
+            continue
+        elif choice != '2':
+            print("Invalid choice.")
+            continue
+        elif not employee_id:
+            print("Cannot apply for leave because your employee record is not linked. Contact admin.")
+            continue
+
         conn = get_db_connection()
         if not conn:
             print("Unable to connect to database.")
@@ -63,63 +189,43 @@ def main_menu(user_data):
 
         try:
             if user_data['role'] == 'admin':
-                if choice == '1':
-                    employee_info_menu(conn)
-                elif choice == '2':
-                    leave_management_menu(conn, role='admin')
-                elif choice == '3':
-                    calculate_payroll(conn)
-                elif choice == '4':
-                    performance_management_menu(conn)
-                elif choice == '5':
-                    recruitment_management_menu(conn)
-                elif choice == '6':
-                    print("Signing you out. See you soon.")
-                    break
-                else:
-                    print("Invalid choice. Try again.")
+                name, kwargs = menu
+                getattr(load_feature(), name)(conn, **kwargs)
             else:
-                if choice == '1':
-                    print("Showing your details...")
-                elif choice == '2':
-                    if employee_id:
-                        apply_leave(conn, emp_id=employee_id)
-                    else:
-                        print("Cannot apply for leave because your employee record is not linked. Contact admin.")
-                elif choice == '4':
-                    print("Showing your performance history...")
-                elif choice == '6':
-                    print("Signing you out. See you soon.")
-                    break
-                else:
-                    print("Invalid choice.")
+                load_feature().apply_leave(conn, emp_id=employee_id)
         except Exception as e:
             print(f"An unexpected error occurred: {e}")
         finally:
-            if conn and conn.is_connected():
-                conn.close()
+            conn.close()
 
 if __name__ == "__main__":
     print("--- Welcome to the HR Management System ---")
     while True:
         print("\n1. Log in\n2. Register (admin only)\n3. Exit")
         auth_choice = input("Select an option: ")
+        if auth_choice == '3':
+            print("Goodbye — take care.")
+            break
+        if auth_choice not in ('1', '2'):
+            print("Invalid choice.")
+            continue
         conn = get_db_connection()
         if not conn:
             continue
+        from login_register import login_user, register_user
         try:
             if auth_choice == '1':
                 user_data = login_user(conn)
                 if user_data:
                     conn.close()
+                    conn = None
                     main_menu(user_data)
-            elif auth_choice == '2':
-                register_user(conn, is_admin=True)
-            elif auth_choice == '3':
-                print("Goodbye — take care.")
-                break
             else:
-                print("Invalid choice.")
+                register_user(conn, is_admin=True)
         finally:
-            if conn and conn.is_connected():
-                conn.close()
\ No newline at end of file
+            if conn:
+                conn.close()
+    if _pool is not None:
+        _pool.close()
+    if METRICS_FILE:
+        write_prometheus(METRICS_FILE)
@@ -0,0 +1,724 @@
+"""
+Versioned schema migrations and a query-plan check.
+
+    python migrations.py status
+    python migrations.py migrate [--to N]
+    python migrations.py check          # EXPLAIN every catalogued statement, flag full scans
+"""
+import argparse
+import re
+import sys
+from datetime import date, datetime
+
+import employee_history
+import payroll_analytics
+import review_analytics
+import review_summary
+import services
+import storage
+from directory_snapshot import DB_MARK
+from employee_listing import ALL_EMPLOYEES, EMPLOYEE_PAGE, LISTING_COLUMNS
+from employee_search import EMPLOYEES_BY_IDS, search_query
+from import_employees import LAST_EMP_ID
+from payroll_batch import CLAIM_RUN, RUN_BY_DATE
+from statements import STATEMENTS
+
+# ---------------------------
+# MIGRATIONS
+# ---------------------------
+# schema_migrations records which numbered migrations a database has had.
+# migrate() applies the missing ones in order and records each as it
+# completes. Every step is idempotent (CREATE ... IF NOT EXISTS, existing
+# indexes skipped), so a migration interrupted part-way (MySQL commits DDL
+# implicitly) is simply re-run, and version 1 adopts an existing database
+# without touching its tables. New schema changes go at the end of MIGRATIONS
+# with the next version number; released migrations are never edited.
+#
+# Each migration spells out its own DDL and index list instead of importing
+# the owning module's current one, so editing a module's tables or indexes
+# later can't change what an already released version does: that change
+# needs a migration of its own.
+
+MIGRATIONS_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT PRIMARY KEY,
+        name VARCHAR(200) NOT NULL,
+        applied_at VARCHAR(32) NOT NULL
+    )
+"""
+
+MYSQL_BASE_TABLES = [
+    """CREATE TABLE IF NOT EXISTS users (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        username VARCHAR(100) NOT NULL UNIQUE,
+        password_hash VARCHAR(255) NOT NULL,
+        role VARCHAR(20) NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS employees (
+        emp_id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NULL,
+        first_name VARCHAR(100),
+        last_name VARCHAR(100),
+        email VARCHAR(255),
+        phone VARCHAR(50),
+        department VARCHAR(100),
+        job_title VARCHAR(100),
+        salary DECIMAL(12, 2)
+    )""",
+    """CREATE TABLE IF NOT EXISTS leaves (
+        leave_id INT AUTO_INCREMENT PRIMARY KEY,
+        emp_id INT NOT NULL,
+        start_date DATE,
+        end_date DATE,
+        reason TEXT,
+        status VARCHAR(20) DEFAULT 'Pending'
+    )""",
+    """CREATE TABLE IF NOT EXISTS payroll (
+        payroll_id INT AUTO_INCREMENT PRIMARY KEY,
+        emp_id INT NOT NULL,
+        basic_salary DECIMAL(12, 2),
+        hra DECIMAL(12, 2),
+        pf DECIMAL(12, 2),
+        insurance DECIMAL(12, 2),
+        net_salary DECIMAL(12, 2),
+        generated_on DATE
+    )""",
+    """CREATE TABLE IF NOT EXISTS performance_reviews (
+        review_id INT AUTO_INCREMENT PRIMARY KEY,
+        emp_id INT NOT NULL,
+        review_date DATE,
+        rating INT,
+        comments TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS job_openings (
+        job_id INT AUTO_INCREMENT PRIMARY KEY,
+        title VARCHAR(200),
+        salary_offered DECIMAL(12, 2),
+        work_hours VARCHAR(100),
+        status VARCHAR(20) DEFAULT 'Open'
+    )""",
+]
+
+SQLITE_BASE_TABLES = [
+    """CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL UNIQUE,
+        password_hash TEXT NOT NULL,
+        role TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS employees (
+        emp_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        first_name TEXT,
+        last_name TEXT,
+        email TEXT,
+        phone TEXT,
+        department TEXT,
+        job_title TEXT,
+        salary REAL
+    )""",
+    """CREATE TABLE IF NOT EXISTS leaves (
+        leave_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        emp_id INTEGER NOT NULL,
+        start_date DATE,
+        end_date DATE,
+        reason TEXT,
+        status TEXT DEFAULT 'Pending'
+    )""",
+    """CREATE TABLE IF NOT EXISTS payroll (
+        payroll_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        emp_id INTEGER NOT NULL,
+        basic_salary REAL,
+        hra REAL,
+        pf REAL,
+        insurance REAL,
+        net_salary REAL,
+        generated_on DATE
+    )""",
+    """CREATE TABLE IF NOT EXISTS performance_reviews (
+        review_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        emp_id INTEGER NOT NULL,
+        review_date DATE,
+        rating INTEGER,
+        comments TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS job_openings (
+        job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT,
+        salary_offered REAL,
+        work_hours TEXT,
+        status TEXT DEFAULT 'Open'
+    )""",
+]
+
+MYSQL_RECRUITMENT_TABLES = [
+    """CREATE TABLE IF NOT EXISTS candidates (
+        candidate_id INT AUTO_INCREMENT PRIMARY KEY,
+        first_name VARCHAR(100),
+        last_name VARCHAR(100),
+        email VARCHAR(200),
+        phone VARCHAR(50),
+        created_at DATETIME NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS applications (
+        application_id INT AUTO_INCREMENT PRIMARY KEY,
+        job_id INT NOT NULL,
+        candidate_id INT NOT NULL,
+        stage VARCHAR(20) NOT NULL,
+        applied_at DATETIME NOT NULL,
+        stage_changed_at DATETIME NOT NULL,
+        UNIQUE KEY uq_applications_job_candidate (job_id, candidate_id),
+        FOREIGN KEY (job_id) REFERENCES job_openings(job_id),
+        FOREIGN KEY (candidate_id) REFERENCES candidates(candidate_id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS application_stage_history (
+        history_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        application_id INT NOT NULL,
+        from_stage VARCHAR(20),
+        to_stage VARCHAR(20) NOT NULL,
+        changed_at DATETIME NOT NULL
+    )""",
+]
+
+SQLITE_RECRUITMENT_TABLES = [
+    """CREATE TABLE IF NOT EXISTS candidates (
+        candidate_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        first_name TEXT,
+        last_name TEXT,
+        email TEXT,
+        phone TEXT,
+        created_at TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS applications (
+        application_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id INTEGER NOT NULL REFERENCES job_openings(job_id),
+        candidate_id INTEGER NOT NULL REFERENCES candidates(candidate_id),
+        stage TEXT NOT NULL,
+        applied_at TEXT NOT NULL,
+        stage_changed_at TEXT NOT NULL,
+        UNIQUE (job_id, candidate_id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS application_stage_history (
+        history_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        application_id INTEGER NOT NULL,
+        from_stage TEXT,
+        to_stage TEXT NOT NULL,
+        changed_at TEXT NOT NULL
+    )""",
+]
+
+# job opening filters with keyset paging on job_id, and each opening's pipeline
+RECRUITMENT_INDEXES = [
+    ("idx_jobs_status_id", "job_openings (status, job_id)"),
+    ("idx_jobs_salary", "job_openings (salary_offered)"),
+    ("idx_jobs_title", "job_openings (title)"),
+    ("idx_applications_job_stage", "applications (job_id, stage, application_id)"),
+    ("idx_applications_candidate", "applications (candidate_id)"),
+    ("idx_stage_history_app", "application_stage_history (application_id, changed_at)"),
+]
+
+# Tables derived from the base data (summaries, rollups, batch progress);
+# the same DDL works on MySQL and SQLite.
+DERIVED_TABLES_DDL = (
+    """CREATE TABLE IF NOT EXISTS employee_latest_review (
+        emp_id INT PRIMARY KEY,
+        review_id INT NOT NULL,
+        review_date DATE NOT NULL,
+        rating INT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS payroll_runs (
+        run_date DATE PRIMARY KEY,
+        last_emp_id INT NOT NULL DEFAULT 0,
+        rows_written INT NOT NULL DEFAULT 0,
+        status VARCHAR(16) NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS payroll_monthly (
+        month CHAR(7) NOT NULL,
+        department VARCHAR(100) NOT NULL,
+        payslips INT NOT NULL,
+        headcount INT NOT NULL,
+        total_basic DECIMAL(14, 2) NOT NULL,
+        total_hra DECIMAL(14, 2) NOT NULL,
+        total_pf DECIMAL(14, 2) NOT NULL,
+        total_insurance DECIMAL(14, 2) NOT NULL,
+        total_net DECIMAL(14, 2) NOT NULL,
+        PRIMARY KEY (month, department)
+    )""",
+    """CREATE TABLE IF NOT EXISTS payroll_month_employees (
+        month CHAR(7) NOT NULL,
+        emp_id INT NOT NULL,
+        PRIMARY KEY (month, emp_id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS review_monthly (
+        month CHAR(7) NOT NULL,
+        department VARCHAR(100) NOT NULL,
+        rating INT NOT NULL,
+        reviews INT NOT NULL,
+        PRIMARY KEY (month, department, rating)
+    )""",
+)
+
+# Indexes behind the hot lookups, filters and sorts. Secondary indexes carry
+# the primary key, so reads of the indexed columns plus the id are index-only.
+HOT_INDEXES = [
+    # main.get_employee_id / employee_cache: emp_id for a login
+    ("idx_employees_user", "employees (user_id)"),
+    # view_employee reviews, latest-review summary, per-employee trends
+    ("idx_reviews_emp_date", "performance_reviews (emp_id, review_date, review_id)"),
+    # payroll history per employee and rollup rebuilds from a month on
+    ("idx_payroll_emp_date", "payroll (emp_id, generated_on)"),
+    ("idx_payroll_generated", "payroll (generated_on, emp_id)"),
+    # pending-leave queue, overlap checks, team calendar
+    ("idx_leaves_status_id", "leaves (status, leave_id)"),
+    ("idx_leaves_emp_status", "leaves (emp_id, status, start_date)"),
+    ("idx_leaves_status_dates", "leaves (status, start_date, end_date)"),
+    # employee search
+    ("idx_employees_last_first", "employees (last_name, first_name)"),
+    ("idx_employees_first_name", "employees (first_name)"),
+    ("idx_employees_dept_title", "employees (department, job_title)"),
+    ("idx_employees_job_title", "employees (job_title)"),
+]
+
+_HISTORY_COLUMNS = """
+        emp_id INT NOT NULL,
+        effective_at DATETIME NOT NULL,
+        first_name VARCHAR(100),
+        last_name VARCHAR(100),
+        department VARCHAR(100),
+        job_title VARCHAR(100),
+        salary DECIMAL(12, 2),
+        changed_fields VARCHAR(200) NOT NULL
+    )"""
+
+HISTORY_TABLES = {
+    "mysql": "CREATE TABLE IF NOT EXISTS employee_history (\n"
+             "        history_id BIGINT AUTO_INCREMENT PRIMARY KEY," + _HISTORY_COLUMNS,
+    "sqlite": "CREATE TABLE IF NOT EXISTS employee_history (\n"
+              "        history_id INTEGER PRIMARY KEY AUTOINCREMENT," + _HISTORY_COLUMNS,
+}
+
+HISTORY_INDEXES = [
+    ("idx_history_emp_time", "employee_history (emp_id, effective_at, history_id)"),
+    ("idx_history_dept_time", "employee_history (department, effective_at, emp_id)"),
+]
+
+
+# SQLite only uses an index for LIKE 'abc%' when the index collates the way
+# LIKE compares (case-insensitively). MySQL's default collations already do,
+# so the migration 3 name indexes serve it there.
+NOCASE_NAME_INDEXES = [
+    ("idx_employees_first_nocase", "employees (first_name COLLATE NOCASE)"),
+    ("idx_employees_last_nocase", "employees (last_name COLLATE NOCASE)"),
+]
+
+
+# list_job_openings pages a salary- or title-filtered list in (column, job_id)
+# order, so each page is one range read of these. SQLite's title index
+# collates like LIKE compares (see NOCASE_NAME_INDEXES).
+JOB_OPENING_KEYSET_INDEXES = {
+    "mysql": [
+        ("idx_jobs_salary_id", "job_openings (salary_offered, job_id)"),
+        ("idx_jobs_title_id", "job_openings (title, job_id)"),
+    ],
+    "sqlite": [
+        ("idx_jobs_salary_id", "job_openings (salary_offered, job_id)"),
+        ("idx_jobs_title_id", "job_openings (title COLLATE NOCASE, job_id)"),
+    ],
+}
+REPLACED_JOB_OPENING_INDEXES = ("idx_jobs_salary", "idx_jobs_title")
+
+MYSQL_DUPLICATE_COLUMN = 1060     # ER_DUP_FIELDNAME; SQLite says "duplicate column name"
+
+MYSQL_CANT_DROP_KEY = 1091        # ER_CANT_DROP_FIELD_OR_KEY (SQLite uses IF EXISTS)
+
+DROP_INDEX = {
+    "mysql": "DROP INDEX {name} ON {table}",
+    "sqlite": "DROP INDEX IF EXISTS {name}",
+}
+
+
+def _base_tables(conn, dialect):
+    _run(conn, MYSQL_BASE_TABLES if dialect == "mysql" else SQLITE_BASE_TABLES)
+
+
+def _derived_tables(conn, dialect):
+    _run(conn, DERIVED_TABLES_DDL)
+
+
+def _hot_indexes(conn, dialect):
+    create_indexes(conn, HOT_INDEXES, dialect)
+
+
+def _employee_history(conn, dialect):
+    _run(conn, [HISTORY_TABLES[dialect]])
+    create_indexes(conn, HISTORY_INDEXES, dialect)
+
+
+def _recruitment(conn, dialect):
+    _run(conn, MYSQL_RECRUITMENT_TABLES if dialect == "mysql" else SQLITE_RECRUITMENT_TABLES)
+    create_indexes(conn, RECRUITMENT_INDEXES, dialect)
+
+
+def _nocase_name_indexes(conn, dialect):
+    if dialect == "sqlite":
+        create_indexes(conn, NOCASE_NAME_INDEXES, dialect)
+
+
+def _job_opening_keyset_indexes(conn, dialect):
+    create_indexes(conn, JOB_OPENING_KEYSET_INDEXES[dialect], dialect)
+    for name in REPLACED_JOB_OPENING_INDEXES:
+        try:
+            _run(conn, [DROP_INDEX[dialect].format(name=name, table="job_openings")])
+        except storage.DB_ERRORS as err:
+            # dropped before an interrupted run of this migration was recorded
+            if getattr(err, "errno", None) != MYSQL_CANT_DROP_KEY:
+                raise
+
+
+def _payroll_run_claims(conn, dialect):
+    try:
+        _run(conn, ["ALTER TABLE payroll_runs ADD COLUMN claims INT NOT NULL DEFAULT 0"])
+    except storage.DB_ERRORS as err:
+        # added before an interrupted run of this migration was recorded
+        if getattr(err, "errno", None) != MYSQL_DUPLICATE_COLUMN and "duplicate column" not in str(err):
+            raise
+
+
+def _wide_password_hashes(conn, dialect):
+    # Databases adopted by migration 1 may still have the VARCHAR(64) column
+    # of the unsalted SHA-256 days, too short for the self-describing hashes
+    # written on upgrade-on-login. SQLite's TEXT has no length.
+    if dialect == "mysql":
+        _run(conn, ["ALTER TABLE users MODIFY password_hash VARCHAR(255) NOT NULL"])
+
+
+MIGRATIONS = [
+    (1, "base tables", _base_tables),
+    (2, "summary, rollup and batch tables", _derived_tables),
+    (3, "indexes for the hot queries", _hot_indexes),
+    (4, "employee change history", _employee_history),
+    (5, "candidates, applications and job opening filters", _recruitment),
+    (6, "case-insensitive name indexes for prefix search", _nocase_name_indexes),
+    (7, "job opening keyset indexes for salary and title filters", _job_opening_keyset_indexes),
+    (8, "payroll run claim counter", _payroll_run_claims),
+    (9, "password hashes up to 255 characters", _wide_password_hashes),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def create_indexes(conn, indexes, dialect=None):
+    """Create each (name, "table (columns)") index that doesn't exist yet; returns the names created."""
+    dialect = dialect or storage.dialect_of(conn)
+    cursor = conn.cursor()
+    created = []
+    try:
+        if dialect == "sqlite":
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+            existing = {row[0] for row in cursor.fetchall()}
+            for name, target in indexes:
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+                if name not in existing:
+                    created.append(name)
+        else:
+            for name, target in indexes:
+                try:
+                    cursor.execute(f"CREATE INDEX {name} ON {target}")
+                    created.append(name)
+                except storage.DB_ERRORS as err:
+                    # only "already there"; a missing table or column is an error
+                    if getattr(err, "errno", None) != storage.MYSQL_DUPLICATE_KEY_NAME:
+                        raise
+        conn.commit()
+    finally:
+        cursor.close()
+    return created
+
+
+def _run(conn, ddl):
+    cursor = conn.cursor()
+    try:
+        for sql in ddl:
+            cursor.execute(sql)
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def applied_versions(conn):
+    """{version: (name, applied_at)} of the migrations this database has had."""
+    _run(conn, [MIGRATIONS_TABLE_DDL])
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT version, name, applied_at FROM schema_migrations ORDER BY version")
+        return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def migrate(conn, dialect, target=None, log=None):
+    """Apply the pending migrations up to `target` (default: all); returns [(version, name)] applied."""
+    done = applied_versions(conn)
+    applied = []
+    for version, name, step in MIGRATIONS:
+        if version in done or (target is not None and version > target):
+            continue
+        if log:
+            log(f"Applying {version}: {name}")
+        step(conn, dialect)
+        cursor = conn.cursor()
+        try:
+            cursor.execute("INSERT INTO schema_migrations (version, name, applied_at) VALUES (%s, %s, %s)",
+                           (version, name, datetime.now().isoformat(" ", "seconds")))
+            conn.commit()
+        finally:
+            cursor.close()
+        applied.append((version, name))
+    return applied
+
+
+# ---------------------------
+# QUERY PLAN CHECK
+# ---------------------------
+# The statements behind the service layer, listings and reports, taken from
+# the modules' own query constants and builders together with the kind of
+# parameters they are sent with, so the catalogue follows the code. Add a
+# query here when it is added to a module (as a constant or a *_query()
+# builder, not a copy of its text). Single-row INSERTs and the primary-key
+# upserts of the rollup and summary tables have no plan to check.
+#
+# check() EXPLAINs each one and flags plans that read a whole base table:
+#   - a table scan (SQLite SCAN t / MySQL type=ALL),
+#   - a full index scan (SQLite SCAN t USING [COVERING] INDEX / MySQL type=index),
+#   - a walk along the primary key (SQLite rowid>? / MySQL range on PRIMARY)
+#     while the statement filters that table on other columns: with the first
+#     keyset page (after = 0) that visits every row to find the matches.
+
+BASE_TABLES = {"users", "employees", "leaves", "payroll", "performance_reviews", "job_openings",
+               "employee_latest_review", "payroll_monthly", "payroll_month_employees", "payroll_runs",
+               "review_monthly", "employee_history", "candidates", "applications",
+               "application_stage_history"}
+
+
+def _in(template, n=2):
+    """An IN (...) template filled in with `n` placeholders."""
+    return template.format(placeholders=", ".join(["%s"] * n))
+
+
+_LISTING = ", ".join(LISTING_COLUMNS)
+_SOME_DAY = date(2025, 6, 2)
+
+# (label, sql, params); params None means 1 for every placeholder
+QUERY_CATALOGUE = [
+    (f"statements.{name}", sql, None) for name, sql in STATEMENTS.items()
+    if not sql.strip().upper().startswith("INSERT")
+] + [
+    ("employee_listing.fetch_employee_page", EMPLOYEE_PAGE.format(columns=_LISTING), (0, 50)),
+    ("review_summary.fetch_latest_rating_page", review_summary.EMPLOYEES_WITH_LATEST_RATING_PAGE, (0, 50)),
+    ("review_summary.attach_latest_ratings", _in(review_summary.LATEST_REVIEWS_BY_IDS), None),
+    ("review_summary.attach_latest_ratings (no summary table)",
+     _in(review_summary.LATEST_REVIEWS_BY_IDS_WINDOW), None),
+    ("employee_search.search_employees (department, job title)",
+     *search_query(department="Sales", job_title="Analyst")),
+    ("employee_search.search_employees (name prefix)", *search_query("Ann")),
+    ("employee_search.search_employees (name prefix, department)", *search_query("Ann", "Sales")),
+    ("employee_search.search_employees (name prefix, later page)", *search_query("Ann", after_emp_id=500)),
+    ("employee_search.fetch_employees_by_ids", _in(EMPLOYEES_BY_IDS), None),
+    ("services.update_employee", services.employee_update_query(services.EDITABLE_EMPLOYEE_FIELDS), None),
+    ("services.list_pending_leaves", *services.pending_leaves_query(limit=50)),
+    ("services.list_pending_leaves (employee)", *services.pending_leaves_query(emp_id=1, limit=50)),
+    ("services.list_pending_leaves (department, dates)",
+     *services.pending_leaves_query(department="Sales", date_from=_SOME_DAY, date_to=_SOME_DAY, limit=50)),
+    ("services.set_leave_statuses", _in(services.SET_PENDING_LEAVE_STATUSES), ("Approved", 1, 2)),
+    ("services.set_leave_status", services.LEAVE_BY_ID, None),
+    ("services.set_leave_status (update)", services.SET_PENDING_LEAVE_STATUS, ("Approved", 1)),
+    ("services.who_is_out", *services.who_is_out_query(_SOME_DAY)),
+    ("services.who_is_out (department, pending)", *services.who_is_out_query(_SOME_DAY, "Sales", True)),
+    ("directory_snapshot.db_mark", DB_MARK, None),
+    ("import_employees._last_emp_id", LAST_EMP_ID, None),
+    ("employee_history.record_inserted_after", employee_history.RECORD_INSERTED_AFTER, ("2026-01-01 00:00:00", 100)),
+    ("services.get_job_opening", services.JOB_OPENING_BY_ID, None),
+    ("services.list_job_openings", *services.job_openings_query(limit=50)),
+    ("services.list_job_openings (status)", *services.job_openings_query("Open", limit=50)),
+    ("services.list_job_openings (salary range)",
+     *services.job_openings_query(min_salary=50000, max_salary=60000, limit=50)),
+    ("services.list_job_openings (status, salary range)",
+     *services.job_openings_query("Open", 50000, 60000, limit=50)),
+    ("services.list_job_openings (salary range, later page)",
+     *services.job_openings_query(min_salary=50000, max_salary=60000, after_job_id=100, limit=50, after_value=55000)),
+    ("services.list_job_openings (title prefix)", *services.job_openings_query(title_prefix="Data", limit=50)),
+    ("services.list_job_openings (title prefix, later page)",
+     *services.job_openings_query(title_prefix="Data", after_job_id=100, limit=50, after_value="Data Analyst")),
+    ("services.get_candidate", services.CANDIDATE_BY_ID, None),
+    ("services.get_candidate (applications)", services.CANDIDATE_APPLICATIONS, None),
+    ("services.apply_for_job", services.APPLICATION_FOR_JOB, None),
+    ("services.list_applications", *services.applications_query(1, limit=50)),
+    ("services.list_applications (stage)", *services.applications_query(1, "Applied", limit=50)),
+    ("services.pipeline_counts", services.PIPELINE_COUNTS, None),
+    ("services.move_applications", _in(services.APPLICATION_STAGES_BY_ID), None),
+    ("services.move_applications (update)", _in(services.MOVE_APPLICATIONS), ("Screening", "", "Applied", 1, 2)),
+    ("payroll_batch._start_run", RUN_BY_DATE, None),
+    ("payroll_batch._start_run (claim)", CLAIM_RUN.format(statuses="'failed'"), None),
+    ("payroll_analytics.month_summary", payroll_analytics.MONTH_ROWS, ("2025-06",)),
+    ("payroll_analytics.department_month", payroll_analytics.DEPARTMENT_MONTH, ("2025-06", "Sales")),
+    ("payroll_analytics.trend (department)", payroll_analytics.DEPARTMENT_TREND, ("Sales", "2024-07", "2025-06")),
+    ("payroll_analytics.trend", payroll_analytics.COMPANY_TREND, ("2024-07", "2025-06")),
+    ("review_analytics.rating_trend", *review_analytics.rating_trend_query("2024-07", "2025-06")),
+    ("review_analytics.rating_trend (department)",
+     *review_analytics.rating_trend_query("2024-07", "2025-06", "Sales")),
+    ("review_analytics.employee_trends (department)", *review_analytics.employee_trends_query("Sales")),
+    ("employee_history.record_change", employee_history.HAS_HISTORY, None),
+    ("employee_history.history", employee_history.HISTORY_FOR_EMPLOYEE, None),
+    ("employee_history.employee_as_of", employee_history.STATE_AS_OF, (1, "2025-06-02 23:59:59")),
+    ("employee_history.department_as_of", employee_history.DEPARTMENT_AS_OF,
+     ("Sales", "2025-06-02 23:59:59", "2025-06-02 23:59:59", "Sales")),
+    ("employee_history.department_as_of (never changed)", employee_history.NEVER_LOGGED_IN_DEPARTMENT, ("Sales",)),
+]
+
+# Reads meant to return (nearly) every row, where a scan is the right plan.
+EXPECTED_SCANS = [
+    ("employee_listing.stream_employees", ALL_EMPLOYEES.format(columns=_LISTING), None),
+    ("review_analytics.employee_trends", *review_analytics.employee_trends_query()),
+]
+
+
+_TABLE_REF = re.compile(r"\b(?:FROM|JOIN|UPDATE)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_NOT_ALIASES = {"where", "on", "set", "join", "left", "inner", "order", "group", "limit", "using"}
+_WHERE = re.compile(r"\bWHERE\b(.*?)(?=\bORDER\s+BY\b|\bGROUP\s+BY\b|\bLIMIT\b|$)", re.IGNORECASE | re.DOTALL)
+_CONDITION = re.compile(r"(?:\b(\w+)\.)?\b(\w+)\s*(?:[<>!]?=|<>|<|>|\bLIKE\b|\bIN\b|\bBETWEEN\b|\bIS\b)",
+                        re.IGNORECASE)
+
+
+def _table_names(sql):
+    """{name or alias: table} for the tables a statement reads."""
+    names = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        names[table] = table
+        if alias and alias.lower() not in _NOT_ALIASES:
+            names[alias] = table
+    return names
+
+
+def _filtered_columns(sql, tables):
+    """{table: {column}} compared in the statement's WHERE clauses."""
+    single = set(tables.values())
+    single = single.pop() if len(single) == 1 else None
+    columns = {}
+    for clause in _WHERE.findall(sql):
+        for qualifier, column in _CONDITION.findall(clause):
+            table = tables.get(qualifier) if qualifier else single
+            if table:
+                columns.setdefault(table, set()).add(column.lower())
+    return columns
+
+
+def _primary_key(conn, dialect, table):
+    cursor = conn.cursor()
+    try:
+        if dialect == "mysql":
+            cursor.execute(f"SHOW KEYS FROM {table} WHERE Key_name = 'PRIMARY'")
+            return {row[4].lower() for row in cursor.fetchall()}
+        cursor.execute(f"PRAGMA table_info({table})")
+        return {row[1].lower() for row in cursor.fetchall() if row[5]}
+    finally:
+        cursor.close()
+
+
+def explain(conn, dialect, sql, params=None, keys=None):
+    """
+    [(table, detail, full_scan)] for one statement's plan. `keys` caches
+    {table: primary key columns} across calls.
+    """
+    params = (1,) * sql.count("%s") if params is None else params
+    tables = _table_names(sql)
+    filtered = _filtered_columns(sql, tables)
+    keys = {} if keys is None else keys
+
+    def filters_beyond_key(table):
+        if table not in keys:
+            keys[table] = _primary_key(conn, dialect, table)
+        return bool(filtered.get(table, set()) - keys[table])
+
+    if dialect == "mysql":
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("EXPLAIN " + sql, params)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        plan = []
+        for row in rows:
+            table = tables.get(row.get('table'), row.get('table'))
+            access = row.get('type')
+            full_scan = table in BASE_TABLES and (
+                access in ('ALL', 'index')
+                or (access == 'range' and row.get('key') == 'PRIMARY' and filters_beyond_key(table)))
+            plan.append((table, f"{row.get('table')}: type={access} key={row.get('key')} rows={row.get('rows')}"
+                                f"{' ' + row['Extra'] if row.get('Extra') else ''}", full_scan))
+        return plan
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    plan = []
+    for row in rows:
+        detail = row[-1]
+        words = detail.split()
+        table = tables.get(words[1]) if len(words) > 1 and words[0] in ("SCAN", "SEARCH") else None
+        full_scan = table in BASE_TABLES and (
+            words[0] == "SCAN"
+            or (re.search(r"PRIMARY KEY \(rowid[<>]", detail) is not None and filters_beyond_key(table)))
+        plan.append((table, detail, full_scan))
+    return plan
+
+
+def check(conn, dialect):
+    """EXPLAIN every catalogued statement; returns [(label, plan, flagged)]."""
+    results, keys = [], {}
+    for label, sql, params in QUERY_CATALOGUE:
+        plan = explain(conn, dialect, sql, params, keys)
+        results.append((label, plan, any(full_scan for _, _, full_scan in plan)))
+    for label, sql, params in EXPECTED_SCANS:
+        results.append((label + " (scan expected)", explain(conn, dialect, sql, params, keys), False))
+    return results
+
+
+def print_check(results):
+    for label, plan, flagged in results:
+        print(f"{'FULL SCAN' if flagged else 'ok':<9} {label}")
+        for _, detail, full_scan in plan:
+            print(f"{'':<9}   {'>> ' if full_scan else ''}{detail}")
+    flagged = sum(1 for _, _, f in results if f)
+    print(f"\n{len(results)} statements checked, {flagged} reading a whole table or index.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Schema migrations and query plan check.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="applied and pending migrations")
+    migrate_cmd = sub.add_parser("migrate", help="apply pending migrations")
+    migrate_cmd.add_argument("--to", type=int, help="stop at this version")
+    sub.add_parser("check", help="EXPLAIN every catalogued statement and flag full table scans")
+    args = parser.parse_args()
+
+    from main import BACKEND
+    conn = BACKEND.connect()
+    try:
+        if args.command == "status":
+            done = applied_versions(conn)
+            for version, name, _ in MIGRATIONS:
+                state = f"applied {done[version][1]}" if version in done else "pending"
+                print(f"{version:>4}  {name:<40} {state}")
+        elif args.command == "migrate":
+            applied = migrate(conn, BACKEND.name, args.to, log=print)
+            print(f"{len(applied)} migration(s) applied; schema at version "
+                  f"{max(applied_versions(conn), default=0)}.")
+        else:
+            results = check(conn, BACKEND.name)
+            print_check(results)
+            sys.exit(1 if any(flagged for _, _, flagged in results) else 0)
+    finally:
+        conn.close()
@@ -0,0 +1,181 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+
+from employee_cache import LRUCache
+
+# ---------------------------
+# PASSWORD HASHING
+# ---------------------------
+# Stored hashes are self-describing: "<algorithm>$<cost params>$<salt>$<hash>".
+# Plain 64-character hex strings are the original unsalted SHA-256 hashes;
+# they still verify, and are rewritten with the default hasher on the next
+# successful login.
+
+def _b64(raw):
+    return base64.b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _unb64(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+class Pbkdf2Hasher:
+    algorithm = "pbkdf2_sha256"
+
+    def __init__(self, iterations=600000, salt_bytes=16):
+        self.iterations = iterations
+        self.salt_bytes = salt_bytes
+
+    def hash(self, password):
+        salt = os.urandom(self.salt_bytes)
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, self.iterations)
+        return f"{self.algorithm}${self.iterations}${_b64(salt)}${_b64(digest)}"
+
+    def verify(self, password, encoded):
+        _, iterations, salt, expected = encoded.split("$")
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), _unb64(salt), int(iterations))
+        return hmac.compare_digest(digest, _unb64(expected))
+
+    def needs_update(self, encoded):
+        return encoded.split("$")[1] != str(self.iterations)
+
+
+class ScryptHasher:
+    algorithm = "scrypt"
+
+    def __init__(self, n=2 ** 14, r=8, p=1, salt_bytes=16):
+        self.n, self.r, self.p = n, r, p
+        self.salt_bytes = salt_bytes
+
+    def _derive(self, password, salt, n, r, p):
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                              maxmem=256 * n * r + 1024 * 1024, dklen=32)
+
+    def hash(self, password):
+        salt = os.urandom(self.salt_bytes)
+        digest = self._derive(password, salt, self.n, self.r, self.p)
+        return f"{self.algorithm}${self.n}${self.r}${self.p}${_b64(salt)}${_b64(digest)}"
+
+    def verify(self, password, encoded):
+        _, n, r, p, salt, expected = encoded.split("$")
+        digest = self._derive(password, _unb64(salt), int(n), int(r), int(p))
+        return hmac.compare_digest(digest, _unb64(expected))
+
+    def needs_update(self, encoded):
+        return encoded.split("$")[1:4] != [str(self.n), str(self.r), str(self.p)]
+
+
+class LegacySha256Hasher:
+    """The original unsalted SHA-256 hex digest. Verify-only in practice."""
+    algorithm = "sha256"
+
+    def hash(self, password):
+        return hashlib.sha256(password.encode()).hexdigest()
+
+    def verify(self, password, encoded):
+        return hmac.compare_digest(self.hash(password), encoded.lower())
+
+    def needs_update(self, encoded):
+        # no cost parameters; legacy rows are upgraded because it is not the default
+        return False
+
+
+HASHERS = {
+    Pbkdf2Hasher.algorithm: Pbkdf2Hasher(),
+    ScryptHasher.algorithm: ScryptHasher(),
+    LegacySha256Hasher.algorithm: LegacySha256Hasher(),
+}
+
+_default_algorithm = Pbkdf2Hasher.algorithm
+
+
+def set_default_hasher(hasher):
+    """Register `hasher` and use it for new hashes and upgrades."""
+    global _default_algorithm
+    HASHERS[hasher.algorithm] = hasher
+    _default_algorithm = hasher.algorithm
+
+
+def get_default_hasher():
+    return HASHERS[_default_algorithm]
+
+
+def identify(encoded):
+    """Return the hasher that produced `encoded`, or None if it is unrecognised."""
+    if "$" not in encoded:
+        return HASHERS[LegacySha256Hasher.algorithm] if len(encoded) == 64 else None
+    return HASHERS.get(encoded.split("$", 1)[0])
+
+
+def hash_password(password):
+    """Hash a new password with the default hasher."""
+    return get_default_hasher().hash(password)
+
+
+def verify_password(password, encoded):
+    """
+    Check `password` against a stored hash in constant time.
+    Returns (matches, needs_rehash).
+    """
+    hasher = identify(encoded or "")
+    if hasher is None:
+        return False, False
+    try:
+        ok = hasher.verify(password, encoded)
+    except (ValueError, TypeError):
+        return False, False
+    if not ok:
+        return False, False
+    default = get_default_hasher()
+    return True, hasher is not default or default.needs_update(encoded)
+
+
+# Verified against when the username doesn't exist, so a miss costs the same as a hit.
+_DUMMY_HASH = None
+
+
+def burn_dummy_verify(password):
+    global _DUMMY_HASH
+    if _DUMMY_HASH is None or identify(_DUMMY_HASH) is not get_default_hasher():
+        _DUMMY_HASH = hash_password(secrets.token_hex(8))
+    verify_password(password, _DUMMY_HASH)
+
+
+# ---------------------------
+# VERIFIED-SESSION CACHE
+# ---------------------------
+# Remembers (username, password) pairs that verified recently so a burst of
+# re-authentications skips both the DB round trip and the KDF. Passwords are
+# never stored: entries are keyed by an HMAC under a per-process random key.
+
+SESSION_TTL = 300.0     # seconds
+SESSION_MAX = 5000
+
+_session_key = secrets.token_bytes(32)
+verified_sessions = LRUCache(max_size=SESSION_MAX, ttl=SESSION_TTL)
+
+
+def _session_fingerprint(username, password):
+    mac = hmac.new(_session_key, digestmod=hashlib.sha256)
+    mac.update(username.encode())
+    mac.update(b"\0")
+    mac.update(password.encode())
+    return mac.digest()
+
+
+def cached_login(username, password):
+    """Return the cached user dict for this exact username/password, or None."""
+    user = verified_sessions.get(_session_fingerprint(username, password))
+    return dict(user) if user else None
+
+
+def remember_login(username, password, user):
+    verified_sessions.put(_session_fingerprint(username, password), dict(user))
+
+
+def forget_logins():
+    """Drop every cached session (e.g. after a password change)."""
+    verified_sessions.clear()
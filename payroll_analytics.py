@@ -0,0 +1,309 @@
+"""
+Monthly payroll rollups per department.
+
+    python payroll_analytics.py rebuild [--since YYYY-MM]
+    python payroll_analytics.py month 2025-06
+    python payroll_analytics.py trend [--department Finance] [--months 12]
+"""
+import argparse
+import sys
+from collections import defaultdict
+from datetime import date
+
+import storage
+
+# ---------------------------
+# MONTHLY ROLLUPS
+# ---------------------------
+# payroll_monthly holds one row per (month, department) with the payslip
+# count, the number of distinct employees paid and the summed payroll
+# columns. payroll_month_employees remembers who was already paid in a month
+# so headcount stays distinct when someone is paid twice. Every payroll
+# INSERT (single calculate_payroll or a batch chunk) folds itself into both
+# tables on the same cursor, so the rollup commits or rolls back with it.
+#
+# Department is the employee's department when the payslip was written; a
+# rebuild re-derives it from the current employees table.
+
+ROLLUP_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS payroll_monthly (
+        month CHAR(7) NOT NULL,
+        department VARCHAR(100) NOT NULL,
+        payslips INT NOT NULL,
+        headcount INT NOT NULL,
+        total_basic DECIMAL(14, 2) NOT NULL,
+        total_hra DECIMAL(14, 2) NOT NULL,
+        total_pf DECIMAL(14, 2) NOT NULL,
+        total_insurance DECIMAL(14, 2) NOT NULL,
+        total_net DECIMAL(14, 2) NOT NULL,
+        PRIMARY KEY (month, department)
+    )
+"""
+
+MONTH_EMPLOYEES_DDL = """
+    CREATE TABLE IF NOT EXISTS payroll_month_employees (
+        month CHAR(7) NOT NULL,
+        emp_id INT NOT NULL,
+        PRIMARY KEY (month, emp_id)
+    )
+"""
+
+AMOUNT_COLUMNS = ("total_basic", "total_hra", "total_pf", "total_insurance", "total_net")
+UNASSIGNED = "(none)"       # rollup key for employees without a department
+
+# month string from a DATE column, in both MySQL and SQLite
+MONTH_OF_GENERATED_ON = "SUBSTR(CAST(p.generated_on AS CHAR), 1, 7)"
+
+# Every statement below is a single upsert keyed by the primary key, so two
+# chunks or payslips folding into the same month can't race between a check
+# and an insert. An employee's row in payroll_month_employees is only counted
+# towards headcount when this statement is the one that inserted it.
+MARK_PAID = {
+    "mysql": "INSERT IGNORE INTO payroll_month_employees (month, emp_id) VALUES (%s, %s)",
+    "sqlite": "INSERT OR IGNORE INTO payroll_month_employees (month, emp_id) VALUES (%s, %s)",
+}
+
+_INSERT_ROLLUP = """
+    INSERT INTO payroll_monthly
+        (month, department, payslips, headcount,
+         total_basic, total_hra, total_pf, total_insurance, total_net)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)"""
+ADD_TO_ROLLUP = {
+    "mysql": _INSERT_ROLLUP + """ AS new
+    ON DUPLICATE KEY UPDATE
+        payslips = payslips + new.payslips, headcount = headcount + new.headcount,
+        total_basic = total_basic + new.total_basic, total_hra = total_hra + new.total_hra,
+        total_pf = total_pf + new.total_pf, total_insurance = total_insurance + new.total_insurance,
+        total_net = total_net + new.total_net
+""",
+    "sqlite": _INSERT_ROLLUP + """
+    ON CONFLICT (month, department) DO UPDATE SET
+        payslips = payslips + excluded.payslips, headcount = headcount + excluded.headcount,
+        total_basic = total_basic + excluded.total_basic, total_hra = total_hra + excluded.total_hra,
+        total_pf = total_pf + excluded.total_pf, total_insurance = total_insurance + excluded.total_insurance,
+        total_net = total_net + excluded.total_net
+""",
+}
+
+
+def month_key(value):
+    """'YYYY-MM' for a date, datetime or ISO date string."""
+    if isinstance(value, date):
+        return f"{value.year:04d}-{value.month:02d}"
+    return str(value)[:7]
+
+
+def create_rollup_tables(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(ROLLUP_TABLE_DDL)
+        cursor.execute(MONTH_EMPLOYEES_DDL)
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def record_payroll_rows(cursor, rows):
+    """
+    Fold newly inserted payslips into the rollups. `rows` are
+    (emp_id, department, generated_on, basic, hra, pf, insurance, net).
+    Runs on the caller's cursor so it commits with the payroll INSERTs.
+    """
+    dialect = storage.dialect_of(cursor)
+    groups = defaultdict(lambda: [0, 0, 0.0, 0.0, 0.0, 0.0, 0.0])  # payslips, headcount, amounts
+    paid = defaultdict(list)                                       # (month, department) -> emp_ids
+    for emp_id, department, generated_on, basic, hra, pf, insurance, net in rows:
+        month = month_key(generated_on)
+        department = department or UNASSIGNED
+        totals = groups[(month, department)]
+        totals[0] += 1
+        for i, amount in enumerate((basic, hra, pf, insurance, net), start=2):
+            totals[i] += float(amount)
+        paid[(month, department)].append(emp_id)
+
+    # headcount only grows by the employees not yet paid in that month (the
+    # rows the insert didn't ignore; a repeat within the batch is ignored too)
+    for (month, department), employees in paid.items():
+        cursor.executemany(MARK_PAID[dialect], [(month, emp_id) for emp_id in employees])
+        groups[(month, department)][1] += cursor.rowcount
+
+    for (month, department), (payslips, headcount, *amounts) in groups.items():
+        amounts = [round(a, 2) for a in amounts]
+        cursor.execute(ADD_TO_ROLLUP[dialect], (month, department, payslips, headcount, *amounts))
+
+
+def rebuild_rollups(conn, since=None):
+    """Recompute the rollups from the payroll table (backfill / repair), optionally from month `since` on."""
+    create_rollup_tables(conn)
+    where, params = "", ()
+    if since:
+        where, params = f"WHERE {MONTH_OF_GENERATED_ON} >= %s", (month_key(since),)
+    cursor = conn.cursor()
+    try:
+        if since:
+            cursor.execute("DELETE FROM payroll_monthly WHERE month >= %s", params)
+            cursor.execute("DELETE FROM payroll_month_employees WHERE month >= %s", params)
+        else:
+            cursor.execute("DELETE FROM payroll_monthly")
+            cursor.execute("DELETE FROM payroll_month_employees")
+        cursor.execute(f"""
+            INSERT INTO payroll_month_employees (month, emp_id)
+            SELECT DISTINCT {MONTH_OF_GENERATED_ON}, p.emp_id
+            FROM payroll p
+            {where}
+        """, params)
+        cursor.execute(f"""
+            INSERT INTO payroll_monthly
+                (month, department, payslips, headcount,
+                 total_basic, total_hra, total_pf, total_insurance, total_net)
+            SELECT {MONTH_OF_GENERATED_ON}, COALESCE(NULLIF(e.department, ''), '{UNASSIGNED}'),
+                   COUNT(*), COUNT(DISTINCT p.emp_id),
+                   SUM(p.basic_salary), SUM(p.hra), SUM(p.pf), SUM(p.insurance), SUM(p.net_salary)
+            FROM payroll p
+            LEFT JOIN employees e ON e.emp_id = p.emp_id
+            {where}
+            GROUP BY {MONTH_OF_GENERATED_ON}, COALESCE(NULLIF(e.department, ''), '{UNASSIGNED}')
+        """, params)
+        rows = cursor.rowcount
+        conn.commit()
+        return rows
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+# ---------------------------
+# REPORTS
+# ---------------------------
+# All reads are primary-key lookups / ranges on payroll_monthly, so their
+# cost depends on the number of departments and months asked for, not on
+# the size of the payroll table.
+
+MONTH_ROWS = "SELECT * FROM payroll_monthly WHERE month = %s ORDER BY department"
+DEPARTMENT_MONTH = "SELECT * FROM payroll_monthly WHERE month = %s AND department = %s"
+DEPARTMENT_TREND = """
+    SELECT * FROM payroll_monthly
+    WHERE department = %s AND month BETWEEN %s AND %s
+    ORDER BY month
+"""
+COMPANY_TREND = """
+    SELECT month, SUM(payslips) AS payslips, SUM(headcount) AS headcount,
+           SUM(total_basic) AS total_basic, SUM(total_hra) AS total_hra, SUM(total_pf) AS total_pf,
+           SUM(total_insurance) AS total_insurance, SUM(total_net) AS total_net
+    FROM payroll_monthly
+    WHERE month BETWEEN %s AND %s
+    GROUP BY month
+    ORDER BY month
+"""
+
+
+def _rows(conn, query, params):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    for row in rows:
+        for column in AMOUNT_COLUMNS:
+            row[column] = float(row[column])
+    return rows
+
+
+def department_month(conn, month, department):
+    """The rollup row for one department in one month, or None."""
+    rows = _rows(conn, DEPARTMENT_MONTH, (month_key(month), department))
+    return rows[0] if rows else None
+
+
+def month_summary(conn, month):
+    """Cost by department for one month, plus an 'ALL' total row."""
+    rows = _rows(conn, MONTH_ROWS, (month_key(month),))
+    if rows:
+        total = {'month': month_key(month), 'department': 'ALL',
+                 'payslips': sum(r['payslips'] for r in rows), 'headcount': sum(r['headcount'] for r in rows)}
+        for column in AMOUNT_COLUMNS:
+            total[column] = round(sum(r[column] for r in rows), 2)
+        rows.append(total)
+    return rows
+
+
+def shift_month(month, delta):
+    year, mon = int(month[:4]), int(month[5:7])
+    index = year * 12 + (mon - 1) + delta
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def trend(conn, department=None, months=12, until=None):
+    """
+    Month-over-month totals for the last `months` months up to `until`
+    (default this month), for one department or the whole company. Each row
+    carries net_change / net_change_pct against the previous month.
+    """
+    last = month_key(until or date.today())
+    first = shift_month(last, -(months - 1))
+    if department:
+        rows = _rows(conn, DEPARTMENT_TREND, (department, first, last))
+    else:
+        rows = _rows(conn, COMPANY_TREND, (first, last))
+
+    by_month = {row['month']: row for row in rows}
+    out, previous = [], None
+    for i in range(months):
+        month = shift_month(first, i)
+        row = by_month.get(month) or {'month': month, 'payslips': 0, 'headcount': 0,
+                                      **{column: 0.0 for column in AMOUNT_COLUMNS}}
+        row['department'] = department or 'ALL'
+        if previous is not None:
+            row['net_change'] = round(row['total_net'] - previous, 2)
+            row['net_change_pct'] = round(row['net_change'] / previous * 100, 1) if previous else None
+        else:
+            row['net_change'] = row['net_change_pct'] = None
+        previous = row['total_net']
+        out.append(row)
+    return out
+
+
+def print_month(rows):
+    print(f"{'department':<20} {'headcount':>9} {'payslips':>8} {'basic':>14} {'net':>14}")
+    for r in rows:
+        print(f"{r['department']:<20} {r['headcount']:>9} {r['payslips']:>8}"
+              f" {r['total_basic']:>14,.2f} {r['total_net']:>14,.2f}")
+
+
+def print_trend(rows):
+    print(f"{'month':<8} {'headcount':>9} {'net':>14} {'change':>13} {'%':>7}")
+    for r in rows:
+        change = "" if r['net_change'] is None else f"{r['net_change']:+,.2f}"
+        pct = "" if r['net_change_pct'] is None else f"{r['net_change_pct']:+.1f}"
+        print(f"{r['month']:<8} {r['headcount']:>9} {r['total_net']:>14,.2f} {change:>13} {pct:>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monthly payroll rollups per department.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild = sub.add_parser("rebuild", help="recompute the rollups from the payroll table")
+    rebuild.add_argument("--since", help="only months from YYYY-MM on")
+    month = sub.add_parser("month", help="cost by department for one month")
+    month.add_argument("month", help="YYYY-MM")
+    trend_cmd = sub.add_parser("trend", help="month-over-month totals")
+    trend_cmd.add_argument("--department")
+    trend_cmd.add_argument("--months", type=int, default=12)
+    args = parser.parse_args()
+
+    from main import get_db_connection
+    conn = get_db_connection()
+    if not conn:
+        sys.exit(1)
+    try:
+        if args.command == "rebuild":
+            count = rebuild_rollups(conn, args.since)
+            print(f"Payroll rollups rebuilt: {count} month/department rows.")
+        elif args.command == "month":
+            print_month(month_summary(conn, args.month))
+        else:
+            print_trend(trend(conn, args.department, args.months))
+    finally:
+        conn.close()
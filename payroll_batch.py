@@ -0,0 +1,251 @@
+import argparse
+import sys
+import time
+from datetime import date
+
+from employee_listing import iter_employee_pages
+from payroll_analytics import record_payroll_rows
+from payroll_rules import get_rule_set, rule_set_for_department
+import storage
+
+# ---------------------------
+# PAYROLL RULES
+# ---------------------------
+# Components, slabs and thresholds live in payroll_rules (config-driven,
+# compiled per rule-set version). `rule_set` is a rule-set name or a compiled
+# rule set; None means the configured default.
+
+
+def compute_payroll(basic_salary, rule_set=None):
+    """Return (hra, pf, insurance, net_salary) for one basic salary."""
+    return get_rule_set(rule_set).evaluate(basic_salary)
+
+
+def compute_payroll_batch(salaries, rule_set=None):
+    """
+    Same rules as compute_payroll over a whole chunk of salaries.
+    Returns four lists (hra, pf, insurance, net) aligned with `salaries`.
+    """
+    return get_rule_set(rule_set).evaluate_batch(salaries)
+
+
+def _compute_chunk(basics, departments, rule_set):
+    """compute_payroll_batch for a chunk, split by each department's rule set."""
+    if rule_set is not None:
+        return compute_payroll_batch(basics, rule_set)
+    groups = {}
+    for i, department in enumerate(departments):
+        groups.setdefault(rule_set_for_department(department), []).append(i)
+    if len(groups) == 1:
+        return compute_payroll_batch(basics, next(iter(groups)))
+    columns = [[0.0] * len(basics) for _ in range(4)]
+    for name, positions in groups.items():
+        results = compute_payroll_batch([basics[i] for i in positions], name)
+        for column, values in zip(columns, results):
+            for i, value in zip(positions, values):
+                column[i] = value
+    return columns
+
+
+# ---------------------------
+# BATCH RUN
+# ---------------------------
+# Each chunk of employees is computed and written in one transaction together
+# with the run's progress marker (payroll_runs.last_emp_id) and its share of
+# the monthly rollups (payroll_analytics). If a chunk fails,
+# nothing from it is kept and the next run for the same date resumes after the
+# last committed employee.
+#
+# payroll_runs is created by migrations.py (migration 2). A run claims its
+# date's row before paying anyone: the INSERT of a new row or the UPDATE of a
+# stopped ('failed') one only succeeds for one caller, so two runs for the same
+# date never page through the employees together. A run left 'running' by a
+# crashed process is only taken over with force=True.
+
+INSERT_PAYROLL = """
+    INSERT INTO payroll (emp_id, basic_salary, hra, pf, insurance, net_salary, generated_on)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+RUN_BY_DATE = "SELECT last_emp_id, rows_written, status FROM payroll_runs WHERE run_date = %s"
+
+NEW_RUN = "INSERT INTO payroll_runs (run_date, last_emp_id, rows_written, status) VALUES (%s, 0, 0, 'running')"
+
+# The status test makes this UPDATE the claim: once one caller has set
+# 'running', a second one matches no row. Bumping `claims` (migration 8) makes
+# every match change the row, so MySQL's rowcount (rows changed, not matched)
+# also counts a forced takeover of a row that was already 'running'.
+CLAIM_RUN = ("UPDATE payroll_runs SET status = 'running', claims = claims + 1 "
+             "WHERE run_date = %s AND status IN ({statuses})")
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+class BatchPayrollError(Exception):
+    """A chunk failed; the run can be resumed from `last_emp_id`."""
+
+    def __init__(self, run_date, last_emp_id, cause):
+        super().__init__(
+            f"Payroll run {run_date} stopped after employee {last_emp_id}: {cause}"
+        )
+        self.run_date = run_date
+        self.last_emp_id = last_emp_id
+        self.cause = cause
+
+
+class RunInProgress(Exception):
+    """Another process holds the run for this date (status 'running')."""
+
+    def __init__(self, run_date, last_emp_id):
+        super().__init__(
+            f"Payroll run {run_date} is already running (at employee {last_emp_id})"
+        )
+        self.run_date = run_date
+        self.last_emp_id = last_emp_id
+
+
+def _start_run(conn, run_date, force=False):
+    """
+    Claim the run record for `run_date`, creating it if needed;
+    return (last_emp_id, rows_written, status). Raises RunInProgress when
+    another run holds the date.
+    """
+    statuses = "'failed', 'running'" if force else "'failed'"
+    cursor = conn.cursor()
+    try:
+        try:
+            cursor.execute(NEW_RUN, (run_date,))
+            claimed = True
+        except storage.DB_ERRORS as err:
+            if not storage.is_duplicate_key(err):
+                raise
+            # The date already has a record: claim it if it stopped
+            cursor.execute(CLAIM_RUN.format(statuses=statuses), (run_date,))
+            claimed = cursor.rowcount == 1
+        cursor.execute(RUN_BY_DATE, (run_date,))
+        row = cursor.fetchone()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    if not claimed and row[2] != 'completed':
+        raise RunInProgress(run_date, row[0])
+    return row[0], row[1], row[2]
+
+
+def run_batch_payroll(conn, run_date=None, chunk_size=DEFAULT_CHUNK_SIZE, progress=None, rule_set=None,
+                      force=False):
+    """
+    Generate payroll rows for every employee for `run_date` (default today),
+    using each department's rule set unless `rule_set` forces one.
+
+    Returns a summary dict. Re-running for a date that stopped part-way picks
+    up after the last committed chunk; a completed date is not paid twice.
+    A date another run is still working on raises RunInProgress; force=True
+    takes over a run whose process died without marking it failed.
+    """
+    run_date = run_date or date.today()
+    last_emp_id, written, status = _start_run(conn, run_date, force)
+    summary = {'run_date': run_date, 'rows_written': written, 'skipped': 0,
+               'chunks': 0, 'resumed_after': last_emp_id, 'seconds': 0.0}
+    if status == 'completed':
+        summary['status'] = 'already completed'
+        summary['resumed_after'] = 0
+        return summary
+
+    started = time.perf_counter()
+    chunks = iter_employee_pages(conn, chunk_size, last_emp_id,
+                                 columns=("emp_id", "salary", "department"), dictionary=False)
+    cursor = conn.cursor()
+    try:
+        for rows in chunks:
+            payable = [(emp_id, float(salary)) for emp_id, salary, _ in rows if salary is not None]
+            departments = [department for _, salary, department in rows if salary is not None]
+            summary['skipped'] += len(rows) - len(payable)
+            chunk_last = rows[-1][0]
+
+            try:
+                if payable:
+                    emp_ids = [emp_id for emp_id, _ in payable]
+                    basics = [salary for _, salary in payable]
+                    hra, pf, insurance, net = _compute_chunk(basics, departments, rule_set)
+                    cursor.executemany(
+                        INSERT_PAYROLL,
+                        list(zip(emp_ids, basics, hra, pf, insurance, net, [run_date] * len(emp_ids))),
+                    )
+                    record_payroll_rows(cursor, zip(emp_ids, departments, [run_date] * len(emp_ids),
+                                                    basics, hra, pf, insurance, net))
+                cursor.execute(
+                    "UPDATE payroll_runs SET last_emp_id = %s, rows_written = rows_written + %s "
+                    "WHERE run_date = %s",
+                    (chunk_last, len(payable), run_date),
+                )
+                conn.commit()
+            except Exception as err:
+                conn.rollback()
+                try:
+                    _mark(conn, run_date, 'failed')
+                except Exception:
+                    pass  # the run stays 'running'; resume it with force=True
+                raise BatchPayrollError(run_date, last_emp_id, err) from err
+
+            last_emp_id = chunk_last
+            summary['rows_written'] += len(payable)
+            summary['chunks'] += 1
+            if progress:
+                progress(summary)
+    finally:
+        cursor.close()
+
+    _mark(conn, run_date, 'completed')
+    summary['status'] = 'completed'
+    summary['seconds'] = time.perf_counter() - started
+    return summary
+
+
+def _mark(conn, run_date, status):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("UPDATE payroll_runs SET status = %s WHERE run_date = %s", (status, run_date))
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def print_summary(summary):
+    print(f"Payroll run {summary['run_date']}: {summary['status']}")
+    print(f"Rows written: {summary['rows_written']} | Skipped (no salary): {summary['skipped']}")
+    if summary['resumed_after']:
+        print(f"Resumed after employee ID {summary['resumed_after']}.")
+    if summary['seconds']:
+        print(f"Took {summary['seconds']:.1f}s over {summary['chunks']} chunks.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run payroll for every employee.")
+    parser.add_argument("--date", type=date.fromisoformat, default=None,
+                        help="payroll date (YYYY-MM-DD), default today")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--rule-set", default=None,
+                        help="payroll rule set for everyone, default per department (payroll_rules)")
+    parser.add_argument("--force", action="store_true",
+                        help="take over a run left 'running' by a process that died")
+    args = parser.parse_args()
+
+    from main import get_db_connection
+    conn = get_db_connection()
+    if not conn:
+        sys.exit(1)
+    try:
+        print_summary(run_batch_payroll(conn, args.date, args.chunk_size, rule_set=args.rule_set,
+                                        force=args.force))
+    except BatchPayrollError as err:
+        print(f"{err}\nRe-run the same command to resume.")
+        sys.exit(1)
+    except RunInProgress as err:
+        print(f"{err}.\nIf that process is no longer running, re-run with --force to take it over.")
+        sys.exit(1)
+    finally:
+        conn.close()
@@ -0,0 +1,275 @@
+import json
+import os
+import threading
+from bisect import bisect_right
+
+try:
+    import numpy as np
+except ImportError:  # rule sets still evaluate, one salary at a time
+    np = None
+
+# ---------------------------
+# PAYROLL RULES ENGINE
+# ---------------------------
+# Payroll components are declared per rule set in a JSON file (the path in
+# $PAYROLL_RULES_FILE, else payroll_rules.json next to this module; without
+# either the built-in DEFAULT_RULES apply):
+#
+#   {
+#     "default_rule_set": "india",
+#     "department_rule_sets": {"Sales": "sales_llc"},
+#     "rule_sets": {
+#       "india": {
+#         "version": 3,
+#         "components": {
+#           "hra":       {"type": "allowance", "rate": 0.24},
+#           "pf":        {"type": "deduction", "rate": 0.12, "exempt_below": 10000},
+#           "insurance": {"type": "deduction", "amount": 1500, "exempt_below": 10000},
+#           "prof_tax":  {"type": "deduction", "slabs": [[0, 0], [15000, 150], [20000, 200]]},
+#           "tds":       {"type": "deduction", "bands": [[0, 0], [50000, 0.05], [100000, 0.1]], "cap": 20000}
+#         }
+#       },
+#       "sales_llc": {...}
+#     }
+#   }
+#
+# Each component takes exactly one of
+#   rate        fraction of basic
+#   amount      fixed amount
+#   slabs       [[min_basic, amount], ...]  amount of the highest slab reached
+#   rate_slabs  [[min_basic, rate], ...]    rate of the highest slab, on the whole basic
+#   bands       [[min_basic, rate], ...]    marginal rates, each on the slice above its threshold
+# plus optional "exempt_below" (zero under that basic) and "cap" (upper limit).
+#
+# A rule set is compiled once per (name, version) into slab tables with
+# cumulative band totals, evaluated by bisect for one salary or by
+# numpy.searchsorted over a whole batch. Bump "version" when editing a rule
+# set; the same version with different content is rejected.
+#
+# hra, pf and insurance fill the payroll table's columns; any other component
+# still counts towards net_salary.
+
+DEFAULT_RULES = {
+    "default_rule_set": "default",
+    "department_rule_sets": {},
+    "rule_sets": {
+        "default": {
+            "version": 1,
+            "components": {
+                "hra": {"type": "allowance", "rate": 0.24},
+                "pf": {"type": "deduction", "rate": 0.12, "exempt_below": 10000},
+                "insurance": {"type": "deduction", "amount": 1500.0, "exempt_below": 10000},
+            },
+        },
+    },
+}
+
+RULES_FILE = os.environ.get("PAYROLL_RULES_FILE") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "payroll_rules.json")
+
+STORED_COMPONENTS = ("hra", "pf", "insurance")
+MODES = ("rate", "amount", "slabs", "rate_slabs", "bands")
+
+
+class RuleError(ValueError):
+    """A rule set in the payroll configuration is malformed."""
+
+
+class _Component:
+    __slots__ = ("name", "sign", "mode", "value", "thresholds", "values", "cumulative", "exempt_below", "cap")
+
+    def __init__(self, rule_set, name, spec):
+        where = f"rule set {rule_set!r}, component {name!r}"
+        if spec.get("type") not in ("allowance", "deduction"):
+            raise RuleError(f"{where}: type must be 'allowance' or 'deduction'")
+        modes = [mode for mode in MODES if mode in spec]
+        if len(modes) != 1:
+            raise RuleError(f"{where}: give exactly one of {', '.join(MODES)}")
+        self.name = name
+        self.sign = 1.0 if spec["type"] == "allowance" else -1.0
+        self.mode = modes[0]
+        self.exempt_below = float(spec["exempt_below"]) if spec.get("exempt_below") is not None else None
+        self.cap = float(spec["cap"]) if spec.get("cap") is not None else None
+        self.value = None
+        self.thresholds = self.values = self.cumulative = ()
+
+        if self.mode in ("rate", "amount"):
+            self.value = float(spec[self.mode])
+            return
+
+        table = [(float(threshold), float(value)) for threshold, value in spec[self.mode]]
+        if not table or any(a[0] >= b[0] for a, b in zip(table, table[1:])):
+            raise RuleError(f"{where}: {self.mode} thresholds must be non-empty and strictly increasing")
+        self.thresholds = [t for t, _ in table]
+        self.values = [v for _, v in table]
+        if self.mode == "bands":
+            # tax already due at the start of each band
+            cumulative = [0.0]
+            for i in range(1, len(table)):
+                cumulative.append(cumulative[-1] + self.values[i - 1] * (self.thresholds[i] - self.thresholds[i - 1]))
+            self.cumulative = cumulative
+
+    def scalar(self, basic):
+        if self.exempt_below is not None and basic < self.exempt_below:
+            return 0.0
+        if self.mode == "rate":
+            value = basic * self.value
+        elif self.mode == "amount":
+            value = self.value
+        else:
+            i = bisect_right(self.thresholds, basic) - 1
+            if i < 0:
+                return 0.0
+            if self.mode == "slabs":
+                value = self.values[i]
+            elif self.mode == "rate_slabs":
+                value = basic * self.values[i]
+            else:
+                value = self.cumulative[i] + self.values[i] * (basic - self.thresholds[i])
+        if self.cap is not None and value > self.cap:
+            value = self.cap
+        return value
+
+    def vector(self, basic):
+        if self.mode == "rate":
+            value = basic * self.value
+        elif self.mode == "amount":
+            value = np.full(basic.shape, self.value)
+        else:
+            idx = np.searchsorted(np.asarray(self.thresholds), basic, side="right") - 1
+            below = idx < 0
+            idx = np.maximum(idx, 0)
+            values = np.asarray(self.values)[idx]
+            if self.mode == "slabs":
+                value = values
+            elif self.mode == "rate_slabs":
+                value = basic * values
+            else:
+                value = np.asarray(self.cumulative)[idx] + values * (basic - np.asarray(self.thresholds)[idx])
+            value = np.where(below, 0.0, value)
+        if self.cap is not None:
+            value = np.minimum(value, self.cap)
+        if self.exempt_below is not None:
+            value = np.where(basic < self.exempt_below, 0.0, value)
+        return value
+
+
+class CompiledRuleSet:
+    def __init__(self, name, spec):
+        if not isinstance(spec.get("components"), dict) or not spec["components"]:
+            raise RuleError(f"rule set {name!r}: no components")
+        self.name = name
+        self.version = spec.get("version", 1)
+        self.spec = spec
+        self.components = [_Component(name, key, value) for key, value in spec["components"].items()]
+        self.floor_net = spec.get("floor_net_at_zero", True)
+
+    def components_for(self, basic):
+        """{component: amount} for one basic salary; deductions are negative."""
+        basic = float(basic)
+        return {c.name: c.sign * c.scalar(basic) for c in self.components}
+
+    def evaluate(self, basic):
+        """(hra, pf, insurance, net_salary) for one basic salary."""
+        basic = float(basic)
+        amounts = {c.name: c.scalar(basic) for c in self.components}
+        # basic + allowances - (deductions): the same float operations as the
+        # fixed formula this engine replaced, so the default rules match it exactly
+        allowances = sum(amounts[c.name] for c in self.components if c.sign > 0)
+        deductions = sum(amounts[c.name] for c in self.components if c.sign < 0)
+        net = basic + allowances - deductions
+        if self.floor_net and net < 0:
+            net = 0.0
+        return (*(amounts.get(name, 0.0) for name in STORED_COMPONENTS), net)
+
+    def evaluate_batch(self, salaries):
+        """Four lists (hra, pf, insurance, net) aligned with `salaries`."""
+        if np is None:
+            columns = list(zip(*(self.evaluate(s) for s in salaries))) or [(), (), (), ()]
+            return [list(col) for col in columns]
+
+        basic = np.asarray(salaries, dtype=np.float64)
+        allowances, deductions = np.zeros(basic.shape), np.zeros(basic.shape)
+        stored = {}
+        for c in self.components:
+            amount = c.vector(basic)
+            if c.sign > 0:
+                allowances += amount
+            else:
+                deductions += amount
+            if c.name in STORED_COMPONENTS:
+                stored[c.name] = amount
+        net = basic + allowances - deductions
+        if self.floor_net:
+            net = np.maximum(net, 0.0)
+        zeros = np.zeros(basic.shape)
+        return [stored.get(name, zeros).tolist() for name in STORED_COMPONENTS] + [net.tolist()]
+
+
+# ---------------------------
+# CONFIG + COMPILED CACHE
+# ---------------------------
+
+_lock = threading.Lock()
+_compiled = {}                  # (rule set name, version) -> CompiledRuleSet
+_config = None
+_config_stamp = None            # (path, mtime) the config was read from
+
+
+def _read_config(path):
+    try:
+        stamp = (path, os.path.getmtime(path))
+    except OSError:
+        return DEFAULT_RULES, None
+    global _config, _config_stamp
+    if stamp != _config_stamp:
+        with open(path, encoding="utf-8") as fh:
+            config = json.load(fh)
+        if not isinstance(config.get("rule_sets"), dict) or not config["rule_sets"]:
+            raise RuleError(f"{path}: no rule_sets defined")
+        _config, _config_stamp = config, stamp
+    return _config, stamp
+
+
+def load_config(path=None):
+    """The payroll rules configuration (re-read only when the file changes)."""
+    with _lock:
+        config, _ = _read_config(path or RULES_FILE)
+        return config
+
+
+def compile_rule_set(name, spec):
+    """Compile `spec`, or return the cached compilation of this (name, version)."""
+    key = (name, spec.get("version", 1))
+    with _lock:
+        compiled = _compiled.get(key)
+        if compiled is not None:
+            if compiled.spec != spec:
+                raise RuleError(f"rule set {name!r} changed without a version bump (still {key[1]})")
+            return compiled
+    compiled = CompiledRuleSet(name, spec)
+    with _lock:
+        return _compiled.setdefault(key, compiled)
+
+
+def get_rule_set(name=None, config=None):
+    """Compiled rule set by name (default: the configured default rule set)."""
+    if isinstance(name, CompiledRuleSet):
+        return name
+    config = config or load_config()
+    name = name or config.get("default_rule_set") or "default"
+    spec = config["rule_sets"].get(name)
+    if spec is None:
+        raise RuleError(f"Unknown payroll rule set {name!r}")
+    return compile_rule_set(name, spec)
+
+
+def rule_set_for_department(department, config=None):
+    """Name of the rule set that applies to employees of `department`."""
+    config = config or load_config()
+    return (config.get("department_rule_sets") or {}).get(department) or config.get("default_rule_set") or "default"
+
+
+def clear_cache():
+    with _lock:
+        _compiled.clear()
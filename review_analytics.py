@@ -0,0 +1,345 @@
+"""
+Performance review aggregates for calibration.
+
+    python review_analytics.py rebuild
+    python review_analytics.py distribution [--department Finance] [--from 2025-01] [--to 2025-12]
+    python review_analytics.py trend [--department Finance] [--months 12] [--window 3]
+    python review_analytics.py employees --department Finance [--window 3]
+"""
+import argparse
+import sys
+from datetime import date
+
+from payroll_analytics import UNASSIGNED, month_key, shift_month
+import storage
+
+RATINGS = (1, 2, 3, 4, 5)
+
+# ---------------------------
+# MONTHLY RATING COUNTS
+# ---------------------------
+# review_monthly holds, per (month, department, rating), how many reviews
+# gave that rating. record_performance_review folds each new review in on its
+# own cursor, so the counts commit or roll back with the review. Distributions,
+# averages and trend lines for a department are then sums over at most
+# months x 5 rows instead of a scan of performance_reviews.
+#
+# Department is the employee's department when the review was recorded; a
+# rebuild re-derives it from the current employees table.
+
+ROLLUP_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS review_monthly (
+        month CHAR(7) NOT NULL,
+        department VARCHAR(100) NOT NULL,
+        rating INT NOT NULL,
+        reviews INT NOT NULL,
+        PRIMARY KEY (month, department, rating)
+    )
+"""
+
+MONTH_OF_REVIEW_DATE = "SUBSTR(CAST(r.review_date AS CHAR), 1, 7)"
+
+# Insert the (month, department, rating) row or bump its count in one statement,
+# so two first reviews of a month can't both try to insert it.
+_INSERT_REVIEW_COUNT = "INSERT INTO review_monthly (month, department, rating, reviews) VALUES (%s, %s, %s, 1)"
+COUNT_REVIEW = {
+    "mysql": _INSERT_REVIEW_COUNT + " ON DUPLICATE KEY UPDATE reviews = reviews + 1",
+    "sqlite": _INSERT_REVIEW_COUNT + " ON CONFLICT (month, department, rating) DO UPDATE SET reviews = reviews + 1",
+}
+
+
+def create_rollup_table(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(ROLLUP_TABLE_DDL)
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def record_review(cursor, department, review_date, rating):
+    """Count one newly inserted review. Runs on the caller's cursor so it commits with the INSERT."""
+    key = (month_key(review_date), department or UNASSIGNED, int(rating))
+    cursor.execute(COUNT_REVIEW[storage.dialect_of(cursor)], key)
+
+
+def rebuild_rollups(conn):
+    """Recompute review_monthly from performance_reviews (backfill / repair)."""
+    create_rollup_table(conn)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM review_monthly")
+        cursor.execute(f"""
+            INSERT INTO review_monthly (month, department, rating, reviews)
+            SELECT {MONTH_OF_REVIEW_DATE}, COALESCE(NULLIF(e.department, ''), '{UNASSIGNED}'), r.rating, COUNT(*)
+            FROM performance_reviews r
+            LEFT JOIN employees e ON e.emp_id = r.emp_id
+            WHERE r.rating IS NOT NULL
+            GROUP BY {MONTH_OF_REVIEW_DATE}, COALESCE(NULLIF(e.department, ''), '{UNASSIGNED}'), r.rating
+        """)
+        rows = cursor.rowcount
+        conn.commit()
+        return rows
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+# ---------------------------
+# AGGREGATES
+# ---------------------------
+
+def _rows(conn, query, params=()):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def _summary(counts):
+    """reviews / average / counts / pct for a {rating: count} dict."""
+    total = sum(counts.values())
+    return {
+        'reviews': total,
+        'average': round(sum(r * n for r, n in counts.items()) / total, 2) if total else None,
+        'counts': {r: counts.get(r, 0) for r in RATINGS},
+        'pct': {r: round(counts.get(r, 0) / total * 100, 1) if total else 0.0 for r in RATINGS},
+    }
+
+
+def slope(points):
+    """Least-squares slope of [(x, y), ...], or None with fewer than two distinct x."""
+    n = len(points)
+    if n < 2:
+        return None
+    sx = sum(x for x, _ in points)
+    sy = sum(y for _, y in points)
+    sxx = sum(x * x for x, _ in points)
+    sxy = sum(x * y for x, y in points)
+    denominator = n * sxx - sx * sx
+    return (n * sxy - sx * sy) / denominator if denominator else None
+
+
+def rating_distribution(conn, department=None, date_from=None, date_to=None):
+    """
+    Rating distribution of the reviews given between two months (inclusive),
+    one row per department plus an 'ALL' row, or just `department`.
+    """
+    where, params = [], []
+    if department:
+        where.append("department = %s")
+        params.append(department)
+    if date_from:
+        where.append("month >= %s")
+        params.append(month_key(date_from))
+    if date_to:
+        where.append("month <= %s")
+        params.append(month_key(date_to))
+    rows = _rows(conn, f"""
+        SELECT department, rating, SUM(reviews) AS reviews
+        FROM review_monthly
+        {"WHERE " + " AND ".join(where) if where else ""}
+        GROUP BY department, rating
+        ORDER BY department
+    """, tuple(params))
+
+    by_department, overall = {}, {}
+    for row in rows:
+        count = int(row['reviews'])
+        by_department.setdefault(row['department'], {})[row['rating']] = count
+        overall[row['rating']] = overall.get(row['rating'], 0) + count
+    out = [{'department': name, **_summary(counts)} for name, counts in by_department.items()]
+    if not department and out:
+        out.append({'department': 'ALL', **_summary(overall)})
+    return out
+
+
+def latest_rating_distribution(conn, department=None):
+    """Distribution of each employee's most recent rating (employee_latest_review), by current department."""
+    rows = _rows(conn, f"""
+        SELECT COALESCE(NULLIF(e.department, ''), '{UNASSIGNED}') AS department, lr.rating, COUNT(*) AS employees
+        FROM employee_latest_review lr
+        JOIN employees e ON e.emp_id = lr.emp_id
+        {"WHERE e.department = %s" if department else ""}
+        GROUP BY COALESCE(NULLIF(e.department, ''), '{UNASSIGNED}'), lr.rating
+        ORDER BY department
+    """, (department,) if department else ())
+    by_department = {}
+    for row in rows:
+        by_department.setdefault(row['department'], {})[row['rating']] = int(row['employees'])
+    return [{'department': name, **_summary(counts)} for name, counts in by_department.items()]
+
+
+def rating_trend_query(first, last, department=None):
+    """(sql, params) of the monthly review counts and rating points from `first` to `last`."""
+    where, params = "month BETWEEN %s AND %s", [first, last]
+    if department:
+        where += " AND department = %s"
+        params.append(department)
+    return f"""
+        SELECT month, SUM(reviews) AS reviews, SUM(rating * reviews) AS points
+        FROM review_monthly
+        WHERE {where}
+        GROUP BY month
+    """, tuple(params)
+
+
+def rating_trend(conn, department=None, months=12, until=None, window=3):
+    """
+    Monthly review count and average rating for the last `months` months up
+    to `until` (default this month), for one department or the company, with
+    the average over the trailing `window` months and the slope of the monthly
+    averages (rating points per month).
+    """
+    last = month_key(until or date.today())
+    first = shift_month(last, -(months + window - 2))     # earlier months feed the first rolling window
+    rows = _rows(conn, *rating_trend_query(first, last, department))
+    by_month = {row['month']: (int(row['reviews']), int(row['points'])) for row in rows}
+
+    series = [by_month.get(shift_month(first, i), (0, 0)) for i in range(months + window - 1)]
+    out, points = [], []
+    for i in range(months):
+        reviews, total = series[window - 1 + i]
+        trailing = series[i:i + window]
+        trailing_reviews = sum(n for n, _ in trailing)
+        average = round(total / reviews, 2) if reviews else None
+        if average is not None:
+            points.append((i, total / reviews))
+        out.append({
+            'month': shift_month(first, window - 1 + i),
+            'reviews': reviews,
+            'average': average,
+            'rolling_average': round(sum(p for _, p in trailing) / trailing_reviews, 2) if trailing_reviews else None,
+        })
+    trend_slope = slope(points)
+    return {'department': department or 'ALL', 'window': window, 'months': out,
+            'slope': round(trend_slope, 4) if trend_slope is not None else None}
+
+
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def review_stats(reviews, window=3):
+    """
+    Count, average, latest, rolling average of the last `window` reviews and
+    trend (rating points per year) for one employee's reviews, oldest first.
+    """
+    ratings = [r['rating'] for r in reviews if r['rating'] is not None]
+    if not ratings:
+        return {'reviews': 0, 'average': None, 'latest': None, 'rolling_average': None, 'trend_per_year': None}
+    recent = ratings[-window:]
+    points = [(_as_date(r['review_date']).toordinal() / 365.25, r['rating'])
+              for r in reviews if r['rating'] is not None and r['review_date'] is not None]
+    trend_slope = slope(points)
+    return {
+        'reviews': len(ratings),
+        'average': round(sum(ratings) / len(ratings), 2),
+        'latest': ratings[-1],
+        'rolling_average': round(sum(recent) / len(recent), 2),
+        'trend_per_year': round(trend_slope, 2) if trend_slope is not None else None,
+    }
+
+
+def employee_trends_query(department=None):
+    """(sql, params) of every review (of `department`), ordered by employee then date."""
+    return f"""
+        SELECT r.emp_id, e.first_name, e.last_name, e.department, r.review_date, r.rating
+        FROM performance_reviews r
+        JOIN employees e ON e.emp_id = r.emp_id
+        {"WHERE e.department = %s" if department else ""}
+        ORDER BY r.emp_id, r.review_date, r.review_id
+    """, (department,) if department else ()
+
+
+def employee_trends(conn, department=None, window=3):
+    """
+    review_stats for every reviewed employee (of `department`), from a single
+    ordered scan of performance_reviews, grouped in one pass.
+    """
+    rows = _rows(conn, *employee_trends_query(department))
+
+    out, group = [], []
+
+    def flush():
+        head = group[0]
+        out.append({'emp_id': head['emp_id'], 'first_name': head['first_name'], 'last_name': head['last_name'],
+                    'department': head['department'], **review_stats(group, window)})
+
+    for row in rows:
+        if group and row['emp_id'] != group[0]['emp_id']:
+            flush()
+            group = []
+        group.append(row)
+    if group:
+        flush()
+    return out
+
+
+# ---------------------------
+# OUTPUT
+# ---------------------------
+
+def print_distribution(rows):
+    print(f"{'department':<20} {'reviews':>8} {'avg':>5} " + " ".join(f"{f'{r}*':>6}" for r in RATINGS))
+    for row in rows:
+        average = "" if row['average'] is None else f"{row['average']:.2f}"
+        print(f"{row['department']:<20} {row['reviews']:>8} {average:>5} "
+              + " ".join(f"{row['pct'][r]:>5.1f}%" for r in RATINGS))
+
+
+def print_trend(result):
+    print(f"{'month':<8} {'reviews':>8} {'avg':>6} {'rolling':>8}")
+    for row in result['months']:
+        average = "" if row['average'] is None else f"{row['average']:.2f}"
+        rolling = "" if row['rolling_average'] is None else f"{row['rolling_average']:.2f}"
+        print(f"{row['month']:<8} {row['reviews']:>8} {average:>6} {rolling:>8}")
+    if result['slope'] is not None:
+        print(f"Trend: {result['slope']:+.3f} rating points per month")
+
+
+def print_employee_trends(rows):
+    print(f"{'emp':>6} {'name':<24} {'reviews':>7} {'avg':>5} {'latest':>6} {'rolling':>7} {'trend/yr':>8}")
+    for row in rows:
+        trend_text = "" if row['trend_per_year'] is None else f"{row['trend_per_year']:+.2f}"
+        print(f"{row['emp_id']:>6} {row['first_name'] + ' ' + row['last_name']:<24} {row['reviews']:>7}"
+              f" {row['average']:>5.2f} {row['latest']:>6} {row['rolling_average']:>7.2f} {trend_text:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Performance review distributions and trends.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("rebuild", help="recompute review_monthly from performance_reviews")
+    distribution = sub.add_parser("distribution", help="rating distribution per department")
+    distribution.add_argument("--department")
+    distribution.add_argument("--from", dest="date_from", help="YYYY-MM")
+    distribution.add_argument("--to", dest="date_to", help="YYYY-MM")
+    trend_cmd = sub.add_parser("trend", help="monthly average rating with rolling average")
+    trend_cmd.add_argument("--department")
+    trend_cmd.add_argument("--months", type=int, default=12)
+    trend_cmd.add_argument("--window", type=int, default=3)
+    employees = sub.add_parser("employees", help="per-employee averages and trends")
+    employees.add_argument("--department")
+    employees.add_argument("--window", type=int, default=3)
+    args = parser.parse_args()
+
+    from main import get_db_connection
+    conn = get_db_connection()
+    if not conn:
+        sys.exit(1)
+    try:
+        if args.command == "rebuild":
+            count = rebuild_rollups(conn)
+            print(f"Review rollups rebuilt: {count} month/department/rating rows.")
+        elif args.command == "distribution":
+            print_distribution(rating_distribution(conn, args.department, args.date_from, args.date_to))
+        elif args.command == "trend":
+            print_trend(rating_trend(conn, args.department, args.months, window=args.window))
+        else:
+            print_employee_trends(employee_trends(conn, args.department, args.window))
+    finally:
+        conn.close()
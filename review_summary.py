@@ -0,0 +1,223 @@
+import sys
+
+from employee_listing import fetch_employee_page
+import storage
+
+# ---------------------------
+# LATEST REVIEW SUMMARY
+# ---------------------------
+# employee_latest_review holds exactly one row per reviewed employee: the
+# most recent entry of performance_reviews (by review_date, then review_id).
+# record_performance_review keeps it current in the same transaction as the
+# review INSERT, so the employee list is a single LEFT JOIN.
+
+SUMMARY_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS employee_latest_review (
+        emp_id INT PRIMARY KEY,
+        review_id INT NOT NULL,
+        review_date DATE NOT NULL,
+        rating INT NOT NULL
+    )
+"""
+
+# One round trip, served from the summary table.
+EMPLOYEES_WITH_LATEST_RATING = """
+    SELECT e.emp_id, e.first_name, e.last_name, e.job_title, e.department, e.salary,
+           lr.rating AS latest_rating, lr.review_date AS latest_review_date
+    FROM employees e
+    LEFT JOIN employee_latest_review lr ON lr.emp_id = e.emp_id
+    ORDER BY e.emp_id
+"""
+
+# Keyset page of the same listing (see employee_listing.iter_pages).
+EMPLOYEES_WITH_LATEST_RATING_PAGE = """
+    SELECT e.emp_id, e.first_name, e.last_name, e.job_title, e.department, e.salary,
+           lr.rating AS latest_rating, lr.review_date AS latest_review_date
+    FROM employees e
+    LEFT JOIN employee_latest_review lr ON lr.emp_id = e.emp_id
+    WHERE e.emp_id > %s
+    ORDER BY e.emp_id
+    LIMIT %s
+"""
+
+# Same result computed straight from performance_reviews with a window
+# function (MySQL 8+ / SQLite 3.25+). Used to build the summary table; the
+# listing falls back to it (via LATEST_REVIEWS_BY_IDS_WINDOW) on a database
+# that has not been migrated to the summary table yet.
+LATEST_REVIEW_PER_EMPLOYEE = """
+    SELECT emp_id, review_id, review_date, rating
+    FROM (
+        SELECT emp_id, review_id, review_date, rating,
+               ROW_NUMBER() OVER (
+                   PARTITION BY emp_id
+                   ORDER BY review_date DESC, review_id DESC
+               ) AS rn
+        FROM performance_reviews
+    ) ranked
+    WHERE rn = 1
+"""
+
+EMPLOYEES_WITH_LATEST_RATING_WINDOW = """
+    SELECT e.emp_id, e.first_name, e.last_name, e.job_title, e.department, e.salary,
+           lr.rating AS latest_rating, lr.review_date AS latest_review_date
+    FROM employees e
+    LEFT JOIN (""" + LATEST_REVIEW_PER_EMPLOYEE + """) lr ON lr.emp_id = e.emp_id
+    ORDER BY e.emp_id
+"""
+
+# Latest ratings for a page of employees read elsewhere (attach_latest_ratings).
+LATEST_REVIEWS_BY_IDS = ("SELECT emp_id, rating, review_date FROM employee_latest_review "
+                         "WHERE emp_id IN ({placeholders})")
+
+# The same lookup without the summary table: rank only the page's reviews.
+LATEST_REVIEWS_BY_IDS_WINDOW = """
+    SELECT emp_id, rating, review_date
+    FROM (
+        SELECT emp_id, rating, review_date,
+               ROW_NUMBER() OVER (
+                   PARTITION BY emp_id
+                   ORDER BY review_date DESC, review_id DESC
+               ) AS rn
+        FROM performance_reviews
+        WHERE emp_id IN ({placeholders})
+    ) ranked
+    WHERE rn = 1
+"""
+
+SUMMARY_TABLE_PROBE = "SELECT emp_id FROM employee_latest_review LIMIT 1"
+
+
+def create_summary_table(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(SUMMARY_TABLE_DDL)
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def fetch_employees_with_latest_rating(conn, use_summary=True):
+    """Return every employee with latest_rating / latest_review_date in one query."""
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(EMPLOYEES_WITH_LATEST_RATING if use_summary else EMPLOYEES_WITH_LATEST_RATING_WINDOW)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def has_summary_table(conn):
+    """True when employee_latest_review exists (migration 2 has been applied)."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(SUMMARY_TABLE_PROBE)
+        cursor.fetchall()
+        return True
+    except storage.DB_ERRORS:
+        return False
+    finally:
+        cursor.close()
+
+
+def fetch_latest_rating_page(conn, after_emp_id, limit, use_summary=True):
+    """
+    One keyset page of employees with their latest rating. Without the summary
+    table the page is read first and its ratings ranked from performance_reviews.
+    """
+    if not use_summary:
+        return attach_latest_ratings(conn, fetch_employee_page(conn, after_emp_id, limit), use_summary=False)
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(EMPLOYEES_WITH_LATEST_RATING_PAGE, (after_emp_id, limit))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def attach_latest_ratings(conn, employees, use_summary=True):
+    """
+    Add latest_rating / latest_review_date to a page of employee dicts (e.g.
+    from the directory snapshot) with one primary-key lookup on the summary table
+    (or one windowed read of the page's reviews when use_summary is False).
+    """
+    if not employees:
+        return employees
+    placeholders = ", ".join(["%s"] * len(employees))
+    query = LATEST_REVIEWS_BY_IDS if use_summary else LATEST_REVIEWS_BY_IDS_WINDOW
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(query.format(placeholders=placeholders),
+                       tuple(emp['emp_id'] for emp in employees))
+        latest = {row['emp_id']: row for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+    for emp in employees:
+        row = latest.get(emp['emp_id'])
+        emp['latest_rating'] = row['rating'] if row else None
+        emp['latest_review_date'] = row['review_date'] if row else None
+    return employees
+
+
+# Insert the employee's summary row, or replace it when this review is newer
+# (later date, or same date and later id), in one statement. MySQL applies the
+# assignments left to right, each seeing the ones before it, so review_date
+# goes last and the test keeps comparing against the stored date.
+_INSERT_LATEST_REVIEW = ("INSERT INTO employee_latest_review (emp_id, review_id, review_date, rating) "
+                         "VALUES (%s, %s, %s, %s)")
+_NEWER = "new.review_date > review_date OR (new.review_date = review_date AND new.review_id > review_id)"
+UPSERT_LATEST_REVIEW = {
+    "mysql": _INSERT_LATEST_REVIEW + f""" AS new
+        ON DUPLICATE KEY UPDATE
+            rating = IF({_NEWER}, new.rating, rating),
+            review_id = IF({_NEWER}, new.review_id, review_id),
+            review_date = IF({_NEWER}, new.review_date, review_date)""",
+    "sqlite": _INSERT_LATEST_REVIEW + """
+        ON CONFLICT (emp_id) DO UPDATE
+        SET review_id = excluded.review_id, review_date = excluded.review_date, rating = excluded.rating
+        WHERE excluded.review_date > employee_latest_review.review_date
+           OR (excluded.review_date = employee_latest_review.review_date
+               AND excluded.review_id > employee_latest_review.review_id)""",
+}
+
+
+def refresh_latest_review(cursor, emp_id, review_id, review_date, rating):
+    """
+    Fold one newly inserted review into the summary table.
+    Runs on the caller's cursor so it commits (or rolls back) with the review itself.
+    """
+    cursor.execute(UPSERT_LATEST_REVIEW[storage.dialect_of(cursor)], (emp_id, review_id, review_date, rating))
+
+
+def rebuild_latest_reviews(conn):
+    """Recompute the whole summary table from performance_reviews (backfill / repair)."""
+    create_summary_table(conn)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM employee_latest_review")
+        cursor.execute(
+            "INSERT INTO employee_latest_review (emp_id, review_id, review_date, rating) "
+            + LATEST_REVIEW_PER_EMPLOYEE
+        )
+        rows = cursor.rowcount
+        conn.commit()
+        return rows
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        print("Usage: python review_summary.py rebuild")
+        sys.exit(2)
+    from main import get_db_connection
+    conn = get_db_connection()
+    if not conn:
+        sys.exit(1)
+    try:
+        count = rebuild_latest_reviews(conn)
+        print(f"Latest-review summary rebuilt for {count} employees.")
+    finally:
+        conn.close()
@@ -0,0 +1,944 @@
+from datetime import date, datetime
+
+import statements
+import storage
+
+import employee_history
+from directory_snapshot import db_mark, get_directory_snapshot, note_directory
+from employee_cache import get_employee as _cached_employee, invalidate_employee
+from employee_listing import DEFAULT_PAGE_SIZE, iter_pages
+from employee_search import escape_like, fetch_employees_by_ids, index_employee
+from leave_engine import LeaveEngine, get_leave_engine, note_employee
+from payroll_analytics import record_payroll_rows
+from payroll_batch import INSERT_PAYROLL
+from payroll_rules import RuleError, get_rule_set, rule_set_for_department
+from review_analytics import record_review, review_stats
+from review_summary import refresh_latest_review
+
+# ---------------------------
+# HR SERVICE LAYER
+# ---------------------------
+# The data operations behind the menus, without any input()/print(). Each
+# function takes a connection plus plain arguments, commits its own work and
+# returns a dict (or list of dicts). Bad input raises ServiceError, a missing
+# record raises NotFound; database errors propagate unchanged.
+
+class ServiceError(ValueError):
+    """The request can't be carried out as given."""
+
+
+class NotFound(ServiceError):
+    """The referenced record does not exist."""
+
+
+class Conflict(ServiceError):
+    """The record is no longer in a state the change applies to."""
+
+
+def _as_float(value, field):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ServiceError(f"{field} must be a number")
+
+
+def _as_int(value, field):
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        raise ServiceError(f"{field} must be an integer")
+
+
+def _as_date(value, field):
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ServiceError(f"{field} must be a date in YYYY-MM-DD format")
+
+
+def _as_moment(value):
+    """A date (meaning the end of that day) or a datetime."""
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    try:
+        return date.fromisoformat(text) if len(text) == 10 else datetime.fromisoformat(text)
+    except ValueError:
+        raise ServiceError("date must be YYYY-MM-DD or YYYY-MM-DD HH:MM:SS")
+
+
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+
+# ---------------------------
+# EMPLOYEES
+# ---------------------------
+
+def add_employee(conn, first_name, last_name, email="", phone="", department="", job_title="", salary=None):
+    """Insert one employee; returns the new row's identifying fields."""
+    salary = _as_float(salary, "salary")
+    first_name, last_name = _text(first_name), _text(last_name)
+    department, job_title = _text(department), _text(job_title)
+
+    tracking = get_directory_snapshot() is not None
+    marks = None
+    cursor = conn.cursor()
+    try:
+        if tracking:
+            # the snapshot stamp is read before and after the write in one
+            # transaction; on SQLite that needs the write lock from the start
+            if storage.dialect_of(conn) == "sqlite":
+                conn.start_transaction()
+            before_mark = db_mark(conn)
+        cursor.execute("""
+            INSERT INTO employees (first_name, last_name, email, phone, department, job_title, salary)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, (first_name, last_name, _text(email), _text(phone), department, job_title, salary))
+        new_id = cursor.lastrowid
+        employee_history.record_new_employee(cursor, {
+            'emp_id': new_id, 'first_name': first_name, 'last_name': last_name,
+            'department': department, 'job_title': job_title, 'salary': salary})
+        if tracking:
+            marks = (before_mark, db_mark(conn))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    invalidate_employee(new_id)
+    new_row = {'emp_id': new_id, 'first_name': first_name, 'last_name': last_name,
+               'department': department, 'job_title': job_title}
+    index_employee(new_row)
+    note_employee(new_row)
+    note_directory(dict(new_row, salary=salary), marks)
+    return {'emp_id': new_id, 'first_name': first_name, 'last_name': last_name}
+
+
+LOCK_EMPLOYEE = "SELECT * FROM employees WHERE emp_id = %s FOR UPDATE"
+
+
+def _lock_employee(conn, emp_id):
+    """
+    Lock one employee until commit / rollback and return their current row
+    (None if gone): MySQL locks the row itself, SQLite takes the database
+    write lock up front (BEGIN IMMEDIATE) so no other connection can write
+    in between. Serialises updates and leave requests per employee.
+    """
+    if storage.dialect_of(conn) == "sqlite":
+        conn.start_transaction()
+        query = LOCK_EMPLOYEE.replace(" FOR UPDATE", "")
+    else:
+        query = LOCK_EMPLOYEE
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(query, (emp_id,))
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+
+
+EDITABLE_EMPLOYEE_FIELDS = ("first_name", "last_name", "phone", "job_title", "department", "salary")
+
+
+def employee_update_query(fields):
+    return "UPDATE employees SET " + ", ".join(f"{field} = %s" for field in fields) + " WHERE emp_id = %s"
+
+
+def update_employee(conn, emp_id, **changes):
+    """Change any of EDITABLE_EMPLOYEE_FIELDS; returns the updated row."""
+    unknown = set(changes) - set(EDITABLE_EMPLOYEE_FIELDS)
+    if unknown:
+        raise ServiceError(f"Cannot update: {', '.join(sorted(unknown))}")
+    changes = {field: value for field, value in changes.items() if value not in (None, "")}
+    if not changes:
+        raise ServiceError("No changes given")
+    if 'salary' in changes:
+        changes['salary'] = _as_float(changes['salary'], "salary")
+    emp_id = get_employee(conn, emp_id)['emp_id']
+
+    tracking = get_directory_snapshot() is not None
+    marks = None
+    cursor = conn.cursor()
+    try:
+        # the row as it stands now, locked until commit: the cached copy may be
+        # stale, and `before` / the logged state must be what was really replaced
+        before = _lock_employee(conn, emp_id)
+        if before is None:
+            raise NotFound(f"Employee {emp_id} not found")
+        before_mark = db_mark(conn) if tracking else None
+        employee = dict(before)
+        updates, values = [], []
+        for field in EDITABLE_EMPLOYEE_FIELDS:
+            if field in changes:
+                value = changes[field] if field == 'salary' else _text(changes[field])
+                updates.append(field)
+                values.append(value)
+                employee[field] = value
+        values.append(emp_id)
+
+        cursor.execute(employee_update_query(updates), tuple(values))
+        changed = [field for field in employee_history.TRACKED_FIELDS if field in changes]
+        if changed:
+            employee_history.record_change(cursor, before, employee, changed)
+        if tracking:
+            marks = (before_mark, db_mark(conn))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    invalidate_employee(employee['emp_id'])
+    index_employee(employee)
+    note_employee(employee)
+    note_directory(employee, marks)
+    return employee
+
+
+def get_employee(conn, emp_id):
+    employee = _cached_employee(conn, emp_id)
+    if not employee:
+        raise NotFound(f"Employee {emp_id} not found")
+    return employee
+
+
+def employee_changes(conn, emp_id):
+    """Every recorded state of one employee, oldest first."""
+    employee = get_employee(conn, emp_id)
+    return employee_history.history(conn, employee['emp_id'])
+
+
+def employee_as_of(conn, emp_id, when):
+    """The employee's recorded fields as they stood on `when` (a date or 'YYYY-MM-DD[ HH:MM:SS]')."""
+    employee = get_employee(conn, emp_id)
+    state = employee_history.employee_as_of(conn, employee['emp_id'], _as_moment(when))
+    if state is None:
+        raise NotFound(f"Employee {emp_id} has no record on {when}")
+    return state
+
+
+def department_as_of(conn, department, when):
+    """Everyone in `department` on `when`, with their fields as they were then."""
+    department = _text(department)
+    if not department:
+        raise ServiceError("department is required")
+    return employee_history.department_as_of(conn, department, _as_moment(when))
+
+
+# ---------------------------
+# LEAVES
+# ---------------------------
+
+def _booked_leaves(conn, emp_id, start, end, for_update=False):
+    """
+    (leave_id, emp_id, start_date, end_date, status) of booked leaves touching
+    [start, end]. for_update makes it a locking read on MySQL, which sees rows
+    committed after the transaction's snapshot was taken.
+    """
+    if not for_update or storage.dialect_of(conn) == "sqlite":
+        return statements.fetch_all(conn, "booked_leaves_between", (emp_id, end, start), dictionary=False)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(statements.STATEMENTS["booked_leaves_between"] + " FOR UPDATE", (emp_id, end, start))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def apply_leave(conn, emp_id, start_date, end_date, reason=""):
+    """
+    File a Pending leave request; rejects dates overlapping a booked leave.
+    The overlap check and the INSERT run in one transaction holding the
+    employee's lock, so two concurrent requests can't both pass the check.
+    """
+    start = _as_date(start_date, "start_date")
+    end = _as_date(end_date, "end_date")
+    if end < start:
+        raise ServiceError("end_date is before start_date")
+    emp_id = get_employee(conn, emp_id)['emp_id']
+
+    # The database, not the leave engine, decides overlaps: the engine only
+    # sees this process's bookings, and the check must happen under the lock.
+    try:
+        _lock_employee(conn, emp_id)
+        clashes = [row[0] for row in _booked_leaves(conn, emp_id, start, end, for_update=True)]
+        if clashes:
+            raise ServiceError("Overlaps existing leave request(s): " + ", ".join(map(str, clashes)))
+        leave_id = statements.execute(conn, "insert_leave", (emp_id, start, end, _text(reason))).lastrowid
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    engine = get_leave_engine()
+    if engine is not None:
+        engine.book(leave_id, emp_id, start, end)
+    return {'leave_id': leave_id, 'emp_id': emp_id, 'start_date': start, 'end_date': end, 'status': 'Pending'}
+
+
+def leave_balance(conn, emp_id, year=None):
+    """Allowance, working days booked (Pending + Approved) and remaining for one year."""
+    year = _as_int(year, "year") if year else date.today().year
+    emp_id = get_employee(conn, emp_id)['emp_id']
+    engine = get_leave_engine()
+    if engine is None:
+        engine = LeaveEngine()
+        for row in _booked_leaves(conn, emp_id, date(year, 1, 1), date(year, 12, 31)):
+            engine.book(*row)
+    return engine.balance(emp_id, year)
+
+
+def who_is_out_query(on_date, department=None, include_pending=False):
+    """(sql, params) of who_is_out's query when the leave engine is off."""
+    statuses = "'Pending', 'Approved'" if include_pending else "'Approved'"
+    query = f"""
+        SELECT l.leave_id, l.status, e.emp_id, e.first_name, e.last_name, e.department
+        FROM leaves l
+        JOIN employees e ON l.emp_id = e.emp_id
+        WHERE l.status IN ({statuses}) AND l.start_date <= %s AND l.end_date >= %s"""
+    values = [on_date, on_date]
+    if department:
+        query += " AND e.department = %s"
+        values.append(department)
+    return query + " ORDER BY e.emp_id, l.leave_id", tuple(values)
+
+
+def who_is_out(conn, on_date, department=None, include_pending=False):
+    """Team calendar: employees on leave on `on_date`, optionally within one department."""
+    on_date = _as_date(on_date, "on_date")
+    department = _text(department) or None
+    engine = get_leave_engine()
+    if engine is not None:
+        out = engine.out_on(on_date, department, include_pending)
+        employees = {emp['emp_id']: emp for emp in fetch_employees_by_ids(conn, sorted({o[0] for o in out}))}
+        return [{'leave_id': leave_id, 'status': status, 'emp_id': emp_id,
+                 'first_name': employees[emp_id]['first_name'], 'last_name': employees[emp_id]['last_name'],
+                 'department': employees[emp_id]['department']}
+                for emp_id, leave_id, status in out if emp_id in employees]
+
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(*who_is_out_query(on_date, department, include_pending))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+LEAVE_INDEXES = [
+    ("idx_leaves_status_id", "leaves (status, leave_id)"),
+    ("idx_leaves_emp_status", "leaves (emp_id, status, start_date)"),
+    ("idx_leaves_status_dates", "leaves (status, start_date, end_date)"),
+]
+
+LEAVE_BATCH_SIZE = 500     # leave_ids per UPDATE ... IN (...)
+
+SET_PENDING_LEAVE_STATUSES = "UPDATE leaves SET status=%s WHERE status='Pending' AND leave_id IN ({placeholders})"
+SET_PENDING_LEAVE_STATUS = "UPDATE leaves SET status=%s WHERE status='Pending' AND leave_id=%s"
+LEAVE_BY_ID = "SELECT leave_id, emp_id, start_date, end_date FROM leaves WHERE leave_id = %s"
+
+
+def create_leave_indexes(conn):
+    """Indexes behind the filtered, paged pending-leave queue (also part of migration 3)."""
+    from migrations import create_indexes       # migrations imports this module
+    return create_indexes(conn, LEAVE_INDEXES)
+
+
+def _pending_leave_filters(department=None, emp_id=None, date_from=None, date_to=None):
+    clauses, values = ["l.status = 'Pending'"], []
+    if department:
+        clauses.append("e.department = %s")
+        values.append(_text(department))
+    if emp_id not in (None, ""):
+        clauses.append("l.emp_id = %s")
+        values.append(_as_int(emp_id, "emp_id"))
+    # a leave matches the range if any of its days fall inside it
+    if date_from:
+        clauses.append("l.end_date >= %s")
+        values.append(_as_date(date_from, "date_from"))
+    if date_to:
+        clauses.append("l.start_date <= %s")
+        values.append(_as_date(date_to, "date_to"))
+    return clauses, values
+
+
+def pending_leaves_query(department=None, emp_id=None, date_from=None, date_to=None, after_leave_id=0, limit=None):
+    """(sql, params) of one list_pending_leaves call."""
+    clauses, values = _pending_leave_filters(department, emp_id, date_from, date_to)
+    clauses.append("l.leave_id > %s")
+    values.append(_as_int(after_leave_id or 0, "after_leave_id"))
+    query = """
+        SELECT l.leave_id, e.emp_id, e.first_name, e.last_name, e.department,
+               l.start_date, l.end_date, l.reason
+        FROM leaves l
+        JOIN employees e ON l.emp_id = e.emp_id
+        WHERE """ + " AND ".join(clauses) + """
+        ORDER BY l.leave_id"""
+    if limit:
+        query += " LIMIT %s"
+        values.append(_as_int(limit, "limit"))
+    return query, tuple(values)
+
+
+def list_pending_leaves(conn, department=None, emp_id=None, date_from=None, date_to=None,
+                        after_leave_id=0, limit=None):
+    """
+    Pending leave requests in leave_id order, optionally filtered by
+    department, employee and date range. With `limit`, returns one keyset
+    page starting after `after_leave_id`.
+    """
+    query = pending_leaves_query(department, emp_id, date_from, date_to, after_leave_id, limit)
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(*query)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def iter_pending_leave_pages(conn, page_size=DEFAULT_PAGE_SIZE, **filters):
+    """Yield the filtered pending queue one page at a time."""
+    def fetch(c, after, limit):
+        return list_pending_leaves(c, after_leave_id=after, limit=limit, **filters)
+    return iter_pages(conn, fetch, page_size, key='leave_id')
+
+
+def set_leave_statuses(conn, leave_ids, status, batch_size=LEAVE_BATCH_SIZE):
+    """
+    Approve or reject many pending leaves in one transaction, one
+    UPDATE ... WHERE leave_id IN (...) per batch. Leaves that are no longer
+    Pending are left alone and not counted.
+    """
+    if status not in ("Approved", "Rejected"):
+        raise ServiceError("status must be Approved or Rejected")
+    ids = sorted({_as_int(leave_id, "leave_id") for leave_id in leave_ids})
+    if not ids:
+        raise ServiceError("No leave IDs given")
+
+    updated = 0
+    cursor = conn.cursor()
+    try:
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            placeholders = ", ".join(["%s"] * len(batch))
+            cursor.execute(SET_PENDING_LEAVE_STATUSES.format(placeholders=placeholders), (status, *batch))
+            updated += cursor.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    engine = get_leave_engine()
+    if engine is not None:
+        for leave_id in ids:
+            engine.set_status(leave_id, status, only_pending=True)
+    return {'status': status, 'requested': len(ids), 'updated': updated}
+
+
+def pending_leave_ids(conn, page_size=LEAVE_BATCH_SIZE, **filters):
+    """Every pending leave_id matching the filters (for "approve all")."""
+    return [row['leave_id'] for page in iter_pending_leave_pages(conn, page_size, **filters) for row in page]
+
+
+def set_leave_status(conn, leave_id, status):
+    """Approve or reject one pending leave request; Conflict if it was already decided."""
+    if status not in ("Approved", "Rejected"):
+        raise ServiceError("status must be Approved or Rejected")
+    cursor = conn.cursor()
+    try:
+        cursor.execute(LEAVE_BY_ID, (leave_id,))
+        row = cursor.fetchone()
+        if not row:
+            raise NotFound(f"Leave {leave_id} not found")
+        cursor.execute(SET_PENDING_LEAVE_STATUS, (status, leave_id))
+        if cursor.rowcount == 0:
+            raise Conflict(f"Leave {leave_id} is no longer Pending")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    engine = get_leave_engine()
+    if engine is not None:
+        if status == "Approved":
+            engine.book(*row, status)
+        else:
+            engine.release(row[0])
+    return {'leave_id': leave_id, 'status': status}
+
+
+# ---------------------------
+# PAYROLL
+# ---------------------------
+
+def calculate_payroll(conn, emp_id, save=False, generated_on=None, rule_set=None):
+    """
+    Compute one employee's payroll with their department's rule set (or
+    `rule_set`); with save=True also store it.
+    """
+    emp = get_employee(conn, emp_id)
+    if emp.get('salary') is None:
+        raise ServiceError(f"Employee {emp_id} has no salary on record")
+    basic_salary = float(emp['salary'])
+    try:
+        rules = get_rule_set(rule_set or rule_set_for_department(emp.get('department')))
+    except RuleError as err:
+        raise ServiceError(f"Payroll rules: {err}")
+    hra, pf, insurance, net_salary = rules.evaluate(basic_salary)
+    result = {
+        'emp_id': emp['emp_id'], 'first_name': emp['first_name'], 'last_name': emp['last_name'],
+        'department': emp.get('department'), 'basic_salary': basic_salary, 'hra': hra, 'pf': pf, 'insurance': insurance,
+        'net_salary': net_salary, 'rule_set': rules.name, 'rule_set_version': rules.version,
+        'components': rules.components_for(basic_salary), 'saved': False,
+    }
+    if save:
+        save_payroll(conn, result, generated_on)
+    return result
+
+
+def save_payroll(conn, payroll, generated_on=None):
+    """Store a result of calculate_payroll and fold it into the monthly rollups."""
+    generated_on = generated_on or date.today()
+    department = payroll.get('department')
+    if department is None:
+        department = get_employee(conn, payroll['emp_id']).get('department')
+    cursor = conn.cursor()
+    try:
+        cursor.execute(INSERT_PAYROLL, (payroll['emp_id'], payroll['basic_salary'], payroll['hra'], payroll['pf'],
+                                        payroll['insurance'], payroll['net_salary'], generated_on))
+        record_payroll_rows(cursor, [(payroll['emp_id'], department, generated_on, payroll['basic_salary'],
+                                      payroll['hra'], payroll['pf'], payroll['insurance'], payroll['net_salary'])])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    payroll['saved'] = True
+    payroll['generated_on'] = generated_on
+    return payroll
+
+
+# ---------------------------
+# PERFORMANCE
+# ---------------------------
+
+def record_performance_review(conn, emp_id, rating, comments="", review_date=None):
+    """Store a 1-5 rating and keep the latest-review summary and rating counts in step."""
+    rating = _as_int(rating, "rating")
+    if not 1 <= rating <= 5:
+        raise ServiceError("rating must be between 1 and 5")
+    emp = get_employee(conn, emp_id)
+    emp_id = emp['emp_id']      # the stored integer id, not the caller's " 12" / "12"
+    review_date = (_as_date(review_date, "review_date") if review_date else date.today()).strftime("%Y-%m-%d")
+
+    cursor = conn.cursor()
+    try:
+        review_id = statements.execute(conn, "insert_review",
+                                       (emp_id, review_date, rating, _text(comments))).lastrowid
+        refresh_latest_review(cursor, emp_id, review_id, review_date, rating)
+        record_review(cursor, emp.get('department'), review_date, rating)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return {'review_id': review_id, 'emp_id': emp_id, 'review_date': review_date, 'rating': rating}
+
+
+def list_reviews(conn, emp_id):
+    emp_id = get_employee(conn, emp_id)['emp_id']
+    return statements.fetch_all(conn, "reviews_for_employee", (emp_id,))
+
+
+def employee_review_stats(conn, emp_id, window=3):
+    """Average, latest, rolling average and yearly trend of one employee's ratings."""
+    reviews = list_reviews(conn, emp_id)
+    return review_stats(reviews[::-1], _as_int(window, "window"))   # newest first -> oldest first
+
+
+# ---------------------------
+# RECRUITMENT
+# ---------------------------
+
+def add_job_opening(conn, title, salary_offered, work_hours=""):
+    salary_offered = _as_float(salary_offered, "salary_offered")
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            INSERT INTO job_openings (title, salary_offered, work_hours, status)
+            VALUES (%s, %s, %s, 'Open')
+        """, (_text(title), salary_offered, _text(work_hours)))
+        conn.commit()
+        job_id = cursor.lastrowid
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return {'job_id': job_id, 'title': _text(title), 'status': 'Open'}
+
+
+def _job_opening_filters(status=None, min_salary=None, max_salary=None, title_prefix=None):
+    clauses, values = [], []
+    if status:
+        clauses.append("status = %s")
+        values.append(_text(status))
+    if min_salary not in (None, ""):
+        clauses.append("salary_offered >= %s")
+        values.append(_as_float(min_salary, "min_salary"))
+    if max_salary not in (None, ""):
+        clauses.append("salary_offered <= %s")
+        values.append(_as_float(max_salary, "max_salary"))
+    if title_prefix:
+        clauses.append("title LIKE %s ESCAPE '!'")
+        values.append(escape_like(_text(title_prefix)) + "%")
+    return clauses, values
+
+
+def _job_opening_order(status=None, min_salary=None, max_salary=None, title_prefix=None):
+    """
+    Column a filtered listing is paged on ahead of job_id, so the filter's
+    own index (migration 7) both finds and orders the page; None pages on
+    job_id alone (unfiltered, or by status via idx_jobs_status_id).
+    """
+    if status:
+        return None
+    if title_prefix:
+        return "title"
+    if min_salary not in (None, "") or max_salary not in (None, ""):
+        return "salary_offered"
+    return None
+
+
+def job_openings_query(status=None, min_salary=None, max_salary=None, title_prefix=None, after_job_id=0, limit=None,
+                       after_value=None):
+    """
+    (sql, params) of one list_job_openings call. When the order has a leading
+    column (_job_opening_order), `after_value` is that column's value on the
+    `after_job_id` row.
+    """
+    clauses, values = _job_opening_filters(status, min_salary, max_salary, title_prefix)
+    order = _job_opening_order(status, min_salary, max_salary, title_prefix)
+    after_job_id = _as_int(after_job_id or 0, "after_job_id")
+    if order is None:
+        clauses.append("job_id > %s")
+        values.append(after_job_id)
+    elif after_job_id:
+        # (order, job_id) > (after_value, after_job_id), spelled out so MySQL can range-scan it
+        clauses.append(f"{order} >= %s AND ({order} > %s OR job_id > %s)")
+        values.extend((after_value, after_value, after_job_id))
+    query = ("SELECT job_id, title, salary_offered, work_hours, status FROM job_openings WHERE "
+             + " AND ".join(clauses) + " ORDER BY " + (f"{order}, job_id" if order else "job_id"))
+    if limit:
+        query += " LIMIT %s"
+        values.append(_as_int(limit, "limit"))
+    return query, tuple(values)
+
+
+def list_job_openings(conn, status=None, min_salary=None, max_salary=None, title_prefix=None,
+                      after_job_id=0, limit=None):
+    """
+    Job openings, optionally filtered by status, a salary range and a title
+    prefix. Filtered by title or salary (without status) they come in title /
+    salary order, otherwise in job_id order. With `limit`, returns one keyset
+    page starting after the opening `after_job_id`.
+    """
+    order = _job_opening_order(status, min_salary, max_salary, title_prefix)
+    after_job_id, after_value = _as_int(after_job_id or 0, "after_job_id"), None
+    if order and after_job_id:
+        after_value = get_job_opening(conn, after_job_id)[order]
+    query = job_openings_query(status, min_salary, max_salary, title_prefix, after_job_id, limit, after_value)
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(*query)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def iter_job_opening_pages(conn, page_size=DEFAULT_PAGE_SIZE, **filters):
+    """Yield the filtered job openings one page at a time."""
+    def fetch(c, after, limit):
+        return list_job_openings(c, after_job_id=after, limit=limit, **filters)
+    return iter_pages(conn, fetch, page_size, key='job_id')
+
+
+JOB_OPENING_BY_ID = "SELECT * FROM job_openings WHERE job_id=%s"
+
+
+def get_job_opening(conn, job_id):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(JOB_OPENING_BY_ID, (job_id,))
+        job = cursor.fetchone()
+    finally:
+        cursor.close()
+    if not job:
+        raise NotFound(f"Job opening {job_id} not found")
+    return job
+
+
+def update_job_opening(conn, job_id, salary_offered=None, work_hours=None, status=None):
+    """Change any of salary / hours / status; None means leave as is."""
+    updates, values = [], []
+    if salary_offered not in (None, ""):
+        updates.append("salary_offered = %s")
+        values.append(_as_float(salary_offered, "salary_offered"))
+    if work_hours:
+        updates.append("work_hours = %s")
+        values.append(_text(work_hours))
+    if status:
+        updates.append("status = %s")
+        values.append(_text(status))
+    if not updates:
+        raise ServiceError("No changes given")
+
+    get_job_opening(conn, job_id)
+    values.append(job_id)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("UPDATE job_openings SET " + ", ".join(updates) + " WHERE job_id=%s", tuple(values))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return get_job_opening(conn, job_id)
+
+
+# ---------------------------
+# CANDIDATES & APPLICATIONS
+# ---------------------------
+# A candidate applies to an opening once; the application then moves through
+# APPLICATION_STAGES along STAGE_TRANSITIONS. Every move is also appended to
+# application_stage_history in the same transaction, so the pipeline can be
+# audited and timed per stage.
+
+APPLICATION_STAGES = ("Applied", "Screening", "Interview", "Offer", "Hired", "Rejected", "Withdrawn")
+
+STAGE_TRANSITIONS = {
+    "Applied": ("Screening", "Rejected", "Withdrawn"),
+    "Screening": ("Interview", "Rejected", "Withdrawn"),
+    "Interview": ("Offer", "Rejected", "Withdrawn"),
+    "Offer": ("Hired", "Rejected", "Withdrawn"),
+    "Hired": (),
+    "Rejected": (),
+    "Withdrawn": (),
+}
+
+APPLICATION_BATCH_SIZE = 500   # application_ids per statement in bulk moves
+
+INSERT_STAGE_HISTORY = """
+    INSERT INTO application_stage_history (application_id, from_stage, to_stage, changed_at)
+    VALUES (%s, %s, %s, %s)
+"""
+
+CANDIDATE_BY_ID = "SELECT * FROM candidates WHERE candidate_id = %s"
+CANDIDATE_APPLICATIONS = """
+    SELECT a.application_id, a.job_id, j.title, a.stage, a.applied_at, a.stage_changed_at
+    FROM applications a
+    JOIN job_openings j ON j.job_id = a.job_id
+    WHERE a.candidate_id = %s
+    ORDER BY a.application_id DESC
+"""
+APPLICATION_FOR_JOB = "SELECT application_id FROM applications WHERE job_id = %s AND candidate_id = %s"
+PIPELINE_COUNTS = "SELECT stage, COUNT(*) FROM applications WHERE job_id = %s GROUP BY stage"
+APPLICATION_STAGES_BY_ID = "SELECT application_id, stage FROM applications WHERE application_id IN ({placeholders})"
+MOVE_APPLICATIONS = ("UPDATE applications SET stage = %s, stage_changed_at = %s "
+                     "WHERE stage = %s AND application_id IN ({placeholders})")
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def add_candidate(conn, first_name, last_name, email="", phone=""):
+    """Register a candidate; returns the new row's identifying fields."""
+    first_name, last_name = _text(first_name), _text(last_name)
+    if not (first_name or last_name):
+        raise ServiceError("Candidate name is required")
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            INSERT INTO candidates (first_name, last_name, email, phone, created_at)
+            VALUES (%s, %s, %s, %s, %s)
+        """, (first_name, last_name, _text(email), _text(phone), _now()))
+        conn.commit()
+        candidate_id = cursor.lastrowid
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return {'candidate_id': candidate_id, 'first_name': first_name, 'last_name': last_name}
+
+
+def get_candidate(conn, candidate_id):
+    """The candidate with every application they have made, newest first."""
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(CANDIDATE_BY_ID, (_as_int(candidate_id, "candidate_id"),))
+        candidate = cursor.fetchone()
+        if not candidate:
+            raise NotFound(f"Candidate {candidate_id} not found")
+        cursor.execute(CANDIDATE_APPLICATIONS, (candidate['candidate_id'],))
+        candidate['applications'] = cursor.fetchall()
+    finally:
+        cursor.close()
+    return candidate
+
+
+def apply_for_job(conn, candidate_id, job_id):
+    """Open an application (stage Applied) for a candidate on an Open job opening."""
+    candidate_id = _as_int(candidate_id, "candidate_id")
+    job = get_job_opening(conn, _as_int(job_id, "job_id"))
+    if job['status'] != 'Open':
+        raise ServiceError(f"Job opening {job['job_id']} is {job['status']}, not Open")
+    now = _now()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT candidate_id FROM candidates WHERE candidate_id = %s", (candidate_id,))
+        if cursor.fetchone() is None:
+            raise NotFound(f"Candidate {candidate_id} not found")
+        cursor.execute(APPLICATION_FOR_JOB, (job['job_id'], candidate_id))
+        existing = cursor.fetchone()
+        if existing:
+            raise ServiceError(f"Candidate {candidate_id} already applied (application {existing[0]})")
+        cursor.execute("""
+            INSERT INTO applications (job_id, candidate_id, stage, applied_at, stage_changed_at)
+            VALUES (%s, %s, 'Applied', %s, %s)
+        """, (job['job_id'], candidate_id, now, now))
+        application_id = cursor.lastrowid
+        cursor.execute(INSERT_STAGE_HISTORY, (application_id, None, "Applied", now))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return {'application_id': application_id, 'job_id': job['job_id'], 'candidate_id': candidate_id,
+            'stage': 'Applied'}
+
+
+def applications_query(job_id, stage=None, after_application_id=0, limit=None):
+    """(sql, params) of one list_applications call."""
+    clauses, values = ["a.job_id = %s"], [_as_int(job_id, "job_id")]
+    if stage:
+        if stage not in STAGE_TRANSITIONS:
+            raise ServiceError(f"stage must be one of {', '.join(APPLICATION_STAGES)}")
+        clauses.append("a.stage = %s")
+        values.append(stage)
+    clauses.append("a.application_id > %s")
+    values.append(_as_int(after_application_id or 0, "after_application_id"))
+    query = """
+        SELECT a.application_id, a.candidate_id, c.first_name, c.last_name, c.email,
+               a.stage, a.applied_at, a.stage_changed_at
+        FROM applications a
+        JOIN candidates c ON c.candidate_id = a.candidate_id
+        WHERE """ + " AND ".join(clauses) + """
+        ORDER BY a.application_id"""
+    if limit:
+        query += " LIMIT %s"
+        values.append(_as_int(limit, "limit"))
+    return query, tuple(values)
+
+
+def list_applications(conn, job_id, stage=None, after_application_id=0, limit=None):
+    """A job opening's applicants in application_id order, optionally one stage, keyset-paged."""
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(*applications_query(job_id, stage, after_application_id, limit))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def iter_application_pages(conn, job_id, page_size=DEFAULT_PAGE_SIZE, stage=None):
+    """Yield a job opening's applicants one page at a time."""
+    def fetch(c, after, limit):
+        return list_applications(c, job_id, stage, after_application_id=after, limit=limit)
+    return iter_pages(conn, fetch, page_size, key='application_id')
+
+
+def pipeline_counts(conn, job_id):
+    """{stage: applications} for one job opening, every stage present."""
+    job = get_job_opening(conn, _as_int(job_id, "job_id"))
+    counts = dict.fromkeys(APPLICATION_STAGES, 0)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(PIPELINE_COUNTS, (job['job_id'],))
+        for stage, n in cursor.fetchall():
+            counts[stage] = n
+    finally:
+        cursor.close()
+    return counts
+
+
+def application_ids_in_stage(conn, job_id, stage, page_size=APPLICATION_BATCH_SIZE):
+    """Every application_id of a job opening in one stage (for "move all")."""
+    return [row['application_id'] for page in iter_application_pages(conn, job_id, page_size, stage)
+            for row in page]
+
+
+def move_applications(conn, application_ids, stage, batch_size=APPLICATION_BATCH_SIZE):
+    """
+    Move many applications to `stage` in one transaction. Applications whose
+    current stage can't move there (see STAGE_TRANSITIONS) are skipped and
+    returned; the rest are updated with one
+    UPDATE ... WHERE stage = <from> AND application_id IN (...) per batch and
+    source stage, and logged to application_stage_history. If another writer
+    moved any of them in the meantime, nothing is changed and ServiceError is
+    raised so the caller can retry.
+    """
+    if stage not in STAGE_TRANSITIONS:
+        raise ServiceError(f"stage must be one of {', '.join(APPLICATION_STAGES)}")
+    ids = sorted({_as_int(application_id, "application_id") for application_id in application_ids})
+    if not ids:
+        raise ServiceError("No application IDs given")
+
+    now = _now()
+    moved, skipped = 0, []
+    cursor = conn.cursor()
+    try:
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            placeholders = ", ".join(["%s"] * len(batch))
+            cursor.execute(APPLICATION_STAGES_BY_ID.format(placeholders=placeholders), tuple(batch))
+            by_stage = {}
+            found = set()
+            for application_id, current in cursor.fetchall():
+                found.add(application_id)
+                if stage in STAGE_TRANSITIONS.get(current, ()):
+                    by_stage.setdefault(current, []).append(application_id)
+                else:
+                    skipped.append({'application_id': application_id, 'stage': current})
+            skipped.extend({'application_id': application_id, 'stage': None}
+                           for application_id in batch if application_id not in found)
+
+            for current, group in by_stage.items():
+                placeholders = ", ".join(["%s"] * len(group))
+                cursor.execute(MOVE_APPLICATIONS.format(placeholders=placeholders), (stage, now, current, *group))
+                if cursor.rowcount != len(group):
+                    raise ServiceError("Some applications changed stage while moving them; try again")
+                cursor.executemany(INSERT_STAGE_HISTORY,
+                                   [(application_id, current, stage, now) for application_id in group])
+                moved += len(group)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return {'stage': stage, 'requested': len(ids), 'moved': moved, 'skipped': skipped}
@@ -0,0 +1,145 @@
+import threading
+
+# ---------------------------
+# PREPARED STATEMENT REGISTRY
+# ---------------------------
+# The hot statements are declared once here and executed through server-side
+# prepared statements (cursor(prepared=True)). Each pooled connection keeps one
+# prepared cursor per statement, so MySQL parses and plans a statement once per
+# connection and every later call only ships the parameters.
+#
+#   row = fetch_one(conn, "employee_by_id", (emp_id,))
+#   leave_id = execute(conn, "insert_leave", (...)).lastrowid
+#
+# Prepared cursors return tuples; fetch_one / fetch_all build dicts from the
+# column names. Reads always drain their result set so the connection is free
+# for the next statement.
+
+STATEMENTS = {
+    "employee_by_id": "SELECT * FROM employees WHERE emp_id = %s",
+    "emp_id_for_user": "SELECT emp_id FROM employees WHERE user_id = %s",
+    "user_by_username": "SELECT id, username, role, password_hash FROM users WHERE username = %s",
+    "reviews_for_employee": """
+        SELECT review_date, rating, comments
+        FROM performance_reviews
+        WHERE emp_id = %s
+        ORDER BY review_date DESC, review_id DESC
+    """,
+    "booked_leaves_between": """
+        SELECT leave_id, emp_id, start_date, end_date, status
+        FROM leaves
+        WHERE emp_id = %s AND status IN ('Pending', 'Approved')
+          AND start_date <= %s AND end_date >= %s
+        ORDER BY start_date
+    """,
+    "insert_leave": """
+        INSERT INTO leaves (emp_id, start_date, end_date, reason, status)
+        VALUES (%s, %s, %s, %s, 'Pending')
+    """,
+    "insert_review": """
+        INSERT INTO performance_reviews (emp_id, review_date, rating, comments)
+        VALUES (%s, %s, %s, %s)
+    """,
+}
+
+# Each physical connection's prepared cursors live in a PreparedCursors dict.
+# For a pooled connection it sits in the pool's per-connection state, and the
+# pool closes it when it closes, recycles or discards that connection. A
+# connection used without the pool carries it as an attribute, so it is
+# collected together with the connection.
+_prepared_lock = threading.Lock()
+
+counters = {'prepared': 0, 'reused': 0}
+
+
+class PreparedCursors(dict):
+    """{statement name: prepared cursor} of one physical connection."""
+
+    def close(self):
+        for cursor in self.values():
+            try:
+                cursor.close()
+            except Exception:
+                pass
+        self.clear()
+
+
+def _physical(conn):
+    # a PooledConnection proxy changes per checkout; the connection under it doesn't
+    return getattr(conn, "raw", conn)
+
+
+def _cursors(conn):
+    """The PreparedCursors of the physical connection behind `conn`."""
+    try:
+        state = conn.connection_state       # PooledConnection
+    except AttributeError:
+        state = None
+    with _prepared_lock:
+        if state is not None:
+            return state.setdefault("prepared_cursors", PreparedCursors())
+        cursors = getattr(conn, "_prepared_cursors", None)
+        if cursors is None:
+            cursors = conn._prepared_cursors = PreparedCursors()
+        return cursors
+
+
+def prepared_cursor(conn, name):
+    """The cached prepared cursor for statement `name` on this connection."""
+    if name not in STATEMENTS:
+        raise KeyError(f"Unknown statement {name!r}")
+    cursors = _cursors(conn)
+    cursor = cursors.get(name)
+    if cursor is not None:
+        with _prepared_lock:
+            counters['reused'] += 1
+        return cursor
+    cursor = cursors[name] = _physical(conn).cursor(prepared=True)
+    with _prepared_lock:
+        counters['prepared'] += 1
+    return cursor
+
+
+def forget(conn, name=None):
+    """Drop cached cursors (one statement, or all) for a connection."""
+    cursors = _cursors(conn)
+    if name is None:
+        cursors.close()
+        return
+    cursor = cursors.pop(name, None)
+    if cursor is not None:
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+
+def execute(conn, name, params=()):
+    """Run a registered statement; returns the cursor (rowcount / lastrowid / rows)."""
+    cursor = prepared_cursor(conn, name)
+    try:
+        cursor.execute(STATEMENTS[name], params)
+    except Exception:
+        # the server may have dropped the statement (e.g. after a reconnect)
+        forget(conn, name)
+        raise
+    return cursor
+
+
+def _columns(cursor):
+    return [col[0] for col in cursor.description]
+
+
+def fetch_all(conn, name, params=(), dictionary=True):
+    cursor = execute(conn, name, params)
+    rows = cursor.fetchall()
+    if dictionary:
+        columns = _columns(cursor)
+        return [dict(zip(columns, row)) for row in rows]
+    return rows
+
+
+def fetch_one(conn, name, params=(), dictionary=True):
+    """First row (dict or tuple) or None; the rest of the result is drained."""
+    rows = fetch_all(conn, name, params, dictionary)
+    return rows[0] if rows else None
@@ -0,0 +1,172 @@
+"""
+Storage backends: the MySQL server, or an embedded SQLite file.
+
+    HRMS_DB_BACKEND=sqlite HRMS_SQLITE_PATH=hrms.db python main.py
+    python storage.py bootstrap        # apply pending migrations on the configured backend
+"""
+import os
+import sqlite3
+import sys
+
+from db_pool import SQLiteConnection
+
+mysql = None        # mysql.connector, imported by load_driver() on first connect
+
+# ---------------------------
+# STORAGE BACKENDS
+# ---------------------------
+# A backend knows how to open a raw DB-API connection (the pool wraps it),
+# how to create the schema, and which exceptions mean "the database said no".
+# Code that talks to the database catches DB_ERRORS rather than a driver's
+# exception class, so it runs unchanged on either backend.
+#
+# The MySQL driver is a large import, so it is loaded by the first connect
+# rather than at startup, and DB_ERRORS gains its Error class then. Refer to
+# it as storage.DB_ERRORS (looked up when an exception is being matched), not
+# `from storage import DB_ERRORS`, which would keep the pre-driver tuple. A
+# missing driver is reported as DriverMissing, itself one of DB_ERRORS, so
+# callers print "cannot connect" instead of crashing with a traceback.
+
+
+class DriverMissing(Exception):
+    """The configured backend's driver is not installed (one of DB_ERRORS)."""
+
+
+DB_ERRORS = (sqlite3.Error, DriverMissing)
+
+
+# The driver error numbers callers tell apart
+MYSQL_DUPLICATE_ENTRY = 1062        # ER_DUP_ENTRY
+MYSQL_DUPLICATE_KEY_NAME = 1061     # ER_DUP_KEYNAME
+SQLITE_DUPLICATE_CODES = (sqlite3.SQLITE_CONSTRAINT_PRIMARYKEY, sqlite3.SQLITE_CONSTRAINT_UNIQUE)
+
+
+def is_duplicate_key(err):
+    """True if `err` (one of DB_ERRORS) is a primary key / unique key violation."""
+    if isinstance(err, sqlite3.IntegrityError):
+        return getattr(err, "sqlite_errorcode", None) in SQLITE_DUPLICATE_CODES
+    return getattr(err, "errno", None) == MYSQL_DUPLICATE_ENTRY
+
+
+def dialect_of(conn):
+    """'sqlite' for a db_pool SQLite connection or cursor (through any wrapper), else 'mysql'."""
+    return getattr(conn, "dialect", "mysql")
+
+
+def load_driver():
+    """Import mysql.connector (once) and add its Error class to DB_ERRORS."""
+    global mysql, DB_ERRORS
+    if mysql is None:
+        try:
+            import mysql.connector
+        except ImportError:  # SQLite-only installs
+            raise DriverMissing("mysql-connector-python is not installed; set HRMS_DB_BACKEND=sqlite")
+        DB_ERRORS = (sqlite3.Error, DriverMissing, mysql.connector.Error)
+    return mysql.connector
+
+# Applied to every SQLite connection. WAL lets readers run alongside the one
+# writer; synchronous=NORMAL is durable across application crashes in WAL
+# mode and only risks the last transactions on power loss.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,          # ms to wait for a competing writer
+    "cache_size": -32000,          # KiB of page cache per connection
+    "temp_store": "MEMORY",
+    "mmap_size": 268435456,
+}
+
+
+def _migrate(conn, dialect):
+    # migrations pulls in every module that owns a table; only load it when
+    # a schema is actually being brought up to date
+    from migrations import migrate
+    return migrate(conn, dialect)
+
+
+def create_sqlite_schema(conn):
+    """Bring a SQLiteConnection's schema up to the latest migration."""
+    _migrate(conn, "sqlite")
+
+
+class MySQLBackend:
+    """The MySQL server in `config` (mysql.connector.connect keyword arguments)."""
+
+    name = "mysql"
+    auto_bootstrap = False      # run `python migrations.py migrate` when deploying
+
+    def __init__(self, config):
+        self.config = config
+
+    def connect(self):
+        return load_driver().connect(**self.config)
+
+    # side connection that sends KILL QUERY for async_db timeouts
+    kill_connect = connect
+
+    def bootstrap(self, conn):
+        _migrate(conn, self.name)
+
+    def describe(self):
+        return f"MySQL {self.config.get('user')}@{self.config.get('host')}/{self.config.get('database')}"
+
+
+class SQLiteBackend:
+    """An embedded SQLite database file, tuned for a single-host deployment."""
+
+    name = "sqlite"
+    auto_bootstrap = True
+    kill_connect = None         # SQLite connections are interrupted in-process
+
+    def __init__(self, path="hrms.db", pragmas=None, timeout=30.0):
+        self.path = path
+        self.pragmas = dict(SQLITE_PRAGMAS, **(pragmas or {}))
+        self.timeout = timeout
+
+    def connect(self):
+        conn = SQLiteConnection(self.path, timeout=self.timeout)
+        for name, value in self.pragmas.items():
+            conn._conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def bootstrap(self, conn):
+        _migrate(conn, self.name)
+
+    def describe(self):
+        return f"SQLite {os.path.abspath(self.path)}"
+
+
+def backend_from_env(mysql_config, environ=None):
+    """HRMS_DB_BACKEND=sqlite (file in HRMS_SQLITE_PATH) or mysql (default, `mysql_config`)."""
+    environ = os.environ if environ is None else environ
+    kind = environ.get("HRMS_DB_BACKEND", "mysql").strip().lower()
+    if kind == "sqlite":
+        return SQLiteBackend(environ.get("HRMS_SQLITE_PATH", "hrms.db"))
+    if kind == "mysql":
+        return MySQLBackend(mysql_config)
+    raise ValueError(f"Unknown HRMS_DB_BACKEND {kind!r} (expected 'mysql' or 'sqlite')")
+
+
+def bootstrap(backend):
+    """Open one connection, apply any pending migrations and close it."""
+    conn = backend.connect()
+    try:
+        backend.bootstrap(conn)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["bootstrap"]:
+        print("Usage: python storage.py bootstrap")
+        sys.exit(2)
+    # run as a script this module is __main__; the backends (and load_driver's
+    # additions to DB_ERRORS) live on the imported `storage` module
+    import storage
+    from main import BACKEND
+    try:
+        storage.bootstrap(BACKEND)
+    except storage.DB_ERRORS as err:
+        print(f"Bootstrap failed: {err}")
+        sys.exit(1)
+    print(f"Schema ready on {BACKEND.describe()}.")
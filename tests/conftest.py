@@ -0,0 +1,48 @@
+import os
+import sys
+
+import pytest
+
+# Make the project modules importable when running `python -m pytest` from anywhere
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import employee_cache  # noqa: E402
+from db_pool import SQLiteConnection  # noqa: E402
+from directory_snapshot import disable_directory_snapshot  # noqa: E402
+from employee_search import disable_trigram_index  # noqa: E402
+from leave_engine import disable_leave_engine  # noqa: E402
+from passwords import forget_logins  # noqa: E402
+from storage import create_sqlite_schema  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """An on-disk SQLite database at the latest schema version."""
+    path = str(tmp_path / "hrms.db")
+    conn = SQLiteConnection(path)
+    try:
+        create_sqlite_schema(conn)
+    finally:
+        conn.close()
+    return path
+
+
+@pytest.fixture
+def conn(db_path):
+    connection = SQLiteConnection(db_path)
+    yield connection
+    connection.close()
+
+
+@pytest.fixture(autouse=True)
+def process_state():
+    """Process-wide caches and indexes must not carry rows from one test database to the next."""
+    yield
+    employee_cache.employee_rows.clear()
+    employee_cache.user_employee_ids.clear()
+    disable_trigram_index()
+    disable_leave_engine()
+    disable_directory_snapshot()
+    forget_logins()
@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import pytest
+
+import services
+from api_server import APIServer
+from async_db import AsyncPool
+from db_pool import ConnectionPool, sqlite_connect
+
+
+@pytest.fixture
+def api(db_path):
+    server = APIServer(AsyncPool(ConnectionPool(sqlite_connect(db_path), max_size=2), query_timeout=5.0))
+    yield server
+    server.close()
+
+
+def call(api, method, target, body=None):
+    data = json.dumps(body).encode() if isinstance(body, dict) else (body or b"")
+    return asyncio.run(api.respond(method, target, {}, data))
+
+
+def test_created_employee_can_be_read_back(api):
+    status, emp = call(api, "POST", "/employees", {"first_name": "Ann", "last_name": "Lee", "salary": 5000})
+    assert status == 201
+    status, page = call(api, "GET", "/employees?limit=10")
+    assert status == 200 and [row["emp_id"] for row in page["employees"]] == [emp["emp_id"]]
+
+
+@pytest.mark.parametrize("target", ["/employees?limit=ten", "/employees?after=1.5", "/employees?after=-1",
+                                    "/leaves/pending?limit=x", "/reviews/trend?months=a",
+                                    "/job-openings?after=z", "/employees/1/reviews?window=w"])
+def test_malformed_query_parameters_are_bad_requests(api, target):
+    if "/employees/1/" in target:
+        call(api, "POST", "/employees", {"first_name": "Ann", "last_name": "Lee", "salary": 5000})
+    status, payload = call(api, "GET", target)
+    assert status == 400 and "must" in payload["error"]
+
+
+def test_client_errors_map_to_their_status(api):
+    assert call(api, "GET", "/employees/999")[0] == 404
+    assert call(api, "POST", "/employees", {"first_name": "Ann", "salary": "lots"})[0] == 400
+    assert call(api, "POST", "/employees", b"{not json")[0] == 400
+    assert call(api, "GET", "/nowhere")[0] == 404
+    assert call(api, "DELETE", "/employees")[0] == 405
+
+
+@pytest.mark.parametrize("method, target, body", [
+    ("POST", "/employees", {"first_name": "Ann"}),
+    ("POST", "/leaves", {"emp_id": 1, "start_date": "2026-01-05"}),
+    ("PATCH", "/employees/1", {"conn": None}),
+    ("POST", "/leaves/status", {"leave_ids": 7, "status": "Approved"}),
+])
+def test_malformed_bodies_are_bad_requests(api, method, target, body):
+    call(api, "POST", "/employees", {"first_name": "Ann", "last_name": "Lee", "salary": 5000})
+    assert call(api, method, target, body)[0] == 400
+
+
+def test_deciding_a_leave_twice_is_a_conflict(api):
+    emp = call(api, "POST", "/employees", {"first_name": "Ann", "last_name": "Lee", "salary": 5000})[1]
+    leave = call(api, "POST", "/leaves", {"emp_id": emp["emp_id"], "start_date": "2026-01-05",
+                                          "end_date": "2026-01-06"})[1]
+    target = f"/leaves/{leave['leave_id']}/status"
+    assert call(api, "POST", target, {"status": "Approved"})[0] == 200
+    assert call(api, "POST", target, {"status": "Rejected"})[0] == 409
+
+
+def test_type_errors_in_handlers_are_500s(api, monkeypatch, capsys):
+    def broken(conn, emp_id):
+        raise TypeError("internal detail")
+    monkeypatch.setattr(services, "get_employee", broken)
+    status, payload = call(api, "GET", "/employees/1")
+    assert status == 500 and payload == {"error": "Internal server error"}
+    assert "internal detail" in capsys.readouterr().err
+
+
+def test_database_failures_are_a_generic_500(api, db_path, capsys):
+    with api.db.pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DROP TABLE job_openings")
+        conn.commit()
+        cursor.close()
+    status, payload = call(api, "GET", "/job-openings")
+    assert status == 500 and payload == {"error": "Internal server error"}
+    assert "no such table" in capsys.readouterr().err
+
+
+def test_payroll_rule_errors_are_service_errors(conn):
+    emp = services.add_employee(conn, "Ann", "Lee", department="Ops", salary=5000)
+    with pytest.raises(services.ServiceError, match="Unknown payroll rule set"):
+        services.calculate_payroll(conn, emp["emp_id"], rule_set="no-such-rules")
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+import services
+from async_db import AsyncPool, QueryTimeout
+from db_pool import ConnectionPool, sqlite_connect
+
+# counts to a billion: runs until it is interrupted
+ENDLESS = ("WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 1000000000) "
+           "SELECT COUNT(*) FROM n")
+
+
+@pytest.fixture
+def apool(db_path):
+    pool = AsyncPool(ConnectionPool(sqlite_connect(db_path), max_size=2), query_timeout=5)
+    yield pool
+    pool.close()
+
+
+def test_hr_operations_run_on_pooled_connections(apool):
+    async def scenario():
+        added = await apool.run(services.add_employee, "Ada", "Lovelace", salary=1000)
+        return await asyncio.gather(*(apool.run(services.get_employee, added['emp_id']) for _ in range(4)))
+
+    assert [row['first_name'] for row in asyncio.run(scenario())] == ["Ada"] * 4
+    assert apool.stats()["created"] <= 2
+
+
+def test_timed_out_statement_is_interrupted_and_discarded(apool):
+    async def scenario():
+        async with apool.connection() as conn:
+            with pytest.raises(QueryTimeout):
+                await conn.execute(ENDLESS, timeout=0.2)
+            # the connection is unusable from here on
+            with pytest.raises(QueryTimeout):
+                await conn.execute("SELECT 1")
+        # ...and a fresh one takes its place
+        async with apool.connection() as conn:
+            return await conn.execute("SELECT 1 AS one")
+
+    assert asyncio.run(scenario()) == [{"one": 1}]
+    stats = apool.stats()
+    assert stats["created"] == 2 and stats["failed_health_checks"] == 1 and stats["in_use"] == 0
+
+
+def test_cancelled_task_interrupts_its_statement(apool):
+    async def scenario():
+        task = asyncio.create_task(apool.run(lambda conn: conn.cursor().execute(ENDLESS)))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        async with apool.connection() as conn:
+            return await conn.execute("SELECT 1 AS one")
+
+    assert asyncio.run(asyncio.wait_for(scenario(), 10)) == [{"one": 1}]
+    assert apool.stats()["failed_health_checks"] == 1
+
+
+def test_cursor_streams_rows(apool):
+    async def scenario():
+        async with apool.connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute("WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 1200) "
+                                 "SELECT x FROM n")
+            rows = [row async for row in cursor]
+            await cursor.close()
+            return rows
+
+    assert [x for (x,) in asyncio.run(scenario())] == list(range(1, 1201))
@@ -0,0 +1,54 @@
+import json
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+
+BENCH_DIR = os.path.join(ROOT, "benchmarks")
+TINY = ["--employees", "60", "--jobs", "5", "--candidates", "1000", "--payroll-months", "2", "--iterations", "3"]
+
+
+def bench(*args):
+    return subprocess.run([sys.executable, os.path.join(BENCH_DIR, "bench_suite.py"), *TINY, *args], cwd=ROOT,
+                          capture_output=True, text=True, check=True).stdout
+
+
+def bench_suite():
+    sys.path.insert(0, BENCH_DIR)
+    try:
+        import bench_suite
+    finally:
+        sys.path.remove(BENCH_DIR)
+    return bench_suite
+
+
+def load(path):
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def test_every_scenario_runs_and_compares(tmp_path):
+    scenarios = bench_suite().SCENARIOS
+    first, second = str(tmp_path / "first.json"), str(tmp_path / "second.json")
+    bench("--json", first)
+    results = load(first)["results"]
+    assert set(results) == set(scenarios)
+    assert all(r["queries"] > 0 and r["p50_ms"] <= r["max_ms"] for r in results.values())
+
+    out = bench("--only", "employee_lookup", "leave_", "--json", second, "--compare", first)
+    assert "Against" in out and "different parameters" not in out
+    assert set(load(second)["results"]) == {name for name in scenarios
+                                            if name.startswith(("employee_lookup", "leave_"))}
+
+
+def test_bulk_move_is_skipped_without_enough_applicants():
+    out = bench("--only", "job_", "--candidates", "40")
+    assert "job_move_bulk skipped" in out and "job_apply" in out
+
+
+def test_nearest_rank_percentile():
+    percentile = bench_suite().percentile
+    values = list(range(1, 101))
+    assert [percentile(values, p) for p in (50, 90, 99)] == [50, 90, 99]
+    assert percentile([7], 99) == 7
@@ -0,0 +1,147 @@
+import threading
+import time
+
+import pytest
+
+from db_pool import ConnectionPool, PoolClosed, PoolTimeout, SQLiteConnection, sqlite_connect
+
+
+def make_pool(db_path, **kwargs):
+    kwargs.setdefault("max_size", 2)
+    kwargs.setdefault("timeout", 0.2)
+    return ConnectionPool(sqlite_connect(db_path), **kwargs)
+
+
+def test_connections_are_reused(db_path):
+    pool = make_pool(db_path)
+    first = pool.acquire()
+    raw = first.raw
+    first.close()
+    second = pool.acquire()
+    assert second.raw is raw
+    second.close()
+    stats = pool.stats()
+    assert stats["created"] == 1 and stats["checkouts"] == 2 and stats["idle"] == 1
+
+
+def test_acquire_times_out_when_every_connection_is_checked_out(db_path):
+    pool = make_pool(db_path, max_size=1, timeout=0.05)
+    held = pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    held.close()
+    pool.acquire().close()
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_waiting_checkout_gets_the_released_connection(db_path):
+    pool = make_pool(db_path, max_size=1, timeout=2.0)
+    held = pool.acquire()
+    threading.Timer(0.05, held.close).start()
+    conn = pool.acquire()
+    assert pool.stats()["waits"] == 1
+    conn.close()
+
+
+def test_release_rolls_back_an_open_transaction(db_path):
+    pool = make_pool(db_path, max_size=1)
+    conn = pool.acquire()
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO job_openings (title, salary_offered, status) VALUES (%s, %s, 'Open')",
+                   ("Uncommitted", 1.0))
+    cursor.close()
+    conn.close()
+
+    conn = pool.acquire()
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM job_openings")
+    assert cursor.fetchone()[0] == 0
+    cursor.close()
+    conn.close()
+
+
+def test_returned_proxy_cannot_be_used(db_path):
+    pool = make_pool(db_path)
+    conn = pool.acquire()
+    conn.close()
+    conn.close()        # a second close is a no-op
+    with pytest.raises(PoolClosed):
+        conn.cursor()
+
+
+def test_old_connections_are_recycled(db_path):
+    pool = make_pool(db_path, max_lifetime=0.01)
+    conn = pool.acquire()
+    raw = conn.raw
+    time.sleep(0.02)
+    conn.close()
+    conn = pool.acquire()
+    assert conn.raw is not raw
+    conn.close()
+    assert pool.stats()["recycled"] == 1
+
+
+def test_unhealthy_idle_connections_are_replaced(db_path):
+    pool = make_pool(db_path)
+    conn = pool.acquire()
+    raw = conn.raw
+    conn.close()
+    raw.close()          # SQLiteConnection.is_connected() is now False
+    conn = pool.acquire()
+    assert conn.raw is not raw and conn.is_connected()
+    conn.close()
+    assert pool.stats()["failed_health_checks"] == 1
+
+
+def test_discarded_connection_frees_its_slot(db_path):
+    pool = make_pool(db_path, max_size=1)
+    conn = pool.acquire()
+    conn.discard()
+    conn = pool.acquire()
+    conn.close()
+    assert pool.stats()["open"] == 1
+
+
+def test_closed_pool_refuses_checkouts_and_closes_returns(db_path):
+    pool = make_pool(db_path)
+    conn = pool.acquire()
+    raw = conn.raw
+    pool.close()
+    with pytest.raises(PoolClosed):
+        pool.acquire()
+    conn.close()
+    assert not raw.is_connected()
+    assert pool.stats()["open"] == 0
+
+
+def test_concurrent_checkouts_never_exceed_max_size(db_path):
+    opened = []
+
+    def connect():
+        conn = SQLiteConnection(db_path, check_same_thread=False)
+        opened.append(conn)
+        return conn
+
+    pool = ConnectionPool(connect, max_size=3, timeout=5.0)
+    peak, in_use, lock = [0], [0], threading.Lock()
+
+    def worker():
+        for _ in range(20):
+            with pool.connection() as conn:
+                with lock:
+                    in_use[0] += 1
+                    peak[0] = max(peak[0], in_use[0])
+                cursor = conn.cursor()
+                cursor.execute("SELECT COUNT(*) FROM employees")
+                cursor.fetchall()
+                cursor.close()
+                with lock:
+                    in_use[0] -= 1
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] <= 3 and len(opened) <= 3
+    assert pool.stats()["checkouts"] == 160
@@ -0,0 +1,38 @@
+import services
+from directory_snapshot import build, db_mark, enable_directory_snapshot, fresh_directory_snapshot
+from import_employees import import_employees
+
+
+def salary_in_snapshot(conn, emp_id):
+    return fresh_directory_snapshot(conn).get(emp_id)['salary']
+
+
+def test_writes_from_elsewhere_are_picked_up_by_a_rebuild(conn, tmp_path):
+    path = str(tmp_path / "directory.snap")
+    emp_id = services.add_employee(conn, "Ada", "Lovelace", salary=1000)['emp_id']
+    build(conn, path)
+    # another process, without the snapshot, changes the salary and adds someone
+    services.update_employee(conn, emp_id, salary=1200)
+    new_id = services.add_employee(conn, "Alan", "Turing", salary=900)['emp_id']
+
+    snapshot = enable_directory_snapshot(conn, path)
+    assert snapshot.mark() != db_mark(conn)
+    assert salary_in_snapshot(conn, emp_id) == 1200
+    assert salary_in_snapshot(conn, new_id) == 900
+    assert snapshot.mark() == db_mark(conn)
+
+
+def test_own_writes_keep_the_stamp_current(conn, tmp_path):
+    snapshot = enable_directory_snapshot(conn, str(tmp_path / "directory.snap"))
+    emp_id = services.add_employee(conn, "Ada", "Lovelace", salary=1000)['emp_id']
+    services.update_employee(conn, emp_id, salary=1100)
+    assert snapshot.mark() == db_mark(conn)
+    assert snapshot.get(emp_id)['salary'] == 1100
+
+
+def test_import_refreshes_the_snapshot(conn, tmp_path):
+    snapshot = enable_directory_snapshot(conn, str(tmp_path / "directory.snap"))
+    records = [(1, {"first_name": "Grace", "last_name": "Hopper", "salary": "1500"})]
+    assert import_employees(conn, records)["loaded"] == 1
+    assert snapshot.mark() == db_mark(conn)
+    assert [row['first_name'] for row in snapshot.page()] == ["Grace"]
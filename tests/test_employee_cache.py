@@ -0,0 +1,63 @@
+import employee_cache
+import services
+from employee_cache import LRUCache, get_emp_id_for_user, invalidate_employee
+
+
+def link_user(conn, emp_id, user_id):
+    cursor = conn.cursor()
+    cursor.execute("UPDATE employees SET user_id = %s WHERE emp_id = %s", (user_id, emp_id))
+    conn.commit()
+    cursor.close()
+
+
+def test_update_invalidates_the_cached_row(conn):
+    emp_id = services.add_employee(conn, "Ada", "Lovelace", salary=1000)['emp_id']
+    hits = employee_cache.employee_rows.stats()['hits']
+    assert services.get_employee(conn, emp_id)['salary'] == 1000
+    assert services.get_employee(conn, emp_id)['salary'] == 1000
+    assert employee_cache.employee_rows.stats()['hits'] == hits + 1
+
+    services.update_employee(conn, emp_id, salary=1200)
+    assert employee_cache.employee_rows.peek(emp_id) is None
+    assert services.get_employee(conn, emp_id)['salary'] == 1200
+
+
+def test_callers_cannot_edit_the_cached_copy(conn):
+    emp_id = services.add_employee(conn, "Ada", "Lovelace", salary=1000)['emp_id']
+    services.get_employee(conn, emp_id)['salary'] = 0
+    assert services.get_employee(conn, emp_id)['salary'] == 1000
+
+
+def test_invalidation_drops_the_user_id_link(conn):
+    emp_id = services.add_employee(conn, "Ada", "Lovelace", salary=1000)['emp_id']
+    link_user(conn, emp_id, 7)
+    assert get_emp_id_for_user(conn, 7) == emp_id
+    services.get_employee(conn, emp_id)
+
+    link_user(conn, emp_id, None)
+    invalidate_employee(emp_id)
+    assert get_emp_id_for_user(conn, 7) is None
+
+
+def test_non_numeric_ids_miss_without_a_lookup(conn):
+    misses = employee_cache.employee_rows.stats()['misses']
+    assert employee_cache.get_employee(conn, "abc") is None
+    assert employee_cache.employee_rows.stats()['misses'] == misses
+
+
+def test_lru_evicts_the_least_recently_used_entry():
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_expired_entries_are_misses():
+    cache = LRUCache(ttl=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+    assert cache.stats()['expirations'] == 1 and len(cache) == 0
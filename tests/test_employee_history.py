@@ -0,0 +1,59 @@
+import pytest
+
+import employee_history
+import services
+from db_pool import SQLiteConnection
+
+
+def history_rows(conn, emp_id):
+    return [(row['salary'], row['changed_fields']) for row in employee_history.history(conn, emp_id)]
+
+
+def current_salary(conn, emp_id):
+    cursor = conn.cursor()
+    cursor.execute("SELECT salary FROM employees WHERE emp_id = %s", (emp_id,))
+    salary = cursor.fetchone()[0]
+    cursor.close()
+    return salary
+
+
+def test_failed_history_write_rolls_back_the_update(conn, monkeypatch):
+    emp_id = services.add_employee(conn, "Ada", "Lovelace", salary=1000)['emp_id']
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("history insert failed")
+    monkeypatch.setattr(employee_history, "record_change", broken)
+
+    with pytest.raises(RuntimeError):
+        services.update_employee(conn, emp_id, salary=2000)
+    assert current_salary(conn, emp_id) == 1000
+    assert history_rows(conn, emp_id) == [(1000, "created")]
+
+
+def test_failed_history_write_rolls_back_the_insert(conn, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("history insert failed")
+    monkeypatch.setattr(employee_history, "record_new_employee", broken)
+
+    with pytest.raises(RuntimeError):
+        services.add_employee(conn, "Ada", "Lovelace", salary=1000)
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM employees")
+    assert cursor.fetchone()[0] == 0
+    cursor.close()
+
+
+def test_update_logs_the_row_it_replaced_not_the_cached_copy(conn, db_path):
+    emp_id = services.add_employee(conn, "Ada", "Lovelace", department="R&D", salary=1000)['emp_id']
+    services.get_employee(conn, emp_id)     # now cached
+
+    other = SQLiteConnection(db_path)      # another process changes the row
+    cursor = other.cursor()
+    cursor.execute("UPDATE employees SET salary = 1500 WHERE emp_id = %s", (emp_id,))
+    other.commit()
+    cursor.close()
+    other.close()
+
+    updated = services.update_employee(conn, emp_id, department="Ops")
+    assert updated['salary'] == 1500 and updated['department'] == "Ops"
+    assert history_rows(conn, emp_id)[-1] == (1500, "department")
@@ -0,0 +1,83 @@
+import migrations
+import services
+from employee_search import enable_trigram_index, search_employees, search_query
+
+NAMES = [("Anna", "Berg"), ("Bob", "Annis"), ("Annabel", "Annison"), ("Carl", "Dean"), ("anne", "Fox"),
+         ("Dana", "Hanna"), ("Ann_e", "Grey"), ("Eve", "Mann")]
+
+
+def seed(conn):
+    for n, (first, last) in enumerate(NAMES * 3):
+        services.add_employee(conn, first, last, department="Sales" if n % 2 else "Ops", salary=1000.0)
+
+
+def ids(rows):
+    return [row['emp_id'] for row in rows]
+
+
+def all_pages(conn, limit, **kwargs):
+    found, after = [], 0
+    while True:
+        page = search_employees(conn, limit=limit, after_emp_id=after, **kwargs)
+        if not page:
+            return found
+        found.extend(page)
+        after = page[-1]['emp_id']
+
+
+def test_prefix_matches_either_name_case_insensitively_in_emp_id_order(conn):
+    seed(conn)
+    rows = search_employees(conn, "ann", limit=100)
+    assert {(row['first_name'], row['last_name']) for row in rows} == {
+        ("Anna", "Berg"), ("Bob", "Annis"), ("Annabel", "Annison"), ("anne", "Fox"), ("Ann_e", "Grey")}
+    assert ids(rows) == sorted(ids(rows)) and len(rows) == 15     # Annabel Annison listed once
+
+
+def test_paging_visits_every_match_once(conn):
+    seed(conn)
+    everything = ids(search_employees(conn, "an", limit=100))
+    for limit in (1, 2, 4, 7):
+        assert ids(all_pages(conn, limit, name="an")) == everything
+    assert ids(all_pages(conn, 2, name="an", department="Sales")) == [
+        row['emp_id'] for row in search_employees(conn, "an", limit=100) if row['department'] == "Sales"]
+
+
+def test_like_wildcards_in_the_name_are_literal(conn):
+    seed(conn)
+    assert {row['first_name'] for row in search_employees(conn, "ann_", limit=100)} == {"Ann_e"}
+
+
+def test_substring_search_agrees_with_the_trigram_index(conn):
+    seed(conn)
+    from_database = ids(all_pages(conn, 100, name="nni", substring=True))
+    by_department = ids(all_pages(conn, 100, name="ann", substring=True, department="Ops"))
+    assert len(from_database) == 6 and by_department
+
+    enable_trigram_index(conn)
+    for limit in (1, 4):
+        assert ids(all_pages(conn, limit, name="nni", substring=True)) == from_database
+        assert ids(all_pages(conn, limit, name="ann", substring=True, department="Ops")) == by_department
+
+
+def test_prefix_search_uses_the_name_indexes(conn):
+    seed(conn)
+    for args in (("Ann",), ("Ann", "Sales")):
+        plan = migrations.explain(conn, "sqlite", *search_query(*args))
+        assert not [detail for _, detail, full_scan in plan if full_scan]
+    details = " ".join(detail for _, detail, _ in migrations.explain(conn, "sqlite", *search_query("Ann")))
+    assert "idx_employees_first_nocase" in details and "idx_employees_last_nocase" in details
+
+
+def test_each_name_branch_is_cut_to_one_page(conn):
+    seed(conn)
+    query, params = search_query("ann", limit=3)
+    assert query.count("LIMIT %s") == 3 and params.count(3) == 3
+    assert ids(search_employees(conn, "ann", limit=3)) == ids(search_employees(conn, "ann", limit=100))[:3]
+
+
+def test_trigram_filters_ignore_case(conn):
+    seed(conn)
+    enable_trigram_index(conn)
+    expected = ids(all_pages(conn, 100, name="ann", substring=True, department="Ops"))
+    assert expected
+    assert ids(all_pages(conn, 100, name="ANN", substring=True, department="oPS")) == expected
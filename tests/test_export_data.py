@@ -0,0 +1,77 @@
+import csv
+from datetime import date
+
+import pytest
+
+import services
+from export_data import export_query, export_table, read_columnar
+
+
+@pytest.fixture
+def staff(conn):
+    services.add_employee(conn, "Ada", "Lovelace", department="R&D", salary=1000.5)
+    services.add_employee(conn, "Alan", "Turing", email="", salary=900)
+    services.add_employee(conn, "Grace", "Hopper", job_title="Admiral ⚓", salary=1500)
+    cursor = conn.cursor()
+    cursor.execute("UPDATE employees SET phone = NULL WHERE first_name = 'Alan'")
+    conn.commit()
+    cursor.close()
+    return conn
+
+
+def table_rows(conn, table):
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(f"SELECT * FROM {table}")
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+
+def test_columnar_round_trip(staff, tmp_path):
+    path = str(tmp_path / "employees.hrc")
+    # two rows per chunk, so the file holds more than one chunk
+    assert export_table(staff, "employees", path, "columnar", fetch_size=2) == 3
+    assert list(read_columnar(path)) == table_rows(staff, "employees")
+
+
+def test_csv_round_trip(staff, tmp_path):
+    path = str(tmp_path / "employees.csv")
+    assert export_table(staff, "employees", path, fetch_size=2) == 3
+    with open(path, newline="", encoding="utf-8") as fh:
+        exported = list(csv.DictReader(fh))
+    expected = [{name: "" if value is None else str(value) for name, value in row.items()}
+                for row in table_rows(staff, "employees")]
+    assert exported == expected
+
+
+def test_empty_exports_keep_their_columns(conn, tmp_path):
+    path = str(tmp_path / "leaves.hrc")
+    assert export_table(conn, "leaves", path, "columnar") == 0
+    assert list(read_columnar(path)) == []
+    with open(tmp_path / "leaves.hrc", "rb") as fh:
+        assert b'"columns": [' in fh.read()
+
+
+def test_date_range_filters_rows(conn, tmp_path):
+    emp_id = services.add_employee(conn, "Ada", "Lovelace", salary=1000)['emp_id']
+    services.record_performance_review(conn, emp_id, 4, review_date="2025-01-15")
+    services.record_performance_review(conn, emp_id, 5, review_date="2025-03-15")
+
+    path = str(tmp_path / "reviews.hrc")
+    assert export_table(conn, "performance_reviews", path, "columnar",
+                        since=date(2025, 2, 1), until=date(2025, 12, 31)) == 1
+    assert [row['rating'] for row in read_columnar(path)] == [5]
+
+
+def test_unknown_tables_and_undated_filters_are_refused():
+    with pytest.raises(ValueError):
+        export_query("users")
+    with pytest.raises(ValueError):
+        export_query("employees", since=date(2025, 1, 1))
+
+
+def test_non_exports_are_refused(tmp_path):
+    path = tmp_path / "not.hrc"
+    path.write_bytes(b"first_name\nAda\n")
+    with pytest.raises(ValueError):
+        list(read_columnar(str(path)))
@@ -0,0 +1,68 @@
+from datetime import date, timedelta
+
+import employee_history
+from import_employees import import_employees, read_records
+
+
+def records(*names):
+    return [(n, {"first_name": name, "last_name": "Imported", "department": "Ops", "salary": "1000"})
+            for n, name in enumerate(names, start=2)]
+
+
+def test_imported_employees_are_logged_as_created(conn):
+    summary = import_employees(conn, records("Ann", "Bob", "Cy"), batch_size=2)
+    assert summary["loaded"] == 3 and summary["batches"] == 2
+    logged = [employee_history.history(conn, emp_id) for emp_id in (1, 2, 3)]
+    assert [[row['changed_fields'] for row in rows] for rows in logged] == [["created"]] * 3
+
+    yesterday = date.today() - timedelta(days=1)
+    assert employee_history.department_as_of(conn, "Ops", yesterday) == []
+    assert len(employee_history.department_as_of(conn, "Ops", date.today())) == 3
+
+
+def employee_names(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT first_name FROM employees ORDER BY emp_id")
+    names = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    return names
+
+
+def test_a_rejected_row_falls_back_to_row_by_row(conn):
+    cursor = conn.cursor()
+    cursor.execute("CREATE TRIGGER no_bob BEFORE INSERT ON employees WHEN NEW.first_name = 'Bob' "
+                   "BEGIN SELECT RAISE(ABORT, 'no Bobs'); END")
+    conn.commit()
+    cursor.close()
+
+    rejected = []
+    summary = import_employees(conn, records("Ann", "Bob", "Cy"), report=lambda *row: rejected.append(row))
+    assert summary == {"read": 3, "loaded": 2, "rejected": 1, "batches": 1}
+    assert rejected == [(3, "database rejected row: no Bobs")]
+    assert employee_names(conn) == ["Ann", "Cy"]
+    assert len(employee_history.department_as_of(conn, "Ops", date.today())) == 2
+
+
+def test_invalid_rows_are_reported_and_skipped(conn, tmp_path):
+    path = tmp_path / "staff.jsonl"
+    path.write_text('{"first_name": "Ann", "salary": "1000"}\n'
+                    '{"first_name": "Bob", "salary": "lots"}\n'
+                    '\n'
+                    '{"first_name": "Cy"}\n'
+                    'not json\n'
+                    '["Dee"]\n'
+                    '{"first_name": " Eve ", "salary": 900}\n')
+    rejected = []
+    summary = import_employees(conn, read_records(str(path)), report=lambda *row: rejected.append(row))
+    assert summary == {"read": 6, "loaded": 2, "rejected": 4, "batches": 1}
+    assert [line for line, _ in rejected] == [2, 4, 5, 6]
+    assert rejected[1] == (4, "salary is missing")
+    assert employee_names(conn) == ["Ann", "Eve"]
+
+
+def test_csv_dry_run_validates_without_loading(conn, tmp_path):
+    path = tmp_path / "staff.csv"
+    path.write_text("first_name,last_name,salary\nAnn,Lee,1000\nBob,Ray,\n")
+    summary = import_employees(conn, read_records(str(path)), dry_run=True)
+    assert summary == {"read": 2, "loaded": 0, "rejected": 1, "batches": 0}
+    assert employee_names(conn) == []
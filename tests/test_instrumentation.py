@@ -0,0 +1,86 @@
+import sqlite3
+
+import pytest
+
+import instrumentation
+from db_pool import SQLiteConnection
+from instrumentation import InstrumentedConnection, Metrics, fingerprint, render_prometheus, track_action
+
+
+@pytest.fixture
+def registry():
+    return Metrics(slow_query_seconds=10.0)
+
+
+@pytest.fixture
+def iconn(db_path, registry):
+    connection = InstrumentedConnection(SQLiteConnection(db_path), registry)
+    yield connection
+    connection.close()
+
+
+def run(conn, query, params=()):
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+
+def test_literals_and_in_lists_share_a_fingerprint():
+    assert fingerprint("SELECT * FROM t WHERE a = 1 AND b IN (%s, %s)") == \
+        fingerprint("SELECT *  FROM t\n WHERE a = 22 AND b IN (%s)")
+    assert fingerprint("SELECT * FROM t WHERE name = 'O''Brien'") == "SELECT * FROM t WHERE name = ?"
+
+
+def test_calls_rows_and_errors_are_counted(iconn, registry):
+    insert = "INSERT INTO job_openings (title, salary_offered) VALUES (%s, %s)"
+    cursor = iconn.cursor()
+    cursor.executemany(insert, [("Clerk", 1000), ("Cook", 1100), ("Cashier", 900)])
+    iconn.commit()
+    cursor.close()
+    assert len(run(iconn, "SELECT * FROM job_openings WHERE salary_offered > 950")) == 2
+    assert len(run(iconn, "SELECT * FROM job_openings WHERE salary_offered > 1050")) == 1
+    with pytest.raises(sqlite3.OperationalError):
+        run(iconn, "SELECT nope FROM job_openings WHERE salary_offered > 1")
+
+    stats = registry.statements
+    written = stats[fingerprint(insert)]
+    assert (written.calls, written.rows, written.errors) == (1, 3, 0)
+    read = stats[fingerprint("SELECT * FROM job_openings WHERE salary_offered > 0")]
+    assert (read.calls, read.rows, read.errors, read.latency.count) == (2, 3, 0, 2)
+    assert stats[fingerprint("SELECT nope FROM job_openings WHERE salary_offered > 1")].errors == 1
+
+
+def test_actions_count_their_own_and_nested_queries(iconn):
+    @track_action("test.inner")
+    def inner():
+        run(iconn, "SELECT 1")
+
+    with track_action("test.outer") as outer:
+        run(iconn, "SELECT 2")
+        inner()
+        inner()
+    assert outer.queries == 3
+
+    actions = instrumentation.metrics.actions
+    assert actions["test.inner"].calls == 2 and actions["test.inner"].queries.sum == 2
+    assert actions["test.outer"].queries.sum == 3
+
+
+def test_slow_queries_are_logged(iconn, registry, tmp_path):
+    registry.slow_query_seconds = 0
+    registry.slow_log_path = str(tmp_path / "slow.log")
+    run(iconn, "SELECT 42")
+    assert registry.slow_total == 1 and registry.slow_queries[0]['statement'] == "SELECT ?"
+    assert "slow query" in (tmp_path / "slow.log").read_text()
+
+
+def test_prometheus_export_matches_the_counters(iconn, registry):
+    run(iconn, "SELECT 1")
+    run(iconn, "SELECT 2")
+    text = render_prometheus(registry)
+    assert 'hrms_query_duration_seconds_count{statement="SELECT ?"} 2' in text
+    assert 'hrms_query_duration_seconds_bucket{statement="SELECT ?",le="+Inf"} 2' in text
+    assert 'hrms_query_rows_total{statement="SELECT ?"} 2' in text
+    assert "hrms_slow_queries_total 0" in text
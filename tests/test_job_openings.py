@@ -0,0 +1,59 @@
+import sqlite3
+
+import pytest
+
+import services
+from db_pool import SQLiteConnection
+
+
+def add_openings(conn, openings):
+    return [services.add_job_opening(conn, title, salary, 40)['job_id'] for title, salary in openings]
+
+
+def all_pages(conn, **filters):
+    pages = list(services.iter_job_opening_pages(conn, 2, **filters))
+    assert all(len(page) <= 2 for page in pages)
+    return [job['job_id'] for page in pages for job in page]
+
+
+def test_salary_filtered_pages_walk_salary_then_job_id(conn):
+    ids = add_openings(conn, [("A", 55000), ("B", 52000), ("C", 55000), ("D", 70000), ("E", 52000)])
+    assert all_pages(conn, min_salary=50000, max_salary=60000) == [ids[1], ids[4], ids[0], ids[2]]
+
+
+def test_title_filtered_pages_walk_title_then_job_id(conn):
+    ids = add_openings(conn, [("Data Scientist", 1), ("Data Analyst", 1), ("Designer", 1),
+                              ("Data Analyst", 1), ("Data Engineer", 1)])
+    assert all_pages(conn, title_prefix="data") == [ids[1], ids[3], ids[4], ids[0]]
+
+
+def test_status_filter_keeps_job_id_order(conn):
+    ids = add_openings(conn, [("A", 55000), ("B", 52000), ("C", 53000)])
+    assert all_pages(conn, status="Open", min_salary=50000) == ids
+
+
+
+@pytest.mark.parametrize("table, write", [
+    ("job_openings", lambda conn: services.add_job_opening(conn, "B", 2000)),
+    ("job_openings", lambda conn: services.update_job_opening(conn, 1, status="Closed")),
+    ("candidates", lambda conn: services.add_candidate(conn, "Ann", "Lee")),
+])
+def test_failed_writes_release_the_database(conn, db_path, table, write):
+    add_openings(conn, [("A", 1000)])
+    cursor = conn.cursor()
+    for event in ("INSERT", "UPDATE"):
+        cursor.execute(f"CREATE TRIGGER refuse_{event.lower()} BEFORE {event} ON {table} "
+                       "BEGIN SELECT RAISE(ABORT, 'refused'); END")
+    conn.commit()
+    cursor.close()
+    with pytest.raises(sqlite3.IntegrityError):
+        write(conn)
+
+    other = SQLiteConnection(db_path, timeout=0)    # fails at once if the write lock is still held
+    try:
+        cursor = other.cursor()
+        cursor.execute("INSERT INTO users (username, password_hash, role) VALUES ('x', 'x', 'employee')")
+        other.commit()
+        cursor.close()
+    finally:
+        other.close()
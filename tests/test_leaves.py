@@ -0,0 +1,126 @@
+import threading
+import time
+from datetime import date
+
+import pytest
+
+import services
+from db_pool import SQLiteConnection
+from leave_engine import enable_leave_engine
+
+
+@pytest.fixture
+def emp_id(conn):
+    return services.add_employee(conn, "Ann", "Lee", department="Ops", salary=5000)['emp_id']
+
+
+def test_overlapping_requests_are_rejected(conn, emp_id):
+    services.apply_leave(conn, emp_id, "2026-03-02", "2026-03-06")
+    for start, end in (("2026-03-06", "2026-03-09"), ("2026-02-27", "2026-03-02"), ("2026-03-03", "2026-03-04")):
+        with pytest.raises(services.ServiceError, match="Overlaps"):
+            services.apply_leave(conn, emp_id, start, end)
+    services.apply_leave(conn, emp_id, "2026-03-07", "2026-03-08")    # the day after is free
+
+
+def test_rejected_leave_frees_its_dates(conn, emp_id):
+    leave = services.apply_leave(conn, emp_id, date(2026, 5, 4), date(2026, 5, 8))
+    services.set_leave_status(conn, leave['leave_id'], "Rejected")
+    assert services.apply_leave(conn, emp_id, date(2026, 5, 4), date(2026, 5, 8))['status'] == 'Pending'
+
+
+def test_decided_leave_cannot_be_flipped(conn, emp_id):
+    leave = services.apply_leave(conn, emp_id, date(2026, 5, 4), date(2026, 5, 8))
+    services.set_leave_status(conn, leave['leave_id'], "Approved")
+    with pytest.raises(services.Conflict):
+        services.set_leave_status(conn, leave['leave_id'], "Rejected")
+    cursor = conn.cursor()
+    cursor.execute("SELECT status FROM leaves WHERE leave_id = %s", (leave['leave_id'],))
+    assert cursor.fetchone()[0] == "Approved"
+    cursor.close()
+
+
+def test_concurrent_overlapping_requests_book_once(db_path, emp_id, monkeypatch):
+    results, barrier = [], threading.Barrier(6)
+    booked_leaves = services._booked_leaves
+
+    def slow_check(*args, **kwargs):
+        rows = booked_leaves(*args, **kwargs)
+        time.sleep(0.05)        # widen the gap between the overlap check and the INSERT
+        return rows
+
+    monkeypatch.setattr(services, "_booked_leaves", slow_check)
+
+    def apply(n):
+        conn = SQLiteConnection(db_path)
+        try:
+            barrier.wait()
+            results.append(services.apply_leave(conn, emp_id, date(2026, 6, 1 + n), date(2026, 6, 10)))
+        except services.ServiceError:
+            results.append(None)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=apply, args=(n,)) for n in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 6 and len([r for r in results if r]) == 1
+
+
+def test_overlaps_are_checked_against_the_database_with_the_engine_on(conn, db_path, emp_id):
+    enable_leave_engine(conn)
+    other = SQLiteConnection(db_path)         # another process's booking, unseen by this engine
+    try:
+        cursor = other.cursor()
+        cursor.execute("INSERT INTO leaves (emp_id, start_date, end_date, reason, status) "
+                       "VALUES (%s, %s, %s, '', 'Pending')", (emp_id, "2026-07-06", "2026-07-10"))
+        other.commit()
+        cursor.close()
+    finally:
+        other.close()
+    with pytest.raises(services.ServiceError, match="Overlaps"):
+        services.apply_leave(conn, emp_id, "2026-07-08", "2026-07-08")
+    services.apply_leave(conn, emp_id, "2026-07-13", "2026-07-14")
+    assert services.leave_balance(conn, emp_id, 2026)['used'] == 2
+
+
+def insert_leave(conn, emp_id, start, end, status):
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO leaves (emp_id, start_date, end_date, reason, status) "
+                   "VALUES (%s, %s, %s, '', %s)", (emp_id, start, end, status))
+    conn.commit()
+    leave_id = cursor.lastrowid
+    cursor.close()
+    return leave_id
+
+
+def test_double_booked_leave_is_counted_once_the_other_is_rejected(conn, emp_id):
+    # data from before the overlap check: two requests over the same days
+    days = {insert_leave(conn, emp_id, "2026-03-02", "2026-03-06", "Pending"): 5,
+            insert_leave(conn, emp_id, "2026-03-05", "2026-03-09", "Pending"): 3}
+    engine = enable_leave_engine(conn)
+    [blocked] = engine.overlaps
+    [booked] = set(days) - {blocked}
+    assert services.leave_balance(conn, emp_id, 2026)['used'] == days[booked]
+
+    services.set_leave_status(conn, booked, "Rejected")
+    assert engine.overlaps == []
+    assert services.leave_balance(conn, emp_id, 2026)['used'] == days[blocked]
+    assert engine.conflicts(emp_id, "2026-03-05", "2026-03-05") == [blocked]
+
+
+def test_released_leave_promotes_only_what_no_longer_overlaps(conn, emp_id):
+    engine = enable_leave_engine(conn)
+    engine.book(1, emp_id, "2026-03-02", "2026-03-06")      # Mon-Fri
+    engine.book(2, emp_id, "2026-03-05", "2026-03-10")      # overlaps 1 and 3
+    engine.book(3, emp_id, "2026-03-09", "2026-03-09")
+    engine.book(4, emp_id, "2026-03-03", "2026-03-03")      # overlaps 1 only
+    assert engine.overlaps == [2, 4]
+
+    engine.release(1)
+    assert engine.overlaps == [2]
+    assert engine.conflicts(emp_id, "2026-03-02", "2026-03-06") == [4]
+    engine.release(3)
+    assert engine.overlaps == []
+    assert engine.days_used(emp_id, 2026) == 5
@@ -0,0 +1,76 @@
+import sqlite3
+
+import pytest
+
+import migrations
+import services
+from db_pool import SQLiteConnection
+
+
+def test_migrate_applies_every_version_once(tmp_path):
+    conn = SQLiteConnection(str(tmp_path / "fresh.db"))
+    try:
+        applied = migrations.migrate(conn, "sqlite")
+        assert [version for version, _ in applied] == [version for version, _, _ in migrations.MIGRATIONS]
+        assert migrations.migrate(conn, "sqlite") == []
+        assert max(migrations.applied_versions(conn)) == migrations.LATEST_VERSION
+    finally:
+        conn.close()
+
+
+def test_migrate_stops_at_target(tmp_path):
+    conn = SQLiteConnection(str(tmp_path / "partial.db"))
+    try:
+        assert [v for v, _ in migrations.migrate(conn, "sqlite", target=2)] == [1, 2]
+        assert [v for v, _ in migrations.migrate(conn, "sqlite")] == list(range(3, migrations.LATEST_VERSION + 1))
+    finally:
+        conn.close()
+
+
+def flagged(conn, sql, params=None):
+    return [detail for _, detail, full_scan in migrations.explain(conn, "sqlite", sql, params) if full_scan]
+
+
+def test_table_scan_is_flagged(conn):
+    assert flagged(conn, "SELECT emp_id FROM employees WHERE phone = %s", ("555",))
+
+
+def test_primary_key_walk_with_other_filters_is_flagged(conn):
+    assert flagged(conn, "SELECT emp_id FROM employees WHERE phone = %s AND emp_id > %s "
+                         "ORDER BY emp_id LIMIT %s", ("555", 0, 50))
+
+
+def test_plain_keyset_page_and_index_seek_are_not_flagged(conn):
+    assert not flagged(conn, "SELECT emp_id FROM employees WHERE emp_id > %s ORDER BY emp_id LIMIT %s", (0, 50))
+    assert not flagged(conn, "SELECT l.leave_id FROM leaves l JOIN employees e ON l.emp_id = e.emp_id "
+                             "WHERE l.status = 'Pending' AND l.leave_id > %s ORDER BY l.leave_id LIMIT %s", (0, 50))
+
+
+def test_full_index_scan_is_flagged(conn):
+    assert flagged(conn, "SELECT last_name FROM employees ORDER BY last_name, first_name")
+
+
+def test_catalogue_uses_the_statements_the_code_sends():
+    labels = {label: sql for label, sql, _ in migrations.QUERY_CATALOGUE}
+    assert labels["services.update_employee"] == services.employee_update_query(services.EDITABLE_EMPLOYEE_FIELDS)
+    assert labels["services.list_pending_leaves"] == services.pending_leaves_query(limit=50)[0]
+
+
+def test_catalogue_has_no_full_scans(conn):
+    assert [label for label, _, flagged in migrations.check(conn, "sqlite") if flagged] == []
+
+
+def test_create_indexes_skips_existing_indexes_only(conn):
+    indexes = [("idx_test_phone", "employees (phone)")]
+    assert migrations.create_indexes(conn, indexes) == ["idx_test_phone"]
+    assert migrations.create_indexes(conn, indexes) == []
+    with pytest.raises(sqlite3.OperationalError):
+        migrations.create_indexes(conn, [("idx_test_missing", "no_such_table (phone)")])
+
+
+def test_interrupted_column_migration_can_be_rerun(conn):
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM schema_migrations WHERE version = 8")
+    conn.commit()
+    cursor.close()
+    assert migrations.migrate(conn, "sqlite") == [(8, "payroll run claim counter")]
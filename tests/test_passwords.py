@@ -0,0 +1,81 @@
+import hashlib
+
+import pytest
+
+import passwords
+from login_register import authenticate, change_password, delete_user, set_role
+from passwords import Pbkdf2Hasher, hash_password, verify_password
+
+
+@pytest.fixture(autouse=True)
+def cheap_hasher(monkeypatch):
+    """The default hasher at a test-friendly cost."""
+    monkeypatch.setitem(passwords.HASHERS, Pbkdf2Hasher.algorithm, Pbkdf2Hasher(iterations=1000))
+
+
+def add_user(conn, username, password_hash, role="employee"):
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO users (username, password_hash, role) VALUES (%s, %s, %s)",
+                   (username, password_hash, role))
+    conn.commit()
+    user_id = cursor.lastrowid
+    cursor.close()
+    return user_id
+
+
+def stored_hash(conn, user_id):
+    cursor = conn.cursor()
+    cursor.execute("SELECT password_hash FROM users WHERE id = %s", (user_id,))
+    row = cursor.fetchone()
+    cursor.close()
+    return row[0]
+
+
+def test_legacy_hash_is_upgraded_on_login(conn):
+    user_id = add_user(conn, "ada", hashlib.sha256(b"secret").hexdigest())
+    assert authenticate(conn, "ada", "secret")['id'] == user_id
+    upgraded = stored_hash(conn, user_id)
+    assert upgraded.startswith("pbkdf2_sha256$1000$")
+    passwords.forget_logins()
+    assert authenticate(conn, "ada", "secret")['id'] == user_id
+    assert stored_hash(conn, user_id) == upgraded
+
+
+def test_wrong_password_is_refused_and_not_cached(conn):
+    add_user(conn, "ada", hash_password("secret"))
+    assert authenticate(conn, "ada", "Secret") is None
+    assert authenticate(conn, "nobody", "secret") is None
+    assert len(passwords.verified_sessions) == 0
+
+
+@pytest.mark.parametrize("encoded", [
+    "",
+    "abc123",                                           # not a known format
+    "pbkdf2_sha256$1000$c2FsdA",                         # fields missing
+    "pbkdf2_sha256$lots$c2FsdA$ZGlnZXN0",                # non-numeric cost
+    "scrypt$16384$8$1$c2FsdA$ZGlnZXN0",                  # digest doesn't match
+])
+def test_malformed_or_tampered_hashes_never_verify(encoded):
+    assert verify_password("secret", encoded) == (False, False)
+
+
+def test_truncated_hash_never_verifies():
+    encoded = hash_password("secret")
+    assert verify_password("secret", encoded) == (True, False)
+    assert verify_password("secret", encoded[:64]) == (False, False)
+    assert verify_password("secret", encoded[:-2] + ("AA" if encoded[-2:] != "AA" else "BB")) == (False, False)
+
+
+def test_account_changes_drop_cached_logins(conn):
+    user_id = add_user(conn, "ada", hash_password("secret"))
+    assert authenticate(conn, "ada", "secret")['role'] == "employee"
+
+    set_role(conn, user_id, "admin")
+    assert authenticate(conn, "ada", "secret")['role'] == "admin"
+
+    change_password(conn, user_id, "new secret")
+    assert authenticate(conn, "ada", "secret") is None
+    assert authenticate(conn, "ada", "new secret")['id'] == user_id
+
+    delete_user(conn, user_id)
+    assert authenticate(conn, "ada", "new secret") is None
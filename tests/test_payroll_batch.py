@@ -0,0 +1,113 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+import payroll_analytics
+import payroll_batch
+import services
+from db_pool import SQLiteConnection
+from payroll_batch import RunInProgress, _start_run, run_batch_payroll
+
+RUN_DATE = date(2026, 9, 30)
+
+
+def seed(conn, count=7):
+    for n in range(1, count + 1):
+        services.add_employee(conn, f"First{n}", f"Last{n}", department="Ops", salary=20000.0 + n)
+
+
+def payroll_rows(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM payroll WHERE generated_on = %s", (RUN_DATE,))
+    count = cursor.fetchone()[0]
+    cursor.close()
+    return count
+
+
+def set_status(conn, status, last_emp_id=0):
+    cursor = conn.cursor()
+    cursor.execute("UPDATE payroll_runs SET status = %s, last_emp_id = %s WHERE run_date = %s",
+                   (status, last_emp_id, RUN_DATE))
+    conn.commit()
+    cursor.close()
+
+
+def test_completed_date_is_not_paid_twice(conn):
+    seed(conn)
+    summary = run_batch_payroll(conn, RUN_DATE, chunk_size=3)
+    assert summary['status'] == 'completed' and summary['rows_written'] == 7 and summary['chunks'] == 3
+    assert run_batch_payroll(conn, RUN_DATE)['status'] == 'already completed'
+    assert payroll_rows(conn) == 7
+
+
+def test_second_claim_on_a_running_date_is_refused(db_path):
+    first, second = SQLiteConnection(db_path), SQLiteConnection(db_path)
+    try:
+        assert _start_run(first, RUN_DATE) == (0, 0, 'running')
+        with pytest.raises(RunInProgress):
+            _start_run(second, RUN_DATE)
+        with pytest.raises(RunInProgress):
+            run_batch_payroll(second, RUN_DATE)
+        assert payroll_rows(second) == 0
+    finally:
+        first.close()
+        second.close()
+
+
+def test_failed_run_resumes_and_force_takes_over_a_dead_run(conn):
+    seed(conn)
+    _start_run(conn, RUN_DATE)
+    set_status(conn, 'failed')
+    assert _start_run(conn, RUN_DATE) == (0, 0, 'running')
+
+    # 'running' again, as if the process died mid-run
+    with pytest.raises(RunInProgress):
+        run_batch_payroll(conn, RUN_DATE)
+    summary = run_batch_payroll(conn, RUN_DATE, force=True)
+    assert summary['status'] == 'completed' and payroll_rows(conn) == 7
+
+
+def claims(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT claims FROM payroll_runs WHERE run_date = %s", (RUN_DATE,))
+    count = cursor.fetchone()[0]
+    cursor.close()
+    return count
+
+
+def test_every_claim_changes_the_row(conn):
+    # MySQL's rowcount counts changed rows: a forced claim of a row that is
+    # already 'running' must still change it to count as claimed there
+    _start_run(conn, RUN_DATE)
+    assert claims(conn) == 0
+    _start_run(conn, RUN_DATE, force=True)
+    _start_run(conn, RUN_DATE, force=True)
+    assert claims(conn) == 2
+
+
+def test_only_a_duplicate_key_means_the_run_exists(conn, monkeypatch):
+    monkeypatch.setattr(payroll_batch, "NEW_RUN", payroll_batch.NEW_RUN.replace("rows_written", "no_such_column"))
+    with pytest.raises(sqlite3.OperationalError):
+        _start_run(conn, RUN_DATE)
+
+
+def rollups(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT month, department, payslips, headcount, ROUND(total_basic, 2), ROUND(total_net, 2) "
+                   "FROM payroll_monthly")
+    rows = sorted(tuple(str(value) for value in row) for row in cursor.fetchall())
+    cursor.close()
+    return rows
+
+
+def test_rollups_count_each_employee_once_per_month(conn):
+    seed(conn)
+    run_batch_payroll(conn, RUN_DATE, chunk_size=3)
+    run_batch_payroll(conn, date(2026, 9, 15), chunk_size=4)
+    services.calculate_payroll(conn, 1, save=True, generated_on=RUN_DATE)
+    incremental = rollups(conn)
+    assert [(row[2], row[3]) for row in incremental] == [("15", "7")]
+
+    payroll_analytics.rebuild_rollups(conn)
+    assert rollups(conn) == incremental
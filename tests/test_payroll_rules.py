@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from payroll_batch import compute_payroll, compute_payroll_batch
+from payroll_rules import DEFAULT_RULES, RuleError, compile_rule_set, get_rule_set
+
+
+def baseline(basic_salary):
+    """The fixed payroll formula the rules engine replaced."""
+    basic_salary = float(basic_salary)
+    hra = basic_salary * 0.24
+    if basic_salary < 10000:
+        pf = 0.0
+        insurance = 0.0
+    else:
+        pf = basic_salary * 0.12
+        insurance = 1500.0
+    net_salary = basic_salary + hra - (pf + insurance)
+    if net_salary < 0:
+        net_salary = 0.0
+    return hra, pf, insurance, net_salary
+
+
+def salaries():
+    rng = random.Random(17)
+    return [0, 0.01, 1, 9999.99, 10000, 10000.01, 12345.67, 45000, 1e6] + [
+        round(rng.uniform(0, 400000), 2) for _ in range(20000)]
+
+
+@pytest.fixture
+def default_rules():
+    return get_rule_set("default", config=DEFAULT_RULES)
+
+
+def test_default_rules_reproduce_the_fixed_formula_exactly(default_rules):
+    for basic in salaries():
+        assert default_rules.evaluate(basic) == baseline(basic), basic
+
+
+def test_batch_evaluation_matches_one_at_a_time(default_rules):
+    values = salaries()
+    columns = compute_payroll_batch(values, default_rules)
+    assert list(zip(*columns)) == [compute_payroll(basic, default_rules) for basic in values]
+
+
+def test_slabs_bands_and_caps():
+    rules = compile_rule_set("test_bands", {"version": 1, "components": {
+        "hra": {"type": "allowance", "rate": 0.1},
+        "prof_tax": {"type": "deduction", "slabs": [[0, 0], [15000, 150], [20000, 200]]},
+        "tds": {"type": "deduction", "bands": [[0, 0], [50000, 0.05], [100000, 0.1]], "cap": 6000},
+    }})
+    assert rules.components_for(18000) == {"hra": 1800.0, "prof_tax": -150.0, "tds": -0.0}
+    assert rules.components_for(120000)["tds"] == -(50000 * 0.05 + 20000 * 0.1)
+    assert rules.components_for(500000)["tds"] == -6000
+    assert rules.evaluate(120000)[3] == 120000 + 12000 - (200 + 4500)
+
+
+def test_editing_a_rule_set_needs_a_version_bump():
+    spec = {"version": 1, "components": {"hra": {"type": "allowance", "rate": 0.2}}}
+    compile_rule_set("test_versions", spec)
+    with pytest.raises(RuleError, match="version bump"):
+        compile_rule_set("test_versions", {"version": 1, "components": {"hra": {"type": "allowance", "rate": 0.3}}})
+    assert compile_rule_set("test_versions", dict(spec, version=2)).version == 2
+    with pytest.raises(RuleError):
+        compile_rule_set("test_bad", {"components": {"hra": {"type": "allowance", "rate": 0.1, "amount": 5}}})
@@ -0,0 +1,56 @@
+from datetime import date
+
+import pytest
+
+import review_analytics
+import services
+
+
+@pytest.fixture
+def reviewed(conn):
+    ada = services.add_employee(conn, "Ada", "Lovelace", department="R&D", salary=1000)['emp_id']
+    alan = services.add_employee(conn, "Alan", "Turing", department="R&D", salary=1000)['emp_id']
+    grace = services.add_employee(conn, "Grace", "Hopper", department="Ops", salary=1000)['emp_id']
+    for emp_id, rating, when in [(ada, 2, date(2026, 1, 10)), (ada, 3, date(2026, 2, 10)),
+                                 (ada, 5, date(2026, 3, 10)), (alan, 4, date(2026, 1, 20)),
+                                 (grace, 5, date(2026, 3, 1))]:
+        services.record_performance_review(conn, emp_id, rating, review_date=when)
+    return conn
+
+
+def test_rating_distribution_per_department_and_overall(reviewed):
+    rows = {row['department']: row for row in review_analytics.rating_distribution(reviewed)}
+    assert set(rows) == {"R&D", "Ops", "ALL"}
+    assert rows["R&D"]['counts'] == {1: 0, 2: 1, 3: 1, 4: 1, 5: 1}
+    assert rows["R&D"]['average'] == 3.5 and rows["R&D"]['pct'][5] == 25.0
+    assert rows["ALL"]['reviews'] == 5 and rows["ALL"]['average'] == 3.8
+
+    ops_in_march = review_analytics.rating_distribution(reviewed, "Ops", date(2026, 3, 1), date(2026, 3, 31))
+    assert [(row['department'], row['reviews']) for row in ops_in_march] == [("Ops", 1)]
+
+
+def test_latest_rating_distribution_counts_each_employee_once(reviewed):
+    rows = {row['department']: row for row in review_analytics.latest_rating_distribution(reviewed)}
+    assert rows["R&D"]['counts'] == {1: 0, 2: 0, 3: 0, 4: 1, 5: 1}
+    assert rows["Ops"]['reviews'] == 1
+
+
+def test_monthly_trend_and_rolling_average(reviewed):
+    trend = review_analytics.rating_trend(reviewed, "R&D", months=3, until=date(2026, 3, 31), window=2)
+    assert [(m['month'], m['reviews'], m['average'], m['rolling_average']) for m in trend['months']] == [
+        ("2026-01", 2, 3.0, 3.0), ("2026-02", 1, 3.0, 3.0), ("2026-03", 1, 5.0, 4.0)]
+    assert trend['slope'] == 1.0
+
+
+def test_employee_trends_from_one_scan(reviewed):
+    trends = {row['first_name']: row for row in review_analytics.employee_trends(reviewed, "R&D")}
+    assert set(trends) == {"Ada", "Alan"}
+    ada = trends["Ada"]
+    assert (ada['reviews'], ada['average'], ada['latest'], ada['rolling_average']) == (3, 3.33, 5, 3.33)
+    assert ada['trend_per_year'] > 0
+    assert trends["Alan"]['trend_per_year'] is None
+
+
+def test_review_stats_without_ratings():
+    assert review_analytics.review_stats([])['average'] is None
+    assert review_analytics.slope([(1, 2), (1, 3)]) is None
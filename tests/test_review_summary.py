@@ -0,0 +1,65 @@
+from datetime import date
+
+import review_analytics
+import review_summary
+import services
+
+
+def seed(conn):
+    for n in range(1, 6):
+        services.add_employee(conn, f"First{n}", f"Last{n}", department="Ops", salary=1000.0 * n)
+    services.record_performance_review(conn, 1, 3, review_date=date(2026, 1, 1))
+    services.record_performance_review(conn, 1, 5, review_date=date(2026, 3, 1))
+    services.record_performance_review(conn, 1, 2, review_date=date(2026, 2, 1))
+    services.record_performance_review(conn, 4, 4, review_date=date(2026, 2, 1))
+
+
+def ratings(rows):
+    return [(row['emp_id'], row['latest_rating'], str(row['latest_review_date'])) for row in rows]
+
+
+def test_listing_falls_back_to_the_window_query_without_the_summary_table(conn):
+    seed(conn)
+    assert review_summary.has_summary_table(conn)
+    expected = ratings(review_summary.fetch_latest_rating_page(conn, 0, 10))
+    assert expected[0] == (1, 5, "2026-03-01") and expected[1] == (2, None, "None")
+
+    cursor = conn.cursor()
+    cursor.execute("DROP TABLE employee_latest_review")
+    conn.commit()
+    cursor.close()
+
+    assert not review_summary.has_summary_table(conn)
+    assert ratings(review_summary.fetch_latest_rating_page(conn, 0, 10, use_summary=False)) == expected
+    page = review_summary.fetch_latest_rating_page(conn, 2, 2, use_summary=False)
+    assert ratings(page) == expected[2:4]
+
+
+def test_review_is_stored_under_the_employee_id_not_the_raw_argument(conn):
+    seed(conn)
+    review = services.record_performance_review(conn, " 3 ", 4, review_date=date(2026, 4, 1))
+    assert review['emp_id'] == 3
+    assert [r['rating'] for r in services.list_reviews(conn, 3)] == [4]
+    assert ratings(review_summary.fetch_latest_rating_page(conn, 2, 1)) == [(3, 4, "2026-04-01")]
+
+
+def table(conn, query):
+    cursor = conn.cursor()
+    cursor.execute(query)
+    rows = sorted(tuple(str(value) for value in row) for row in cursor.fetchall())
+    cursor.close()
+    return rows
+
+
+def test_incremental_summary_and_counts_match_a_rebuild(conn):
+    seed(conn)
+    services.record_performance_review(conn, 4, 2, review_date=date(2026, 2, 1))     # same date, later id
+    services.record_performance_review(conn, 2, 5, review_date=date(2026, 2, 14))
+    latest = table(conn, "SELECT emp_id, review_id, review_date, rating FROM employee_latest_review")
+    counts = table(conn, "SELECT month, department, rating, reviews FROM review_monthly")
+    assert ("4", "5", "2026-02-01", "2") in latest
+
+    review_summary.rebuild_latest_reviews(conn)
+    review_analytics.rebuild_rollups(conn)
+    assert table(conn, "SELECT emp_id, review_id, review_date, rating FROM employee_latest_review") == latest
+    assert table(conn, "SELECT month, department, rating, reviews FROM review_monthly") == counts
@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+from conftest import ROOT
+
+# Loaded by the first connection or the first menu opened, never by `import main`
+LAZY_MODULES = ("mysql.connector", "feature", "login_register", "services", "migrations")
+
+
+def run_python(code, monkeypatch):
+    monkeypatch.delenv("HRMS_DB_BACKEND", raising=False)
+    monkeypatch.delenv("HRMS_DIRECTORY_SNAPSHOT", raising=False)
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+
+
+def test_import_main_loads_no_driver_or_menu_modules(monkeypatch):
+    code = "import main, sys; print(','.join(m for m in %r if m in sys.modules))" % (LAZY_MODULES,)
+    assert run_python(code, monkeypatch).stdout.strip() == ""
+
+
+def test_missing_driver_is_reported_not_raised(monkeypatch):
+    code = "import sys; sys.modules['mysql'] = None; import main; print(main.get_db_connection())"
+    out = run_python(code, monkeypatch).stdout
+    assert "mysql-connector-python is not installed" in out
+    assert out.strip().endswith("None")
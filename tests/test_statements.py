@@ -0,0 +1,44 @@
+import gc
+import time
+import weakref
+
+import services
+import statements
+from db_pool import ConnectionPool, SQLiteConnection, sqlite_connect
+
+
+def test_prepared_cursors_follow_the_physical_connection(db_path):
+    pool = ConnectionPool(sqlite_connect(db_path), max_size=1, max_lifetime=0.05)
+    with pool.connection() as conn:
+        emp = services.add_employee(conn, "Ann", "Lee", salary=5000)
+        first = statements.prepared_cursor(conn, "employee_by_id")
+        state = conn.connection_state
+    with pool.connection() as conn:
+        assert statements.prepared_cursor(conn, "employee_by_id") is first
+        assert statements.fetch_one(conn, "employee_by_id", (emp['emp_id'],))['first_name'] == "Ann"
+        time.sleep(0.06)
+    # returned past max_lifetime: the pool recycled it and closed its cursors
+    assert state == {} and pool.stats()["recycled"] == 1
+    with pool.connection() as conn:
+        assert statements.prepared_cursor(conn, "employee_by_id") is not first
+
+
+def test_closing_the_pool_clears_connection_state(db_path):
+    pool = ConnectionPool(sqlite_connect(db_path), max_size=1)
+    with pool.connection() as conn:
+        statements.fetch_all(conn, "reviews_for_employee", (1,))
+        state = conn.connection_state
+    assert list(state) == ["prepared_cursors"]
+    pool.close()
+    assert state == {}
+
+
+def test_unpooled_connection_is_collected_with_its_cursors(db_path):
+    conn = SQLiteConnection(db_path)
+    statements.fetch_all(conn, "employee_by_id", (1,))
+    assert statements.prepared_cursor(conn, "employee_by_id") is statements.prepared_cursor(conn, "employee_by_id")
+    ref = weakref.ref(conn)
+    conn.close()
+    del conn
+    gc.collect()
+    assert ref() is None
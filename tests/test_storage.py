@@ -0,0 +1,68 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+import services
+import storage
+from conftest import ROOT
+from storage import MySQLBackend, SQLiteBackend, backend_from_env, bootstrap
+
+
+def test_backend_is_chosen_from_the_environment():
+    config = {"host": "db", "user": "hr", "database": "hrms"}
+    assert isinstance(backend_from_env(config, {}), MySQLBackend)
+    backend = backend_from_env(config, {"HRMS_DB_BACKEND": " SQLite ", "HRMS_SQLITE_PATH": "x.db"})
+    assert isinstance(backend, SQLiteBackend) and backend.path == "x.db"
+    with pytest.raises(ValueError):
+        backend_from_env(config, {"HRMS_DB_BACKEND": "postgres"})
+
+
+def test_sqlite_backend_bootstraps_and_runs_the_hr_operations(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "hrms.db"))
+    bootstrap(backend)
+    bootstrap(backend)      # already at the latest version: nothing to do
+
+    conn = backend.connect()
+    try:
+        assert storage.dialect_of(conn) == "sqlite"
+        assert conn._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        emp_id = services.add_employee(conn, "Ada", "Lovelace", salary=1000)['emp_id']
+        assert services.get_employee(conn, emp_id)['last_name'] == "Lovelace"
+    finally:
+        conn.close()
+
+
+def test_only_key_violations_are_duplicates(conn):
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO users (username, password_hash, role) VALUES ('ada', 'x', 'admin')")
+    with pytest.raises(sqlite3.IntegrityError) as duplicate:
+        cursor.execute("INSERT INTO users (username, password_hash, role) VALUES ('ada', 'y', 'admin')")
+    with pytest.raises(sqlite3.IntegrityError) as missing:
+        cursor.execute("INSERT INTO users (username, password_hash, role) VALUES ('bob', NULL, 'admin')")
+    cursor.close()
+    assert storage.is_duplicate_key(duplicate.value)
+    assert not storage.is_duplicate_key(missing.value)
+
+
+# storage.py run as a script, without the MySQL driver installed
+RUN_WITHOUT_DRIVER = """
+import runpy, sys
+sys.modules['mysql'] = None
+sys.argv = ['storage.py', 'bootstrap']
+runpy.run_path('storage.py', run_name='__main__')
+"""
+
+
+def test_bootstrap_script_reports_errors_instead_of_raising(tmp_path):
+    env = dict(os.environ, HRMS_DB_BACKEND="sqlite", HRMS_SQLITE_PATH=str(tmp_path / "hrms.db"))
+    done = subprocess.run([sys.executable, "storage.py", "bootstrap"], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    assert done.returncode == 0 and "Schema ready on SQLite" in done.stdout
+
+    env["HRMS_DB_BACKEND"] = "mysql"
+    done = subprocess.run([sys.executable, "-c", RUN_WITHOUT_DRIVER], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    assert done.returncode == 1 and "Bootstrap failed" in done.stdout